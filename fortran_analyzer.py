@@ -62,9 +62,15 @@ def t_error(t):
 
 # === ANALIZADOR SINTÁCTICO ===
 class Node:
+    """
+    Nodo del AST. Usa __slots__ (sin __dict__ por instancia) y las hojas
+    comparten una tupla vacía como hijos.
+    """
+    __slots__ = ('type', 'children', 'value')
+    
     def __init__(self, type, children=None, value=None):
         self.type = type
-        self.children = children if children is not None else []
+        self.children = children if children is not None else ()
         self.value = value
 
     def __repr__(self):
@@ -75,12 +81,15 @@ def p_program(p):
     p[0] = Node('Program', [p[1]])
 
 def p_statement_list(p):
-    '''statement_list : statement
-                     | statement statement_list'''
+    '''statement_list : statement_list statement
+                     | statement'''
+    # Recursión por la izquierda: cada sentencia se reduce apenas termina
+    # y se agrega en su lugar a la lista ya construida (tiempo lineal)
     if len(p) == 2:
         p[0] = Node('StatementList', [p[1]])
     else:
-        p[0] = Node('StatementList', [p[1]] + p[2].children)
+        p[1].children.append(p[2])
+        p[0] = p[1]
 
 def p_statement(p):
     '''statement : assignment
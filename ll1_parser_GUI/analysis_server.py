@@ -0,0 +1,432 @@
+# analysis_server.py
+# Servidor local de análisis (asyncio): mantiene analizadores LALR y LL(1)
+# ya construidos en un pool de trabajadores y atiende peticiones JSON por
+# un socket Unix o TCP en localhost, una por línea. Cada petición puede
+# traer varios documentos; la respuesta trae diagnósticos y, si se piden,
+# los ASTs. Los clientes (CI, GUI, editores) se ahorran el arranque del
+# proceso y la construcción de tablas y lexers en cada análisis.
+import argparse
+import asyncio
+import concurrent.futures
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8077
+# Una petición es una línea JSON: el límite acota la memoria por conexión
+MAX_REQUEST = 64 << 20
+PARSERS = ('lalr', 'll1')
+# Formatos del AST en la respuesta: JSON anidado o un archivo de ast_binary
+AST_FORMATS = (False, True, 'json', 'binary')
+DEFAULT_AST_DIR = os.path.join(tempfile.gettempdir(), 'f77-ast')
+
+# Programa con el que cada trabajador se calienta al arrancar
+WARM_UP = "X = 1\nIF (X > 0) THEN\n  DO I = 1, 2\n    Y = (X + I) * 2\n  ENDDO\nENDIF\n"
+
+# === TRABAJADORES ===
+# Analizadores del trabajador: uno de cada tipo por proceso (en modo hilos
+# los comparten todos los hilos; run() es reentrante en ambos)
+_analyzers = {}
+_ast_dir = DEFAULT_AST_DIR
+_signatures = {}    # firma del código de cada parser (nombres de los AST binarios)
+
+def init_worker(lexer_backend='ply', cache_size=256, cache_dir=None, threads=1, ast_dir=DEFAULT_AST_DIR):
+    """Construye los analizadores del proceso (tablas, lexers y pool de sesiones)"""
+    global _ast_dir
+    from fortran_analyzer import FortranAnalyzer, parser_signature as lalr_signature
+    from ll1_parser import FortranLL1Analyzer, parser_signature as ll1_signature
+    from parse_cache import ParseCache
+    cache = ParseCache(maxsize=cache_size, directory=cache_dir) if cache_size or cache_dir else None
+    _analyzers['lalr'] = FortranAnalyzer(cache=cache, lexer_backend=lexer_backend, pool_size=threads)
+    _analyzers['ll1'] = FortranLL1Analyzer(cache=cache, lexer_backend=lexer_backend)
+    _signatures['lalr'] = lalr_signature()
+    _signatures['ll1'] = ll1_signature()
+    _ast_dir = ast_dir
+    os.makedirs(ast_dir, exist_ok=True)
+
+def silence_stdout():
+    """
+    Los parsers informan cada error con print(): en un proceso que sólo
+    analiza (trabajador del pool, o `serve`) no hay a quién mostrárselo.
+    No se llama si AnalysisServer corre dentro de otro programa.
+    """
+    sys.stdout = open(os.devnull, 'w')
+
+def init_process_worker(*args):
+    """Inicializador de los procesos del pool"""
+    init_worker(*args)
+    silence_stdout()
+
+def warm_up():
+    """Primer análisis de cada parser (carga perezosa de módulos y sesiones del pool)"""
+    for analyzer in _analyzers.values():
+        analyzer.run(WARM_UP)
+    return os.getpid()
+
+def tree_to_json(root, positions=None):
+    """AST como JSON anidado {type, value, span, children}, escrito sin recursión por ast_export"""
+    import ast_export
+    out = io.StringIO()
+    ast_export.write_json(root, out, positions)
+    return out.getvalue().rstrip('\n')
+
+def write_binary_ast(parser_kind, code, analysis):
+    """
+    Guarda el AST en _ast_dir con el formato de ast_binary y devuelve la
+    ruta. El nombre sale del contenido, del lexer y de la firma del parser
+    (como la clave de ParseCache): un documento ya guardado no se vuelve a
+    escribir, y _ast_dir persiste entre corridas, así que un cambio en el
+    código o en el formato no debe reusar archivos viejos.
+    """
+    import ast_binary
+    from parse_cache import ParseCache
+    key = ParseCache.make_key(code, parser_kind, _analyzers[parser_kind].lexer_backend, _signatures[parser_kind])
+    path = os.path.join(_ast_dir, key + '.ast')
+    if not os.path.exists(path):
+        # Escritura atómica: un cliente nunca abre un archivo a medio escribir
+        fd, tmp_path = tempfile.mkstemp(dir=_ast_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(ast_binary.dump(analysis.ast, analysis.positions, analysis.message))
+        os.replace(tmp_path, path)
+    return path
+
+def analyze_document(parser_kind, document, want_ast=False):
+    """
+    Analiza un documento ({'code': ...} o {'path': ...}, con 'name'
+    opcional) y devuelve su resultado ya codificado en JSON: así el
+    trabajador, y no el bucle de eventos, paga la serialización.
+    want_ast: False, True o 'json' (AST anidado en el resultado) o
+    'binary' (ruta del AST binario en 'ast_file').
+    """
+    name = document.get('name') or document.get('path')
+    result = {'name': name, 'parser': parser_kind}
+    code = document.get('code')
+    if code is None:
+        try:
+            with open(document['path'], 'r', encoding='utf-8', errors='replace') as f:
+                code = f.read()
+        except (KeyError, TypeError, OSError) as e:
+            result.update(ok=False, message=f"No se pudo leer el documento: {e}", seconds=0.0,
+                          diagnostics=[])
+            return json.dumps(result, ensure_ascii=False)
+
+    start = time.perf_counter()
+    analysis = _analyzers[parser_kind].run(code)
+    elapsed = time.perf_counter() - start
+    # Como en batch_analyzer: correcto sólo si no hubo diagnósticos
+    diagnostics = [d.as_dict() for d in analysis.diagnostics]
+    result.update(ok=bool(analysis.success and not diagnostics), message=analysis.message,
+                  seconds=round(elapsed, 6), diagnostics=diagnostics)
+    if want_ast == 'binary':
+        result['ast_file'] = write_binary_ast(parser_kind, code, analysis) if analysis.ast is not None else None
+    elif want_ast and analysis.ast is not None:
+        # El AST ya viene como texto: se agrega al final sin pasar por json.dumps,
+        # que construiría los dicts y tiene un límite de profundidad
+        body = json.dumps(result, ensure_ascii=False)
+        return body[:-1] + ', "ast": ' + tree_to_json(analysis.ast, analysis.positions) + '}'
+    elif want_ast:
+        result['ast'] = None
+    return json.dumps(result, ensure_ascii=False)
+
+# === SERVIDOR ===
+
+class RequestError(Exception):
+    """Petición mal formada: se responde con {'error': ...} y la conexión sigue"""
+
+class AnalysisServer:
+    """
+    Servidor asyncio. Con processes > 0 el análisis corre en un pool de ese
+    número de procesos (paralelismo real); con processes == 0 corre en
+    `threads` hilos del propio servidor, que comparten los analizadores.
+
+    Protocolo: una petición JSON por línea y una respuesta por línea, en el
+    mismo orden dentro de cada conexión.
+
+        {"id": 1, "parser": "lalr", "ast": false,
+         "documents": [{"name": "a.f77", "code": "X = 1\\n"}, {"path": "/src/b.f77"}]}
+        → {"id": 1, "results": [{"name": ..., "ok": ..., "diagnostics": [...]}, ...], "seconds": ...}
+
+    Con "ast": true cada resultado trae el AST en JSON; con "ast": "binary"
+    trae en "ast_file" la ruta de un archivo de ast_binary en ast_dir, que
+    el cliente abre con un mmap sin copiarlo (ver AnalysisClient.load_ast).
+
+    Con "op": "stats" responde contadores y "op": "ping" sirve para saber si
+    el servidor está arriba.
+    """
+
+    def __init__(self, processes=0, threads=4, lexer_backend='ply', cache_size=256, cache_dir=None,
+                 ast_dir=DEFAULT_AST_DIR):
+        self.processes = processes
+        self.threads = threads
+        self.worker_args = (lexer_backend, cache_size, cache_dir, threads, ast_dir)
+        self.executor = None
+        self.server = None
+        self.started = time.monotonic()
+        self.requests = 0
+        self.documents = 0
+        self.errors = 0
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+        """Levanta el pool, lo calienta y empieza a escuchar"""
+        loop = asyncio.get_running_loop()
+        if self.processes > 0:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                self.processes, initializer=init_process_worker, initargs=self.worker_args)
+            workers = self.processes
+        else:
+            init_worker(*self.worker_args)
+            self.executor = concurrent.futures.ThreadPoolExecutor(self.threads)
+            workers = self.threads
+        # Una tarea por trabajador: el pool crea todos sus procesos antes de la primera petición
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warm_up) for _ in range(workers)))
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.server = await asyncio.start_unix_server(self.handle, socket_path, limit=MAX_REQUEST)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST)
+        self.started = time.monotonic()
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        """Atiende una conexión: lee peticiones línea por línea hasta que el cliente cierra"""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Línea más larga que MAX_REQUEST: el resto del flujo ya no es confiable
+                    writer.write(b'{"id": null, "error": "Petici\\u00f3n demasiado grande"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(await self.respond(line))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line):
+        """Respuesta (bytes, terminada en '\\n') a una línea de petición"""
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                raise RequestError(f"JSON inválido: {e}")
+            if not isinstance(request, dict):
+                raise RequestError("La petición debe ser un objeto JSON")
+            request_id = request.get('id')
+            body = await self.dispatch(request)
+        except RequestError as e:
+            self.errors += 1
+            body = json.dumps({'error': str(e)}, ensure_ascii=False)[1:-1]
+        return f'{{"id": {json.dumps(request_id)}, {body}}}\n'.encode('utf-8')
+
+    async def dispatch(self, request):
+        """Cuerpo de la respuesta (pares JSON sin las llaves)"""
+        op = request.get('op', 'analyze')
+        if op == 'ping':
+            return '"ok": true'
+        if op == 'stats':
+            return json.dumps(self.stats())[1:-1]
+        if op != 'analyze':
+            raise RequestError(f"Operación desconocida: {op!r}")
+
+        parser_kind = request.get('parser', 'lalr')
+        if parser_kind not in PARSERS:
+            raise RequestError(f"Parser desconocido: {parser_kind!r} (válidos: {', '.join(PARSERS)})")
+        documents = request.get('documents')
+        if documents is None and 'code' in request:
+            documents = [{'code': request['code'], 'name': request.get('name')}]
+        if not isinstance(documents, list) or not all(isinstance(d, dict) for d in documents):
+            raise RequestError("Se esperaba 'documents': lista de {'code': ...} o {'path': ...}")
+
+        loop = asyncio.get_running_loop()
+        for document in documents:
+            code = document.get('code')
+            if code is None and not isinstance(document.get('path'), str):
+                raise RequestError("Cada documento necesita 'code' o 'path' (cadenas)")
+            if code is not None and not isinstance(code, str):
+                raise RequestError(f"'code' debe ser una cadena, no {type(code).__name__}")
+        want_ast = request.get('ast', False)
+        # type() y no sólo `in`: 1 == True y 0 == False
+        if type(want_ast) not in (bool, str) or want_ast not in AST_FORMATS:
+            raise RequestError(f"Formato de AST desconocido: {want_ast!r} (válidos: true, 'json', 'binary')")
+        self.requests += 1
+        self.documents += len(documents)
+        start = time.perf_counter()
+        # Los documentos de la petición se reparten entre los trabajadores a la vez;
+        # una excepción en uno se informa en su resultado y la conexión sigue
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, analyze_document, parser_kind, document, want_ast)
+            for document in documents), return_exceptions=True)
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                self.errors += 1
+                document = documents[index]
+                results[index] = json.dumps({
+                    'name': document.get('name') or document.get('path'), 'parser': parser_kind, 'ok': False,
+                    'message': f"Error interno del analizador: {type(result).__name__}: {result}",
+                    'seconds': 0.0, 'diagnostics': []}, ensure_ascii=False)
+        elapsed = time.perf_counter() - start
+        return f'"results": [{", ".join(results)}], "seconds": {elapsed:.6f}'
+
+    def stats(self):
+        stats = {'requests': self.requests, 'documents': self.documents, 'errors': self.errors,
+                 'uptime': round(time.monotonic() - self.started, 3),
+                 'mode': 'processes' if self.processes > 0 else 'threads',
+                 'workers': self.processes or self.threads}
+        # Con procesos cada uno tiene su cache y no se ve desde aquí
+        cache = _analyzers['lalr'].cache if self.processes == 0 and _analyzers else None
+        stats['cache'] = cache.stats() if cache is not None else None
+        return stats
+
+async def serve(args):
+    silence_stdout()
+    server = AnalysisServer(args.processes, args.threads, args.lexer, args.cache_size, args.cache_dir,
+                            args.ast_dir)
+    listener = await server.start(args.host, args.port, args.socket)
+    where = args.socket or f"{args.host}:{args.port}"
+    stats = server.stats()
+    print(f"Servidor de análisis en {where} ({stats['mode']}: {stats['workers']})", file=sys.stderr)
+    # SIGTERM termina como Ctrl+C: cerrando el pool (si no, sus procesos quedan huérfanos)
+    stopping = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    except (NotImplementedError, AttributeError):
+        pass
+    try:
+        async with listener:
+            await stopping.wait()
+    finally:
+        await server.close()
+
+# === CLIENTE ===
+
+class AnalysisClient:
+    """
+    Cliente síncrono del servidor (para scripts, la GUI o plugins): una
+    conexión persistente; cada request() espera su respuesta.
+    """
+
+    def __init__(self, socket_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=None):
+        if socket_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile('rb')
+        self.next_id = 0
+
+    def request(self, payload):
+        """Envía una petición (dict) y devuelve la respuesta decodificada"""
+        self.next_id += 1
+        payload = dict(payload, id=payload.get('id', self.next_id))
+        self.sock.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b'\n')
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("El servidor cerró la conexión")
+        response = json.loads(line)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response
+
+    def analyze(self, documents, parser='lalr', ast=False):
+        """Resultados de una lista de documentos ({'code': ...} o {'path': ...})"""
+        return self.request({'parser': parser, 'ast': ast, 'documents': documents})['results']
+
+    def analyze_code(self, code, parser='lalr', ast=False):
+        return self.analyze([{'code': code}], parser, ast)[0]
+
+    @staticmethod
+    def load_ast(result):
+        """BinaryAST (sobre un mmap) de un resultado pedido con ast='binary', o None"""
+        from ast_binary import BinaryAST
+        path = result.get('ast_file')
+        return BinaryAST.open(path) if path else None
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def check(args):
+    """Subcomando check: analiza archivos en el servidor y emite JSON Lines como batch_analyzer"""
+    from batch_analyzer import collect_files
+    files = collect_files(args.paths)
+    if not files:
+        print("No se encontraron archivos Fortran (.f, .for, .f77)", file=sys.stderr)
+        return 2
+    failed = 0
+    with AnalysisClient(args.socket, args.host, args.port) as client:
+        for start in range(0, len(files), args.batch):
+            # Los archivos se leen aquí: el servidor puede no ver las mismas rutas
+            documents = []
+            for path in files[start:start + args.batch]:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    documents.append({'name': path, 'code': f.read()})
+            for result in client.analyze(documents, args.parser, args.ast or False):
+                failed += not result['ok']
+                print(json.dumps(result, ensure_ascii=False))
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de análisis Fortran77 con analizadores precalentados")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('serve', "levanta el servidor"), ('check', "analiza archivos en un servidor ya levantado")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--socket', help="socket Unix (en lugar de TCP)")
+        command.add_argument('--host', default=DEFAULT_HOST)
+        command.add_argument('--port', type=int, default=DEFAULT_PORT)
+        if name == 'serve':
+            command.add_argument('-j', '--processes', type=int, default=0,
+                                 help="procesos trabajadores (0 = hilos del servidor)")
+            command.add_argument('--threads', type=int, default=4, help="hilos si --processes es 0")
+            command.add_argument('--lexer', choices=['ply', 'dfa'], default='ply')
+            command.add_argument('--cache-size', type=int, default=256, help="ASTs en la cache en memoria (0 = sin cache)")
+            command.add_argument('--cache-dir', help="directorio de cache de ASTs en disco")
+            command.add_argument('--ast-dir', default=DEFAULT_AST_DIR,
+                                 help="directorio de los ASTs binarios pedidos con \"ast\": \"binary\"")
+        else:
+            command.add_argument('paths', nargs='+', help="archivos, directorios o globs")
+            command.add_argument('--parser', choices=PARSERS, default='lalr')
+            command.add_argument('--ast', nargs='?', const='json', choices=['json', 'binary'],
+                                 help="incluir el AST en cada resultado (JSON o ruta del AST binario)")
+            command.add_argument('--batch', type=int, default=64, help="archivos por petición")
+    args = parser.parse_args(argv)
+    if args.command == 'check':
+        return check(args)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# analysis_worker.py
+# Análisis en un hilo de fondo: la GUI envía peticiones y recoge eventos de
+# progreso y resultados desde una cola, sin bloquear el bucle de Tk
+import queue
+import threading
+
+from source_map import SourceMap
+
+class AnalysisCancelled(Exception):
+    """El análisis fue cancelado o reemplazado por una petición más reciente"""
+
+class AnalysisJob:
+    """
+    Una petición de análisis con su número de generación y bandera de
+    cancelación. Con path se analiza ese archivo (code es None).
+    """
+
+    def __init__(self, generation, code, parser_kind, events, path=None):
+        self.generation = generation
+        self.code = code
+        self.path = path
+        self.parser_kind = parser_kind
+        self.cancelled = threading.Event()
+        self._events = events
+
+    def check(self):
+        """Punto de cancelación: lanza AnalysisCancelled si la petición quedó obsoleta"""
+        if self.cancelled.is_set():
+            raise AnalysisCancelled()
+
+    def report(self, stage, fraction):
+        """Publica el avance (0.0 a 1.0) de una etapa del análisis"""
+        self._events.put(('progress', self.generation, (stage, fraction)))
+
+class CheckpointLexer:
+    """
+    Envuelve un lexer PLY (o DFALexer): cada `every` tokens revisa si el
+    trabajo fue cancelado e informa el avance según la posición en la
+    entrada. Si table es una TokenTable, guarda en ella cada token
+    entregado al parser; delivered cuenta los tokens de la última entrada.
+    """
+
+    def __init__(self, lexer, every=2000):
+        self.lexer = lexer
+        self.every = every
+        self.job = None
+        self.table = None
+        self.stage = "Análisis sintáctico"
+        self.count = 0
+        self.delivered = 0
+        self.source = None
+
+    def input(self, data):
+        self.count = 0
+        self.delivered = 0
+        self.lexer.lineno = 1
+        # Columnas de los tokens de la tabla: un índice de líneas por entrada
+        self.source = SourceMap(data) if self.table is not None else None
+        self.lexer.input(data)
+
+    def token(self):
+        self.count += 1
+        if self.job is not None and self.count % self.every == 0:
+            self.job.check()
+            self.job.report(self.stage, self.lexer.lexpos / max(1, self.lexer.lexlen))
+        token = self.lexer.token()
+        if token is not None:
+            self.delivered += 1
+            if self.table is not None:
+                self.table.append(token, self.source.column(token.lexpos))
+        return token
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    # lexerrorf y lineno los usa el lexer envuelto: se asignan en él y no en el envoltorio
+    @property
+    def lexerrorf(self):
+        return self.lexer.lexerrorf
+
+    @lexerrorf.setter
+    def lexerrorf(self, function):
+        self.lexer.lexerrorf = function
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    @lineno.setter
+    def lineno(self, value):
+        self.lexer.lineno = value
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+class CheckpointLexerFactory:
+    """
+    Fábrica de lexers (como ll1_parser.LexerFactory) que entrega los clones
+    de `factory` envueltos en un CheckpointLexer del trabajo actual: para
+    los parsers que piden un lexer nuevo en cada análisis.
+    """
+
+    def __init__(self, factory, stage="Análisis léxico"):
+        self.factory = factory
+        self.stage = stage
+        self.job = None
+
+    def get_lexer(self, code=None):
+        lexer = CheckpointLexer(self.factory.get_lexer())
+        lexer.job = self.job
+        lexer.stage = self.stage
+        if code is not None:
+            lexer.input(code)
+        return lexer
+
+    def __getattr__(self, name):
+        return getattr(self.factory, name)
+
+class AnalysisWorker:
+    """
+    Hilo trabajador único. submit() cancela el análisis en curso y deja
+    pendiente sólo la petición más reciente; task(job) hace el trabajo y
+    debe llamar a job.check() periódicamente. Los eventos
+    (tipo, generación, dato) se leen con poll() desde el hilo de Tk.
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.events = queue.Queue()
+        self.generation = 0
+        self._current = None
+        self._pending = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="analysis-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, code, parser_kind, path=None):
+        """Encola un análisis (de code o del archivo path); cualquier petición anterior queda obsoleta"""
+        with self._condition:
+            if self._current is not None:
+                self._current.cancelled.set()
+            self.generation += 1
+            job = AnalysisJob(self.generation, code, parser_kind, self.events, path)
+            self._current = self._pending = job
+            self._condition.notify()
+        return job
+
+    def cancel(self):
+        """Cancela la petición actual (en curso o pendiente)"""
+        with self._condition:
+            if self._current is not None:
+                self._current.cancelled.set()
+
+    @property
+    def busy(self):
+        job = self._current
+        return job is not None and not job.cancelled.is_set()
+
+    def poll(self):
+        """Eventos recibidos desde la última llamada, sólo de la petición vigente"""
+        events = []
+        while True:
+            try:
+                kind, generation, data = self.events.get_nowait()
+            except queue.Empty:
+                return events
+            if generation == self.generation:
+                events.append((kind, data))
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                job, self._pending = self._pending, None
+            try:
+                job.check()
+                result = self.task(job)
+                # Un resultado que llega tarde se descarta igual que uno cancelado
+                job.check()
+            except AnalysisCancelled:
+                self.events.put(('cancelled', job.generation, None))
+            except Exception as e:
+                self.events.put(('error', job.generation, e))
+            else:
+                self.events.put(('done', job.generation, result))
+            finally:
+                with self._condition:
+                    if self._current is job:
+                        self._current = None
@@ -0,0 +1,124 @@
+# ast_arena.py
+# Representación plana ("arena") del AST en arreglos paralelos
+from array import array
+
+# Tipos de nodo que producen ambos parsers; otros tipos se agregan al vuelo
+NODE_TYPES = ('Program', 'StatementList', 'Assignment', 'IfStatement',
+              'DoLoop', 'BinOp', 'ID', 'Number')
+
+NO_INDEX = -1
+
+class ASTArena:
+    """
+    AST almacenado en arreglos paralelos indexados por número de nodo (preorden):
+
+    type_code[i]    código del tipo en self.types
+    value_index[i]  índice en self.values, o -1 si el nodo no tiene valor
+    first_child[i]  primer hijo, o -1 si es hoja
+    next_sibling[i] siguiente hermano, o -1 si es el último
+
+    Los valores repetidos (nombres de variables, operadores) se guardan una
+    sola vez. El nodo 0 es la raíz.
+    """
+
+    def __init__(self):
+        self.type_code = array('B')
+        self.value_index = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.types = list(NODE_TYPES)
+        self.values = []
+        self._type_ids = {name: code for code, name in enumerate(self.types)}
+        self._value_ids = None
+
+    def __len__(self):
+        return len(self.type_code)
+
+    def _type_id(self, name):
+        code = self._type_ids.get(name)
+        if code is None:
+            code = self._type_ids[name] = len(self.types)
+            self.types.append(name)
+        return code
+
+    def _value_id(self, value):
+        if value is None:
+            return NO_INDEX
+        if self._value_ids is None:
+            # Índice de deduplicación; se descarta al terminar from_tree
+            self._value_ids = {(v.__class__, v): i for i, v in enumerate(self.values)}
+        # 1 y 1.0 son iguales como clave de dict: se distinguen por su tipo
+        key = (value.__class__, value)
+        index = self._value_ids.get(key)
+        if index is None:
+            index = self._value_ids[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def add(self, type, value=None):
+        """Agrega un nodo sin enlazar y devuelve su índice"""
+        self.type_code.append(self._type_id(type))
+        self.value_index.append(self._value_id(value))
+        self.first_child.append(NO_INDEX)
+        self.next_sibling.append(NO_INDEX)
+        return len(self.type_code) - 1
+
+    # === CONSULTAS ===
+
+    def type_of(self, index):
+        return self.types[self.type_code[index]]
+
+    def value_of(self, index):
+        value_index = self.value_index[index]
+        return None if value_index == NO_INDEX else self.values[value_index]
+
+    def children_of(self, index):
+        """Índices de los hijos de un nodo, en orden"""
+        child = self.first_child[index]
+        while child != NO_INDEX:
+            yield child
+            child = self.next_sibling[child]
+
+    # === CONVERSIONES ===
+
+    @classmethod
+    def from_tree(cls, root):
+        """Construye la arena a partir de un árbol de Node (iterativo, en preorden)"""
+        arena = cls()
+        last_child = array('i')
+        stack = [(root, NO_INDEX)]
+        while stack:
+            node, parent = stack.pop()
+            index = arena.add(node.type, node.value)
+            last_child.append(NO_INDEX)
+            if parent != NO_INDEX:
+                if last_child[parent] == NO_INDEX:
+                    arena.first_child[parent] = index
+                else:
+                    arena.next_sibling[last_child[parent]] = index
+                last_child[parent] = index
+            children = node.children
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], index))
+        arena._value_ids = None
+        return arena
+
+    def to_tree(self, node_class=None):
+        """Reconstruye el árbol de Node equivalente y devuelve su raíz"""
+        if node_class is None:
+            from ll1_parser import Node as node_class
+        if not len(self):
+            return None
+        types, values = self.types, self.values
+        nodes = [node_class(types[code], None, None if value == NO_INDEX else values[value])
+                 for code, value in zip(self.type_code, self.value_index)]
+        first_child, next_sibling = self.first_child, self.next_sibling
+        for index, child in enumerate(first_child):
+            if child == NO_INDEX:
+                continue
+            children = []
+            while child != NO_INDEX:
+                children.append(nodes[child])
+                child = next_sibling[child]
+            nodes[index].children = children
+        return nodes[0]
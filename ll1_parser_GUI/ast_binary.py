@@ -0,0 +1,487 @@
+# ast_binary.py
+# Formato binario compacto del AST: tabla de cadenas, registros de nodo de
+# ancho fijo y un arreglo de índices de hijos. Se lee sobre un memoryview
+# (de bytes o de un mmap del archivo) sin reconstruir objetos Python: cada
+# nodo se decodifica recién cuando se accede a él.
+import gc
+import struct
+import sys
+from array import array
+
+from source_map import NodePositions, map_file
+
+# === FORMATO ===
+# Todo en little-endian. Secciones, en orden:
+#
+#   cabecera   HEADER (56 bytes)
+#   cadenas    string_count + 1 offsets u64 dentro de los datos, y los datos
+#              UTF-8 (tipos de nodo, identificadores, operadores, mensaje)
+#   nodos      node_count registros NODE de 28 bytes (WIDE_NODE de 36 con
+#              WIDE_SPANS), en preorden (el orden de ASTArena y
+#              NodePositions.to_preorder); alineados a 8
+#   hijos      node_count - 1 índices u32: los hijos de un nodo son
+#              children[first : first + count]
+#
+# Registro de nodo: tipo (índice de cadena) con la clase del valor en los 3
+# bits altos, cantidad de hijos, posición del primero en el arreglo de
+# hijos, valor (8 bytes según la clase) y offsets [inicio, fin) en el texto
+# (todos unos si no tiene posición). Los offsets son u32 salvo que el texto
+# llegue a 4 GiB (WIDE_SPANS: u64).
+#
+# Al abrir sólo se validan la cabecera y los límites de las secciones (no
+# se recorre el archivo); cada cadena, registro e índice de hijo se valida
+# al decodificarlo.
+MAGIC = b'F77A'
+VERSION = 2
+HEADER = struct.Struct('<4sHHIII4xQQQQ')
+NODE = struct.Struct('<IIIqII')
+WIDE_NODE = struct.Struct('<IIIqQQ')
+HAS_POSITIONS = 1
+WIDE_SPANS = 2
+NO_STRING = 0xFFFFFFFF
+NO_POSITION = {NODE: (1 << 32) - 1, WIDE_NODE: (1 << 64) - 1}
+KIND_SHIFT = 29
+TYPE_MASK = (1 << KIND_SHIFT) - 1
+
+# Clases de valor
+NONE, STRING, INT, FLOAT, BIG_INT = range(5)
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+def _little(values):
+    """array en little-endian para escribirlo tal cual"""
+    if not LITTLE_ENDIAN:
+        values.byteswap()
+    return values.tobytes()
+
+# === ESCRITURA ===
+
+class _WideSpans(Exception):
+    """Un offset no entra en u32: se vuelve a escribir con WIDE_NODE"""
+
+def dump(root, positions=None, message=None):
+    """
+    Serializa el árbol de root (Node de cualquiera de los parsers) y
+    devuelve los bytes. positions: NodePositions del árbol; message: texto
+    asociado (p. ej. el mensaje del análisis). Sin recursión.
+    """
+    try:
+        return _dump(root, positions, message, NODE)
+    except _WideSpans:
+        return _dump(root, positions, message, WIDE_NODE)
+
+def _dump(root, positions, message, node_struct):
+    strings, string_ids = [], {}
+    no_position = NO_POSITION[node_struct]
+
+    def intern(text):
+        index = string_ids.get(text)
+        if index is None:
+            index = string_ids[text] = len(strings)
+            strings.append(text)
+        return index
+
+    records = bytearray()
+    children = array('I')
+    pack = node_struct.pack
+    count = 0
+    stack = [(root, -1)] if root is not None else []
+    while stack:
+        node, slot = stack.pop()
+        index = count
+        count += 1
+        if slot >= 0:
+            children[slot] = index
+        value = node.value
+        # El valor ocupa un entero de 8 bytes: índice de cadena, el entero
+        # mismo o los bits del float
+        if value is None:
+            kind, raw = NONE, 0
+        elif isinstance(value, str):
+            kind, raw = STRING, intern(value)
+        elif isinstance(value, float):
+            kind, raw = FLOAT, _INT.unpack(_FLOAT.pack(value))[0]
+        elif isinstance(value, int):
+            if _INT_MIN <= value <= _INT_MAX:
+                kind, raw = INT, value
+            else:
+                kind, raw = BIG_INT, intern(str(value))
+        else:
+            raise TypeError(f"Valor de nodo no serializable: {value!r}")
+        node_children = node.children
+        first = len(children)
+        if node_children:
+            children.extend([0] * len(node_children))
+        span = positions.span(node) if positions is not None else None
+        if span is None:
+            start = end = no_position
+        else:
+            start, end = span
+            if end >= no_position:
+                raise _WideSpans()
+        type_index = intern(node.type)
+        if type_index > TYPE_MASK:
+            raise ValueError("Demasiadas cadenas distintas para el formato binario")
+        records += pack(type_index | kind << KIND_SHIFT, len(node_children), first, raw, start, end)
+        for k in range(len(node_children) - 1, -1, -1):
+            stack.append((node_children[k], first + k))
+
+    message_index = intern(message) if message is not None else NO_STRING
+    encoded = [text.encode('utf-8', 'surrogatepass') for text in strings]
+    offsets = array('Q', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    strings_at = HEADER.size
+    data_at = strings_at + 8 * len(offsets)
+    nodes_at = data_at + offsets[-1]
+    padding = -nodes_at % 8
+    nodes_at += padding
+    children_at = nodes_at + len(records)
+    flags = (HAS_POSITIONS if positions is not None else 0) | (WIDE_SPANS if node_struct is WIDE_NODE else 0)
+    header = HEADER.pack(MAGIC, VERSION, flags, count,
+                         len(strings), message_index, strings_at, data_at, nodes_at, children_at)
+    return b''.join([header, _little(offsets), *encoded, bytes(padding), records, _little(children)])
+
+def write(path, root, positions=None, message=None):
+    """Escribe dump(...) en path; devuelve el tamaño en bytes"""
+    data = dump(root, positions, message)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+# === LECTURA ===
+
+class BinaryAST:
+    """
+    AST serializado, leído sobre un buffer (bytes, bytearray, mmap) sin
+    copiarlo: las cadenas se decodifican y los registros se desempaquetan
+    al consultarlos. root devuelve un LazyNode con la interfaz de Node
+    (type, value, children) para recorrer el árbol sin materializarlo;
+    to_tree() reconstruye el árbol de Node completo y sus posiciones.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self._view = self._offsets = self._children = None
+        self._strings = {}
+        try:
+            self._check(memoryview(buffer))
+            self.message = self.string(self.message_index) if self.message_index != NO_STRING else None
+        except Exception:
+            # Sin vistas exportadas el dueño del buffer (open) puede cerrarlo
+            self._release()
+            raise
+
+    def _check(self, view):
+        """
+        Valida la cabecera y los límites de las secciones, sin recorrerlas:
+        un archivo corrupto se rechaza con ValueError en lugar de fallar más
+        adelante con IndexError o leyendo fuera de su sección. Las cadenas,
+        los registros y los índices de hijos se validan al decodificarlos
+        (string, record, LazyChildren y _build).
+        """
+        self._view = view
+        if len(view) < HEADER.size:
+            raise ValueError("No es un AST binario: archivo demasiado corto")
+        (magic, version, self.flags, self.node_count, self.string_count, self.message_index,
+         strings_at, data_at, nodes_at, children_at) = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("No es un AST binario: firma incorrecta")
+        if version != VERSION:
+            raise ValueError(f"Versión de AST binario no soportada: {version}")
+        self._node = WIDE_NODE if self.flags & WIDE_SPANS else NODE
+        self._no_position = NO_POSITION[self._node]
+        self.child_count = max(self.node_count - 1, 0)
+        children_end = children_at + 4 * self.child_count
+        if len(view) < children_end or nodes_at + self._node.size * self.node_count > children_at:
+            raise ValueError("AST binario truncado")
+        if not (strings_at >= HEADER.size and strings_at + 8 * (self.string_count + 1) <= data_at <= nodes_at
+                and nodes_at % 8 == 0 and children_at % 4 == 0):
+            raise ValueError("AST binario corrupto: secciones superpuestas")
+        if self.message_index != NO_STRING and self.message_index >= self.string_count:
+            raise ValueError("AST binario corrupto: mensaje fuera de la tabla de cadenas")
+        self._offsets = self._cast(view[strings_at:strings_at + 8 * (self.string_count + 1)], 'Q')
+        self._data_at = data_at
+        self._data_size = nodes_at - data_at
+        if self._offsets[0] != 0 or self._offsets[-1] > self._data_size:
+            raise ValueError("AST binario corrupto: tabla de cadenas")
+        self._nodes_at = nodes_at
+        self._children = self._cast(view[children_at:children_end], 'I')
+
+    def _release(self):
+        for view in (self._offsets, self._children, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._view = self._offsets = self._children = None
+
+    @staticmethod
+    def _cast(view, code):
+        if LITTLE_ENDIAN:
+            return view.cast(code)
+        values = array(code, view.tobytes())
+        values.byteswap()
+        return values
+
+    @classmethod
+    def open(cls, path):
+        """BinaryAST sobre un mmap del archivo (close() lo libera)"""
+        buffer = map_file(path)
+        try:
+            return cls(buffer)
+        except Exception:
+            if hasattr(buffer, 'close'):
+                buffer.close()
+            raise
+
+    @classmethod
+    def from_tree(cls, root, positions=None, message=None):
+        return cls(dump(root, positions, message))
+
+    def __len__(self):
+        return self.node_count
+
+    @property
+    def has_positions(self):
+        return bool(self.flags & HAS_POSITIONS)
+
+    def close(self):
+        """Suelta las vistas y cierra el mmap (los LazyNode dejan de servir)"""
+        if self._view is None:
+            return
+        self._release()
+        if hasattr(self.buffer, 'close'):
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # === CONSULTAS POR ÍNDICE ===
+
+    def string(self, index):
+        text = self._strings.get(index)
+        if text is None:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            if not start <= end <= self._data_size:
+                raise ValueError(f"AST binario corrupto: cadena {index}")
+            start += self._data_at
+            end += self._data_at
+            text = self._strings[index] = str(self._view[start:end], 'utf-8', 'surrogatepass')
+        return text
+
+    def record(self, index):
+        """(tipo, clase, hijos, primer hijo, valor crudo, inicio, fin) del nodo"""
+        if not 0 <= index < self.node_count:
+            raise IndexError(index)
+        node = self._node
+        word, count, first, raw, start, end = node.unpack_from(self._view, self._nodes_at + node.size * index)
+        type_index, kind = word & TYPE_MASK, word >> KIND_SHIFT
+        if (type_index >= self.string_count or kind > BIG_INT or first + count > self.child_count
+                or (kind in (STRING, BIG_INT) and not 0 <= raw < self.string_count)):
+            raise ValueError(f"AST binario corrupto: registro del nodo {index}")
+        if start == self._no_position:
+            start = end = -1
+        return type_index, kind, count, first, raw, start, end
+
+    def _value(self, kind, raw):
+        if kind == NONE:
+            return None
+        if kind == INT:
+            return raw
+        if kind == FLOAT:
+            return _FLOAT.unpack(_INT.pack(raw))[0]
+        text = self.string(raw)
+        return text if kind == STRING else int(text)
+
+    def type_of(self, index):
+        return self.string(self.record(index)[0])
+
+    def value_of(self, index):
+        record = self.record(index)
+        return self._value(record[1], record[4])
+
+    def children_of(self, index):
+        """Índices de los hijos del nodo, en orden"""
+        record = self.record(index)
+        indices = self._children[record[3]:record[3] + record[2]].tolist()
+        if indices and not (index < min(indices) and max(indices) < self.node_count):
+            raise ValueError(f"AST binario corrupto: hijos del nodo {index}")
+        return indices
+
+    def span_of(self, index):
+        """(inicio, fin) del nodo, o None si no tiene posición"""
+        start, end = self.record(index)[5:]
+        return None if start < 0 else (start, end)
+
+    def span(self, node):
+        """span de un LazyNode: con esto el BinaryAST sirve de positions para ast_export"""
+        return node.span if self.has_positions else None
+
+    @property
+    def root(self):
+        return LazyNode(self, 0) if self.node_count else None
+
+    # === MATERIALIZACIÓN ===
+
+    def to_tree(self, node_class=None, text=''):
+        """(raíz, NodePositions) con el árbol de Node completo; (None, posiciones vacías) si no hay nodos"""
+        if node_class is None:
+            from ll1_parser import Node as node_class
+        positions = NodePositions(text)
+        if not self.node_count:
+            return None, positions
+        # Millones de objetos nuevos disparan el recolector de ciclos una y otra
+        # vez sin nada que liberar: se pausa mientras se construye el árbol
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build(node_class, positions)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _build(self, node_class, positions):
+        # Todo de una pasada sobre los registros; las cadenas se decodifican una vez
+        strings = [self.string(index) for index in range(self.string_count)]
+        string_count, child_count = self.string_count, self.child_count
+        float_of = lambda bits: _FLOAT.unpack(_INT.pack(bits))[0]
+        record = positions.record
+        nodes = []
+        append = nodes.append
+        parents = []
+        node_struct, no_position = self._node, self._no_position
+        record_view = self._view[self._nodes_at:self._nodes_at + node_struct.size * self.node_count]
+        try:
+            for word, count, first, value, start, end in node_struct.iter_unpack(record_view):
+                type_index, kind = word & TYPE_MASK, word >> KIND_SHIFT
+                if kind == NONE:
+                    value = None
+                elif kind == INT:
+                    pass
+                elif kind == FLOAT:
+                    value = float_of(value)
+                elif kind not in (STRING, BIG_INT) or not 0 <= value < string_count:
+                    raise ValueError(f"AST binario corrupto: valor del nodo {len(nodes)}")
+                elif kind == STRING:
+                    value = strings[value]
+                else:
+                    value = int(strings[value])
+                if type_index >= string_count:
+                    raise ValueError(f"AST binario corrupto: tipo del nodo {len(nodes)}")
+                node = node_class(strings[type_index], None, value)
+                if count:
+                    if first + count > child_count:
+                        raise ValueError(f"AST binario corrupto: hijos del nodo {len(nodes)}")
+                    parents.append((node, len(nodes), first, first + count))
+                append(node)
+                if start != no_position:
+                    record(node, start, end)
+        finally:
+            record_view.release()
+        children = self._children.tolist()
+        if children and max(children) >= len(nodes):
+            raise ValueError("AST binario corrupto: hijo fuera de rango")
+        for node, index, first, stop in parents:
+            indices = children[first:stop]
+            # En preorden los hijos van después del padre: así un archivo
+            # alterado no puede formar ciclos
+            if min(indices) <= index:
+                raise ValueError(f"AST binario corrupto: hijos del nodo {index}")
+            node.children = [nodes[child] for child in indices]
+        return nodes[0], positions
+
+class LazyNode:
+    """
+    Nodo de un BinaryAST con la interfaz de lectura de Node: type, value y
+    children se leen del buffer en el primer acceso. No se registra en un
+    NodePositions (no tiene row): sus posiciones se consultan con span, o
+    con el BinaryAST como positions.
+    """
+    __slots__ = ('tree', 'index', '_record', '_children')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+        self._record = None
+        self._children = None
+
+    def _fields(self):
+        if self._record is None:
+            self._record = self.tree.record(self.index)
+        return self._record
+
+    @property
+    def type(self):
+        return self.tree.string(self._fields()[0])
+
+    @property
+    def value(self):
+        fields = self._fields()
+        return self.tree._value(fields[1], fields[4])
+
+    @property
+    def children(self):
+        if self._children is None:
+            fields = self._fields()
+            self._children = LazyChildren(self.tree, self.index, fields[3], fields[2])
+        return self._children
+
+    @property
+    def span(self):
+        start, end = self._fields()[5:]
+        return None if start < 0 else (start, end)
+
+    def __repr__(self):
+        value = self.value
+        return f"{self.type}({value})" if value else self.type
+
+class LazyChildren:
+    """
+    Hijos de un LazyNode como secuencia de sólo lectura: el LazyNode de
+    cada hijo se crea al indexarlo o recorrerlo, así elegir un hijo de una
+    lista de miles de sentencias no crea los demás.
+    """
+    __slots__ = ('tree', 'parent', 'first', 'count')
+
+    def __init__(self, tree, parent, first, count):
+        self.tree = tree
+        self.parent = parent    # índice del nodo dueño: sus hijos van después en preorden
+        self.first = first    # posición del primer hijo en el arreglo de hijos
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self.count))]
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        return self._child(self.tree._children[self.first + position])
+
+    def __iter__(self):
+        children = self.tree._children
+        for position in range(self.first, self.first + self.count):
+            yield self._child(children[position])
+
+    def _child(self, index):
+        # Un hijo anterior al padre sólo sale de un archivo alterado y formaría un ciclo
+        if not self.parent < index < self.tree.node_count:
+            raise ValueError(f"AST binario corrupto: hijos del nodo {self.parent}")
+        return LazyNode(self.tree, index)
+
+    def __repr__(self):
+        return repr(list(self))
+
+def load(path, node_class=None, text=''):
+    """Lee un archivo completo: (raíz, NodePositions, mensaje); el archivo queda cerrado"""
+    with BinaryAST.open(path) as tree:
+        root, positions = tree.to_tree(node_class, text)
+        return root, positions, tree.message
@@ -0,0 +1,447 @@
+# ast_export.py
+# Exportación e importación del AST en texto, en streaming: JSON anidado,
+# JSON Lines (un nodo por línea) y S-expresiones. Los exportadores recorren
+# el árbol con una pila explícita (sin límite de profundidad) y escriben al
+# archivo en trozos de chunk_size caracteres, así la memoria no depende del
+# tamaño del árbol; los importadores leen la entrada también en trozos.
+import argparse
+import json
+import re
+import sys
+from json.decoder import scanstring
+
+from source_map import NodePositions
+
+CHUNK_SIZE = 1 << 16
+
+# Formato de cada nodo (los mismos campos en los tres formatos):
+#   JSON anidado   {"type": "ID", "value": "X", "span": [0, 1], "children": [...]}
+#   JSON Lines     {"id": 3, "parent": 2, "type": "ID", "value": "X", "span": [0, 1]}
+#   S-expresión    (ID "X" :span 0 1 ...hijos)
+# span sólo aparece si se pasan posiciones; value es null (o falta en las
+# S-expresiones) si el nodo no tiene valor.
+
+class _Writer:
+    """Acumula pedazos de texto y los escribe en out cada chunk_size caracteres"""
+
+    def __init__(self, out, chunk_size):
+        self.out = out
+        self.chunk_size = chunk_size
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.out.write(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+
+# === EXPORTADORES ===
+# positions: NodePositions del árbol (o cualquier objeto con span(nodo),
+# como un ast_binary.BinaryAST para sus LazyNode)
+
+def write_json(root, out, positions=None, chunk_size=CHUNK_SIZE):
+    """JSON anidado del árbol en out (archivo de texto)"""
+    writer = _Writer(out, chunk_size)
+    dumps = json.dumps
+
+    def open_node(node):
+        text = f'{{"type": {dumps(node.type)}, "value": {dumps(node.value)}'
+        span = positions.span(node) if positions is not None else None
+        if span is not None:
+            text += f', "span": [{span[0]}, {span[1]}]'
+        writer.write(text + ', "children": [')
+
+    if root is None:
+        writer.write('null')
+    else:
+        open_node(root)
+        # Pila de [hijos, próximo índice]: un nivel por nodo abierto
+        stack = [[root.children, 0]]
+        while stack:
+            frame = stack[-1]
+            children, index = frame
+            if index == len(children):
+                stack.pop()
+                writer.write(']}')
+                continue
+            frame[1] = index + 1
+            if index:
+                writer.write(', ')
+            child = children[index]
+            open_node(child)
+            stack.append([child.children, 0])
+    writer.write('\n')
+    writer.flush()
+
+def write_json_lines(root, out, positions=None, chunk_size=CHUNK_SIZE):
+    """Un objeto JSON por nodo, en preorden, con su id y el id de su padre (-1 en la raíz)"""
+    writer = _Writer(out, chunk_size)
+    dumps = json.dumps
+    count = 0
+
+    def write_node(node, parent):
+        text = f'{{"id": {count}, "parent": {parent}, "type": {dumps(node.type)}, "value": {dumps(node.value)}'
+        span = positions.span(node) if positions is not None else None
+        if span is not None:
+            text += f', "span": [{span[0]}, {span[1]}]'
+        writer.write(text + '}\n')
+
+    if root is not None:
+        write_node(root, -1)
+        # Pila de [hijos, próximo índice, id del padre]
+        stack = [[root.children, 0, 0]]
+        count = 1
+        while stack:
+            frame = stack[-1]
+            children, index, parent = frame
+            if index == len(children):
+                stack.pop()
+                continue
+            frame[1] = index + 1
+            child = children[index]
+            write_node(child, parent)
+            stack.append([child.children, 0, count])
+            count += 1
+    writer.flush()
+
+def _atom(value):
+    """Valor de un nodo como átomo: cadenas entre comillas (escapes de JSON), números tal cual"""
+    if isinstance(value, str):
+        return json.dumps(value)
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def write_sexpr(root, out, positions=None, chunk_size=CHUNK_SIZE):
+    """S-expresión del árbol: (Tipo valor :span inicio fin hijos...)"""
+    writer = _Writer(out, chunk_size)
+
+    def open_node(node):
+        text = '(' + node.type
+        if node.value is not None:
+            text += ' ' + _atom(node.value)
+        span = positions.span(node) if positions is not None else None
+        if span is not None:
+            text += f' :span {span[0]} {span[1]}'
+        writer.write(text)
+
+    if root is not None:
+        open_node(root)
+        stack = [[root.children, 0]]
+        while stack:
+            frame = stack[-1]
+            children, index = frame
+            if index == len(children):
+                stack.pop()
+                writer.write(')')
+                continue
+            frame[1] = index + 1
+            child = children[index]
+            writer.write(' ')
+            open_node(child)
+            stack.append([child.children, 0])
+    writer.write('\n')
+    writer.flush()
+
+# === LECTURA EN TROZOS ===
+
+_ATOM = re.compile(r'[^\s()\[\]{},:"]+|:[^\s()"]+')
+
+class _Scanner:
+    """
+    Lectura de tokens sobre una entrada de texto leída de a chunk_size
+    caracteres: lo ya consumido se descarta, y un token cortado por el
+    fin del trozo se completa leyendo el siguiente.
+    """
+
+    def __init__(self, inp, chunk_size):
+        self.inp = inp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.line = 1    # líneas ya descartadas (para los mensajes de error)
+
+    def _fill(self):
+        """Lee un trozo más; False si la entrada terminó"""
+        if self.eof:
+            return False
+        chunk = self.inp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.line += self.buffer.count('\n', 0, self.pos)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message):
+        line = self.line + self.buffer.count('\n', 0, self.pos)
+        return ValueError(f"{message} (línea {line})")
+
+    def peek(self):
+        """Primer carácter significativo (salta espacios), o None al final de la entrada"""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return None
+
+    def advance(self):
+        self.pos += 1
+
+    def string(self):
+        """Cadena entre comillas (con los escapes de JSON) que empieza en pos"""
+        while True:
+            try:
+                text, end = scanstring(self.buffer, self.pos + 1)
+            except json.JSONDecodeError:
+                # Cortada por el fin del trozo (o mal formada si ya no hay más)
+                if self._fill():
+                    continue
+                raise self.error("Cadena sin cerrar")
+            self.pos = end
+            return text
+
+    def atom(self):
+        """Número, palabra o símbolo que empieza en pos"""
+        while True:
+            match = _ATOM.match(self.buffer, self.pos)
+            if (match is None or match.end() == len(self.buffer)) and self._fill():
+                continue
+            if match is None:
+                raise self.error(f"Carácter inesperado {self.buffer[self.pos]!r}")
+            self.pos = match.end()
+            return match.group()
+
+def _number(text, scanner):
+    try:
+        if any(char in text for char in '.eEn'):
+            return float(text)
+        return int(text)
+    except ValueError:
+        raise scanner.error(f"Número inválido {text!r}") from None
+
+def _make_node(node_class, fields, children, positions):
+    node = node_class(fields['type'], children or None, fields.get('value'))
+    span = fields.get('span')
+    if span is not None:
+        positions.record(node, span[0], span[1])
+    return node
+
+def _node_class(node_class):
+    if node_class is None:
+        from ll1_parser import Node as node_class
+    return node_class
+
+# === IMPORTADORES ===
+# Devuelven (raíz, NodePositions): los nodos se construyen de abajo hacia
+# arriba a medida que se cierran, sin recursión
+
+def read_json(inp, node_class=None, chunk_size=CHUNK_SIZE):
+    """Árbol de un JSON anidado (el de write_json) leído en trozos"""
+    node_class = _node_class(node_class)
+    positions = NodePositions()
+    scanner = _Scanner(inp, chunk_size)
+    # Marcos abiertos: [dict, clave pendiente] para objetos, [list] para arreglos
+    stack = []
+    result = []
+
+    def deliver(value):
+        if not stack:
+            result.append(value)
+        elif len(stack[-1]) == 1:
+            stack[-1][0].append(value)
+        else:
+            frame = stack[-1]
+            if frame[1] is None:
+                raise scanner.error("Se esperaba una clave")
+            frame[0][frame[1]] = value
+            frame[1] = None
+
+    while True:
+        char = scanner.peek()
+        if char is None:
+            break
+        if char == '{':
+            scanner.advance()
+            stack.append([{}, None])
+        elif char == '[':
+            scanner.advance()
+            stack.append([[]])
+        elif char in '}]':
+            scanner.advance()
+            if not stack or (char == '}') != (len(stack[-1]) == 2):
+                raise scanner.error(f"{char!r} inesperado")
+            frame = stack.pop()
+            value = frame[0]
+            if char == '}' and 'type' in value:
+                value = _make_node(node_class, value, value.get('children'), positions)
+            deliver(value)
+        elif char in ',:':
+            scanner.advance()
+        elif char == '"':
+            text = scanner.string()
+            if stack and len(stack[-1]) == 2 and stack[-1][1] is None:
+                stack[-1][1] = text
+            else:
+                deliver(text)
+        else:
+            word = scanner.atom()
+            if word in ('true', 'false', 'null'):
+                deliver({'true': True, 'false': False, 'null': None}[word])
+            else:
+                deliver(_number(word, scanner))
+    if stack:
+        raise scanner.error("Fin inesperado de la entrada")
+    root = result[0] if result else None
+    if root is not None and not hasattr(root, 'children'):
+        raise ValueError("La entrada no es un AST")
+    return root, positions
+
+def iter_json_lines(inp):
+    """Registros (dicts) de un archivo de write_json_lines, de a uno y sin armar el árbol"""
+    for line in inp:
+        if line.strip():
+            yield json.loads(line)
+
+def read_json_lines(inp, node_class=None):
+    """
+    Árbol de un archivo de write_json_lines. Como los nodos vienen en
+    preorden, el padre de cada uno está en el camino abierto desde la raíz:
+    sólo se guarda ese camino y no un índice de todos los ids.
+    """
+    node_class = _node_class(node_class)
+    positions = NodePositions()
+    path = []    # [(id, nodo, hijos)] desde la raíz hasta el último nodo leído
+    root = None
+    for record in iter_json_lines(inp):
+        children = []
+        node = _make_node(node_class, record, None, positions)
+        node.children = children
+        parent = record.get('parent', -1)
+        while path and path[-1][0] != parent:
+            _close(path.pop())
+        if path:
+            path[-1][2].append(node)
+        elif root is None and parent == -1:
+            root = node
+        else:
+            raise ValueError(f"Nodo {record.get('id')} con padre {parent} fuera de preorden")
+        path.append((record['id'], node, children))
+    while path:
+        _close(path.pop())
+    return root, positions
+
+def _close(entry):
+    """Un nodo que terminó sin hijos vuelve a la tupla vacía compartida de las hojas"""
+    if not entry[2]:
+        entry[1].children = ()
+
+def read_sexpr(inp, node_class=None, chunk_size=CHUNK_SIZE):
+    """Árbol de una S-expresión (la de write_sexpr) leída en trozos"""
+    node_class = _node_class(node_class)
+    positions = NodePositions()
+    scanner = _Scanner(inp, chunk_size)
+    stack = []    # [campos, hijos] de cada nodo abierto
+    root = None
+    while True:
+        char = scanner.peek()
+        if char is None:
+            break
+        if char == '(':
+            scanner.advance()
+            if scanner.peek() in (None, '(', ')', '"'):
+                raise scanner.error("Se esperaba el tipo del nodo")
+            stack.append([{'type': scanner.atom()}, []])
+        elif char == ')':
+            scanner.advance()
+            if not stack:
+                raise scanner.error("')' inesperado")
+            fields, children = stack.pop()
+            node = _make_node(node_class, fields, children, positions)
+            if stack:
+                stack[-1][1].append(node)
+            elif root is None:
+                root = node
+            else:
+                raise scanner.error("Más de un árbol en la entrada")
+        elif not stack:
+            raise scanner.error(f"Se esperaba '(' y no {char!r}")
+        elif char == '"':
+            stack[-1][0]['value'] = scanner.string()
+        else:
+            word = scanner.atom()
+            if word == ':span':
+                if scanner.peek() in (None, '(', ')', '"'):
+                    raise scanner.error("Se esperaban los offsets de :span")
+                start = _number(scanner.atom(), scanner)
+                if scanner.peek() in (None, '(', ')', '"'):
+                    raise scanner.error("Se esperaban los offsets de :span")
+                end = _number(scanner.atom(), scanner)
+                stack[-1][0]['span'] = (start, end)
+            else:
+                stack[-1][0]['value'] = _number(word, scanner)
+    if stack:
+        raise scanner.error("Fin inesperado de la entrada: falta ')'")
+    return root, positions
+
+EXPORTERS = {'json': write_json, 'jsonl': write_json_lines, 'sexpr': write_sexpr}
+IMPORTERS = {'json': read_json, 'jsonl': read_json_lines, 'sexpr': read_sexpr}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporta el AST de un programa Fortran77 (o de un archivo de ast_binary) como texto")
+    parser.add_argument('path', help="programa .f/.for/.f77, o un AST binario .ast")
+    parser.add_argument('--format', choices=list(EXPORTERS), default='json')
+    parser.add_argument('--parser', choices=['lalr', 'll1'], default='ll1')
+    parser.add_argument('--no-positions', action='store_true', help="sin los offsets de cada nodo")
+    parser.add_argument('-o', '--output', help="archivo de salida (por defecto stdout)")
+    args = parser.parse_args(argv)
+
+    tree = None
+    if args.path.endswith('.ast'):
+        # Directo desde el mmap: los nodos se decodifican a medida que se escriben
+        from ast_binary import BinaryAST
+        tree = BinaryAST.open(args.path)
+        root, positions = tree.root, tree if tree.has_positions else None
+    else:
+        if args.parser == 'll1':
+            from ll1_parser import FortranLL1Analyzer as Analyzer
+        else:
+            from fortran_analyzer import FortranAnalyzer as Analyzer
+        analyzer = Analyzer()
+        stdout, sys.stdout = sys.stdout, sys.stderr    # los errores del análisis no se mezclan con la salida
+        try:
+            success, message = analyzer.analyze_path(args.path)
+        finally:
+            sys.stdout = stdout
+        if analyzer.ast is None:
+            print(message, file=sys.stderr)
+            return 1
+        root, positions = analyzer.ast, analyzer.positions
+    if args.no_positions:
+        positions = None
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        EXPORTERS[args.format](root, out, positions)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if tree is not None:
+            tree.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# ast_layout.py
+# Disposición del AST para dibujarlo directamente en un Canvas de Tk:
+# algoritmo de Reingold–Tilford (versión lineal de Buchheim et al.), sin
+# recursión, con subárboles colapsables y consulta de nodos visibles
+from bisect import bisect_left, bisect_right
+
+# Presupuesto de nodos que se muestran expandidos al cargar un árbol
+INITIAL_BUDGET = 1500
+
+class LayoutNode:
+    """Nodo del AST en la vista; sus hijos se crean al expandirlo por primera vez"""
+    __slots__ = ('node', 'parent', 'number', 'depth', 'collapsed', '_children',
+                 'prelim', 'mod', 'shift', 'change', 'thread', 'ancestor', 'midpoint', 'x')
+
+    def __init__(self, node, parent=None, number=0):
+        self.node = node
+        self.parent = parent
+        self.number = number
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.collapsed = True
+        self._children = None
+        self.x = 0.0
+
+    @property
+    def has_children(self):
+        return bool(self.node.children)
+
+    @property
+    def children(self):
+        """Hijos creados bajo demanda (todos, estén o no visibles)"""
+        if self._children is None:
+            self._children = [LayoutNode(child, self, i) for i, child in enumerate(self.node.children)]
+        return self._children
+
+    def visible_children(self):
+        return () if self.collapsed or not self.node.children else self.children
+
+    @property
+    def label(self):
+        if self.node.value is None:
+            return self.node.type
+        return f"{self.node.type}\n{self.node.value}"
+
+class TreeLayout:
+    """
+    Posiciones (x en unidades de separación entre hermanos, y = profundidad)
+    de los nodos visibles del árbol, agrupados por nivel y ordenados por x
+    para consultar rápido qué nodos y aristas caen en una ventana.
+    """
+
+    def __init__(self, ast, budget=INITIAL_BUDGET):
+        self.root = LayoutNode(ast)
+        self.levels = []
+        self.expand_initial(budget)
+        self.layout()
+
+    # === EXPANSIÓN ===
+
+    def expand_initial(self, budget):
+        """Expande por niveles (en anchura) mientras no se supere el presupuesto de nodos"""
+        shown = 1
+        frontier = [self.root]
+        while frontier:
+            next_frontier = []
+            for item in frontier:
+                count = len(item.node.children)
+                if count and shown + count > budget:
+                    return
+                if count:
+                    item.collapsed = False
+                    shown += count
+                    next_frontier.extend(item.children)
+            frontier = next_frontier
+
+    def toggle(self, item):
+        """Colapsa o expande un nodo y recalcula la disposición"""
+        if item.has_children:
+            item.collapsed = not item.collapsed
+            self.layout()
+
+    def expand_all(self, item=None):
+        """Expande todo el subárbol de item (por defecto, el árbol completo)"""
+        stack = [item or self.root]
+        while stack:
+            current = stack.pop()
+            if current.has_children:
+                current.collapsed = False
+                stack.extend(current.children)
+        self.layout()
+
+    # === REINGOLD–TILFORD ===
+
+    def layout(self):
+        order = self._postorder()
+        for v in order:
+            v.prelim = v.mod = v.shift = v.change = v.midpoint = 0.0
+            v.thread = None
+            v.ancestor = v
+        # Primer recorrido (postorden): cada nodo coloca y separa a sus hijos
+        for v in order:
+            children = v.visible_children()
+            if not children:
+                continue
+            default_ancestor = children[0]
+            for w in children:
+                self._place(w, children)
+                default_ancestor = self._apportion(w, children, default_ancestor)
+            self._execute_shifts(children)
+            v.midpoint = (children[0].prelim + children[-1].prelim) / 2
+        self.root.prelim = self.root.midpoint
+
+        # Segundo recorrido (preorden): x definitiva = prelim + suma de mods de los ancestros
+        self.levels = []
+        stack = [(self.root, 0.0)]
+        min_x = float('inf')
+        while stack:
+            v, m = stack.pop()
+            v.x = v.prelim + m
+            min_x = min(min_x, v.x)
+            if v.depth == len(self.levels):
+                self.levels.append([])
+            self.levels[v.depth].append(v)
+            children = v.visible_children()
+            for w in reversed(children):
+                stack.append((w, m + v.mod))
+        for level in self.levels:
+            level.sort(key=lambda item: item.x)
+            for item in level:
+                item.x -= min_x
+        self._index_levels()
+
+    def _postorder(self):
+        order = []
+        stack = [self.root]
+        while stack:
+            v = stack.pop()
+            order.append(v)
+            stack.extend(v.visible_children())
+        order.reverse()
+        return order
+
+    @staticmethod
+    def _place(w, siblings):
+        """Posición preliminar de w respecto de su hermano izquierdo"""
+        if w.number > 0:
+            w.prelim = siblings[w.number - 1].prelim + 1
+            if w.visible_children():
+                w.mod = w.prelim - w.midpoint
+        else:
+            w.prelim = w.midpoint
+
+    @staticmethod
+    def _next_left(v):
+        children = v.visible_children()
+        return children[0] if children else v.thread
+
+    @staticmethod
+    def _next_right(v):
+        children = v.visible_children()
+        return children[-1] if children else v.thread
+
+    def _apportion(self, v, siblings, default_ancestor):
+        """Separa el subárbol de v de los de sus hermanos izquierdos (contornos enhebrados)"""
+        if v.number == 0:
+            return default_ancestor
+        next_left, next_right = self._next_left, self._next_right
+        vip = vop = v
+        vim = siblings[v.number - 1]
+        vom = siblings[0]
+        sip, sop, sim, som = vip.mod, vop.mod, vim.mod, vom.mod
+        while next_right(vim) is not None and next_left(vip) is not None:
+            vim = next_right(vim)
+            vip = next_left(vip)
+            vom = next_left(vom)
+            vop = next_right(vop)
+            vop.ancestor = v
+            shift = (vim.prelim + sim) - (vip.prelim + sip) + 1
+            if shift > 0:
+                ancestor = vim.ancestor if vim.ancestor.parent is v.parent else default_ancestor
+                self._move_subtree(ancestor, v, shift)
+                sip += shift
+                sop += shift
+            sim += vim.mod
+            sip += vip.mod
+            som += vom.mod
+            sop += vop.mod
+        if next_right(vim) is not None and next_right(vop) is None:
+            vop.thread = next_right(vim)
+            vop.mod += sim - sop
+        if next_left(vip) is not None and next_left(vom) is None:
+            vom.thread = next_left(vip)
+            vom.mod += sip - som
+            default_ancestor = v
+        return default_ancestor
+
+    @staticmethod
+    def _move_subtree(wm, wp, shift):
+        subtrees = wp.number - wm.number
+        wp.change -= shift / subtrees
+        wp.shift += shift
+        wm.change += shift / subtrees
+        wp.prelim += shift
+        wp.mod += shift
+
+    @staticmethod
+    def _execute_shifts(children):
+        shift = change = 0.0
+        for w in reversed(children):
+            w.prelim += shift
+            w.mod += shift
+            change += w.change
+            shift += w.shift + change
+
+    # === CONSULTAS ===
+
+    def _index_levels(self):
+        # Por nivel: x de cada nodo y extensión horizontal de las aristas hacia
+        # sus hijos; ambas secuencias quedan ordenadas, así que se usa bisect
+        self.level_xs = []
+        self.edge_lefts = []
+        self.edge_rights = []
+        for level in self.levels:
+            self.level_xs.append([item.x for item in level])
+            lefts, rights = [], []
+            for item in level:
+                children = item.visible_children()
+                if children:
+                    lefts.append(min(item.x, children[0].x))
+                    rights.append(max(item.x, children[-1].x))
+                else:
+                    lefts.append(item.x)
+                    rights.append(item.x)
+            self.edge_lefts.append(lefts)
+            self.edge_rights.append(rights)
+
+    @property
+    def width(self):
+        return max((xs[-1] for xs in self.level_xs), default=0.0)
+
+    @property
+    def height(self):
+        return len(self.levels) - 1
+
+    def visible(self, x0, x1, y0, y1):
+        """Nodos dentro del rectángulo (en unidades de la disposición)"""
+        for depth in range(max(0, int(y0)), min(len(self.levels) - 1, int(y1) + 1) + 1):
+            xs = self.level_xs[depth]
+            yield from self.levels[depth][bisect_left(xs, x0):bisect_right(xs, x1)]
+
+    def visible_edges(self, x0, x1, y0, y1):
+        """Pares (padre, hijo) cuyas aristas pueden cruzar el rectángulo"""
+        for depth in range(max(0, int(y0) - 1), min(len(self.levels) - 1, int(y1) + 1)):
+            start = bisect_left(self.edge_rights[depth], x0)
+            stop = bisect_right(self.edge_lefts[depth], x1)
+            below, xs_below = self.levels[depth + 1], self.level_xs[depth + 1]
+            for parent in self.levels[depth][start:stop]:
+                children = parent.visible_children()
+                if not children:
+                    continue
+                # Sólo los hijos dentro de la ventana y uno más a cada lado
+                # (los hijos de un nodo son contiguos en el nivel inferior)
+                first = bisect_left(xs_below, children[0].x)
+                last = first + len(children)
+                lo = max(first, bisect_left(xs_below, x0, first, last) - 1)
+                hi = min(last, bisect_right(xs_below, x1, first, last) + 1)
+                for child in below[lo:hi]:
+                    yield parent, child
+
+    def node_at(self, x, y, half_width, half_height):
+        """Nodo cuya caja (centrada en su posición) contiene el punto, o None"""
+        depth = round(y)
+        if not 0 <= depth < len(self.levels) or abs(y - depth) > half_height:
+            return None
+        xs = self.level_xs[depth]
+        index = bisect_left(xs, x - half_width)
+        if index < len(xs) and abs(xs[index] - x) <= half_width:
+            return self.levels[depth][index]
+        return None
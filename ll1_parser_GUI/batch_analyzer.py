@@ -0,0 +1,204 @@
+# batch_analyzer.py
+# Análisis por lotes de archivos Fortran77 con un pool de procesos
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+FORTRAN_EXTENSIONS = ('.f', '.for', '.f77')
+
+# Analizador del proceso trabajador (uno por proceso, creado en init_worker)
+_analyzer = None
+_parser_kind = None
+_ast_dir = None
+
+class CountingLexer:
+    """Envuelve un lexer PLY y cuenta los tokens que entrega al parser LALR"""
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.count = 0
+
+    def input(self, data):
+        self.count = 0
+        self.lexer.lineno = 1
+        self.lexer.input(data)
+
+    def token(self):
+        tok = self.lexer.token()
+        if tok is not None:
+            self.count += 1
+        return tok
+
+    # lexerrorf y lineno los usa el lexer envuelto: se asignan en él y no en el envoltorio
+    @property
+    def lexerrorf(self):
+        return self.lexer.lexerrorf
+
+    @lexerrorf.setter
+    def lexerrorf(self, function):
+        self.lexer.lexerrorf = function
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    @lineno.setter
+    def lineno(self, value):
+        self.lexer.lineno = value
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+def collect_files(patterns):
+    """Expande directorios (recursivamente), globs y rutas a la lista de archivos Fortran"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(FORTRAN_EXTENSIONS))
+        elif os.path.isfile(pattern):
+            files.append(pattern)
+        else:
+            files.extend(path for path in sorted(glob.glob(pattern, recursive=True))
+                         if os.path.isfile(path))
+    # Quitar duplicados conservando el orden
+    return list(dict.fromkeys(files))
+
+def create_analyzer(parser_kind, cache_dir=None, lexer_backend='ply'):
+    """Crea el analizador pedido ('lalr' o 'll1'), con cache en disco opcional"""
+    cache = None
+    if cache_dir:
+        from parse_cache import ParseCache
+        cache = ParseCache(directory=cache_dir)
+    if parser_kind == 'll1':
+        from ll1_parser import FortranLL1Analyzer
+        return FortranLL1Analyzer(cache=cache, lexer_backend=lexer_backend)
+    from fortran_analyzer import FortranAnalyzer
+    analyzer = FortranAnalyzer(cache=cache, lexer_backend=lexer_backend)
+    analyzer.lexer = CountingLexer(analyzer.lexer)
+    return analyzer
+
+def init_worker(parser_kind, cache_dir=None, lexer_backend='ply', ast_dir=None):
+    """Inicializador del pool: un analizador por proceso trabajador"""
+    global _analyzer, _parser_kind, _ast_dir
+    _parser_kind = parser_kind
+    _analyzer = create_analyzer(parser_kind, cache_dir, lexer_backend)
+    _ast_dir = ast_dir
+
+def cache_hits(analyzer):
+    if analyzer.cache is None:
+        return 0
+    return analyzer.cache.hits + analyzer.cache.disk_hits
+
+def token_count(analyzer):
+    if _parser_kind == 'll1':
+        return len(analyzer.parser.tokens)
+    return analyzer.lexer.count
+
+def ast_file(ast_dir, path):
+    """Archivo del AST binario de path: nombre del fuente más un hash de la ruta completa"""
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+    return os.path.join(ast_dir, f"{os.path.basename(path)}-{digest}.ast")
+
+def analyze_file(path):
+    """Analiza un archivo en el proceso actual y devuelve su resultado como dict"""
+    result = {'file': path, 'parser': _parser_kind}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            code = f.read()
+    except OSError as e:
+        result.update(ok=False, message=f"No se pudo leer el archivo: {e}", tokens=0,
+                      seconds=0.0, cached=False, diagnostics=[], output=[])
+        return result
+
+    # Los analizadores informan errores con print(); se capturan por archivo
+    output = io.StringIO()
+    _analyzer.ast = None
+    hits = cache_hits(_analyzer)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        success, message = _analyzer.analyze(code)
+    elapsed = time.perf_counter() - start
+    # Un acierto de cache no pasa por el lexer: no aporta tokens
+    cached = cache_hits(_analyzer) > hits
+
+    # Ambos analizadores se recuperan de los errores y dejan un AST parcial:
+    # el resultado es correcto sólo si no hubo diagnósticos
+    messages = output.getvalue().splitlines()
+    diagnostics = [d.as_dict() for d in _analyzer.diagnostics]
+    result.update(ok=bool(success and not diagnostics), message=message,
+                  tokens=0 if cached else token_count(_analyzer),
+                  seconds=round(elapsed, 6), cached=cached, diagnostics=diagnostics,
+                  output=messages)
+    if _ast_dir and _analyzer.ast is not None:
+        # AST (parcial si hubo errores) en el formato binario de ast_binary
+        import ast_binary
+        result['ast_file'] = ast_file(_ast_dir, path)
+        ast_binary.write(result['ast_file'], _analyzer.ast, _analyzer.positions, message)
+    return result
+
+def run_batch(files, parser_kind, workers, chunksize=16, cache_dir=None, lexer_backend='ply', ast_dir=None):
+    """Genera los resultados de cada archivo (en orden de término si hay pool)"""
+    if ast_dir:
+        os.makedirs(ast_dir, exist_ok=True)
+    if workers <= 1:
+        init_worker(parser_kind, cache_dir, lexer_backend, ast_dir)
+        for path in files:
+            yield analyze_file(path)
+        return
+    with Pool(processes=workers, initializer=init_worker,
+              initargs=(parser_kind, cache_dir, lexer_backend, ast_dir)) as pool:
+        yield from pool.imap_unordered(analyze_file, files, chunksize=chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analiza muchos archivos Fortran77 en paralelo y emite JSON Lines")
+    parser.add_argument('paths', nargs='+', help="archivos, directorios o globs (ej. 'src/**/*.f77')")
+    parser.add_argument('--parser', choices=['lalr', 'll1'], default='lalr')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="procesos trabajadores (1 = sin pool)")
+    parser.add_argument('-o', '--output', help="archivo JSON Lines de salida (por defecto stdout)")
+    parser.add_argument('--chunksize', type=int, default=16, help="archivos por envío a cada trabajador")
+    parser.add_argument('--cache-dir', help="directorio de cache de ASTs compartido entre corridas")
+    parser.add_argument('--lexer', choices=['ply', 'dfa'], default='ply',
+                        help="lexer: PLY o el autómata en tablas de dfa_lexer.py")
+    parser.add_argument('--ast-dir', help="directorio donde guardar el AST binario de cada archivo (ver ast_binary.py)")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    if not files:
+        print("No se encontraron archivos Fortran (.f, .for, .f77)", file=sys.stderr)
+        return 2
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total_tokens = failed = cached = 0
+    start = time.perf_counter()
+    try:
+        for result in run_batch(files, args.parser, args.workers, args.chunksize, args.cache_dir, args.lexer,
+                                args.ast_dir):
+            total_tokens += result['tokens']
+            failed += not result['ok']
+            cached += result['cached']
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"=== RESUMEN ({args.parser.upper()}, {args.workers} procesos) ===\n"
+          f"Archivos: {len(files)}  correctos: {len(files) - failed}  con errores: {failed}  "
+          f"desde cache: {cached}\n"
+          f"Tiempo: {elapsed:.2f} s  |  {len(files) / elapsed:.1f} archivos/s  |  "
+          f"{total_tokens / elapsed:.0f} tokens/s", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# bench_ast_binary.py
+# Formato binario del AST (ast_binary.py) contra el pickle de ASTArena que
+# usaba la cache en disco: tamaño, tiempo de escritura, tiempo de lectura
+# completa (árbol de Node y posiciones) y tiempo hasta leer un nodo
+# cualquiera sobre el mmap sin materializar el árbol
+import argparse
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ast_binary
+from ast_arena import ASTArena
+from ll1_parser import LL1Parser, Node
+from source_map import NodePositions
+from test_generator import FortranTestGenerator
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def pickle_dump(ast, positions):
+    starts, ends = positions.to_preorder(ast)
+    return pickle.dumps(("", ASTArena.from_tree(ast), starts, ends), protocol=pickle.HIGHEST_PROTOCOL)
+
+def pickle_load(data):
+    _, arena, starts, ends = pickle.loads(data)
+    ast = arena.to_tree(Node)
+    return ast, NodePositions.from_preorder(ast, starts, ends)
+
+def random_node(tree, rng):
+    """Baja desde la raíz eligiendo hijos al azar hasta una hoja; devuelve (nodo, profundidad)"""
+    node, depth = tree.root, 0
+    while node.children:
+        node = rng.choice(node.children)
+        depth += 1
+    return node, depth
+
+def main():
+    parser = argparse.ArgumentParser(description="AST binario contra pickle de ASTArena")
+    parser.add_argument('--statements', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1148)
+    args = parser.parse_args()
+
+    code = FortranTestGenerator(args.seed, max_nesting=3).generate_program(args.statements)
+    ll1 = LL1Parser()
+    ast = ll1.parse(code)
+    positions = ll1.positions
+    print(f"=== {args.statements} sentencias, {len(positions)} nodos ===")
+
+    binary, binary_dump = timed(lambda: ast_binary.dump(ast, positions))
+    pickled, pickle_time = timed(lambda: pickle_dump(ast, positions))
+    _, binary_load = timed(lambda: ast_binary.BinaryAST(binary).to_tree())
+    _, pickle_read = timed(lambda: pickle_load(pickled))
+    print(f"{'formato':10s} {'tamaño MB':>10s} {'escritura s':>12s} {'lectura s':>10s}")
+    print(f"{'binario':10s} {len(binary) / 1e6:10.2f} {binary_dump:12.3f} {binary_load:10.3f}")
+    print(f"{'pickle':10s} {len(pickled) / 1e6:10.2f} {pickle_time:12.3f} {pickle_read:10.3f}")
+
+    # Acceso perezoso sobre un mmap: sólo se decodifican los nodos del camino
+    path = os.path.join(tempfile.mkdtemp(), 'bench.ast')
+    with open(path, 'wb') as f:
+        f.write(binary)
+    rng = random.Random(args.seed)
+    (tree, opened) = timed(lambda: ast_binary.BinaryAST.open(path))
+    with tree:
+        (node, depth), first = timed(lambda: random_node(tree, rng))
+        _, again = timed(lambda: [random_node(tree, rng) for _ in range(100)])
+    os.remove(path)
+    print(f"mmap: apertura {opened * 1e3:.3f} ms, primer nodo al azar (profundidad {depth}) "
+          f"{first * 1e3:.3f} ms, siguientes {again / 100 * 1e3:.3f} ms")
+
+if __name__ == "__main__":
+    main()
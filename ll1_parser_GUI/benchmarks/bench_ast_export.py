@@ -0,0 +1,90 @@
+# bench_ast_export.py
+# Exportadores en streaming de ast_export.py contra json.dumps sobre dicts
+# anidados: tiempo, tamaño y pico de memoria (tracemalloc) al escribir a un
+# archivo, tiempo de lectura de cada formato, y un árbol de profundidad
+# mayor que el límite de recursión, donde json.dumps falla
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ast_export
+from ll1_parser import LL1Parser, Node
+from test_generator import FortranTestGenerator
+
+def to_dicts(node, positions):
+    """Conversión recursiva ingenua: la que reemplazan los exportadores"""
+    item = {'type': node.type, 'value': node.value}
+    span = positions.span(node) if positions is not None else None
+    if span is not None:
+        item['span'] = list(span)
+    item['children'] = [to_dicts(child, positions) for child in node.children]
+    return item
+
+def naive(root, out, positions=None):
+    out.write(json.dumps(to_dicts(root, positions)) + '\n')
+
+def measure(function):
+    """(resultado, segundos, pico de memoria en MB) de function()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportación del AST en streaming contra json.dumps")
+    parser.add_argument('--statements', type=int, default=20000)
+    parser.add_argument('--depth', type=int, default=100000, help="profundidad del árbol degenerado")
+    parser.add_argument('--seed', type=int, default=1148)
+    args = parser.parse_args()
+
+    code = FortranTestGenerator(args.seed, max_nesting=3).generate_program(args.statements)
+    ll1 = LL1Parser()
+    ast = ll1.parse(code)
+    positions = ll1.positions
+    path = os.path.join(tempfile.mkdtemp(), 'ast.txt')
+    print(f"=== {args.statements} sentencias, {len(positions)} nodos ===")
+    print(f"{'formato':14s} {'tamaño MB':>10s} {'escritura s':>12s} {'pico MB':>8s} {'lectura s':>10s}")
+
+    exporters = [('json.dumps', naive, None)] + [
+        (name, ast_export.EXPORTERS[name], ast_export.IMPORTERS[name]) for name in ast_export.EXPORTERS]
+    for name, exporter, importer in exporters:
+        with open(path, 'w', encoding='utf-8') as out:
+            _, written, peak = measure(lambda: exporter(ast, out, positions))
+        read = ''
+        if importer is not None:
+            with open(path, 'r', encoding='utf-8') as inp:
+                start = time.perf_counter()
+                importer(inp)
+                read = f"{time.perf_counter() - start:10.3f}"
+        print(f"{name:14s} {os.path.getsize(path) / 1e6:10.2f} {written:12.3f} {peak:8.2f} {read:>10s}")
+
+    # Árbol degenerado: una cadena de nodos unarios
+    deep = Node('Number', None, 1)
+    for _ in range(args.depth):
+        deep = Node('UnaryMinus', [deep])
+    print(f"=== cadena de {args.depth} nodos (límite de recursión {sys.getrecursionlimit()}) ===")
+    for name, exporter, importer in exporters:
+        try:
+            with open(path, 'w', encoding='utf-8') as out:
+                _, written, peak = measure(lambda: exporter(deep, out))
+            if importer is not None:
+                with open(path, 'r', encoding='utf-8') as inp:
+                    importer(inp)
+            print(f"{name:14s} escritura {written:.3f} s, pico {peak:.2f} MB, lectura correcta")
+        except RecursionError:
+            print(f"{name:14s} RecursionError")
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench_ast_memory.py
+# Memoria de un AST de ~1M nodos (medida con tracemalloc) en tres formas:
+# Node con __dict__ (versión anterior), Node con __slots__ y ASTArena.
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ast_arena import ASTArena
+from ll1_parser import Node
+
+class DictNode:
+    """Node tal como era antes: __dict__ por instancia y lista de hijos siempre"""
+    def __init__(self, type, children=None, value=None):
+        self.type = type
+        self.children = children if children is not None else []
+        self.value = value
+
+def build_tree(node_class, statements):
+    """Árbol como el de los parsers: `statements` asignaciones Xi = Xi + i (5 nodos c/u)"""
+    body = []
+    for i in range(statements):
+        name = f"X{i % 1000}"
+        expr = node_class('BinOp', [node_class('ID', value=name), node_class('Number', value=i)], value='+')
+        body.append(node_class('Assignment', [node_class('ID', value=name), expr]))
+    return node_class('Program', [node_class('StatementList', body)])
+
+def traced(build):
+    """Ejecuta build() y devuelve (resultado, bytes retenidos, segundos)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria del AST: __dict__ vs __slots__ vs arena")
+    parser.add_argument('--nodes', type=int, default=1000000)
+    args = parser.parse_args()
+    statements = max(1, (args.nodes - 2) // 5)
+
+    tree, dict_bytes, dict_time = traced(lambda: build_tree(DictNode, statements))
+    del tree
+    tree, slots_bytes, slots_time = traced(lambda: build_tree(Node, statements))
+    arena, arena_bytes, arena_time = traced(lambda: ASTArena.from_tree(tree))
+
+    start = time.perf_counter()
+    rebuilt = arena.to_tree(Node)
+    back_time = time.perf_counter() - start
+    assert len(ASTArena.from_tree(rebuilt)) == len(arena) == statements * 5 + 2
+
+    print(f"Nodos: {len(arena)}")
+    print(f"{'forma':24s} {'MiB':>9s} {'bytes/nodo':>11s} {'vs __dict__':>12s} {'tiempo (s)':>11s}")
+    for name, size, elapsed in (("Node con __dict__", dict_bytes, dict_time),
+                                ("Node con __slots__", slots_bytes, slots_time),
+                                ("ASTArena (from_tree)", arena_bytes, arena_time)):
+        print(f"{name:24s} {size / 2**20:9.1f} {size / len(arena):11.1f} "
+              f"{dict_bytes / size:11.1f}x {elapsed:11.2f}")
+    print(f"ASTArena.to_tree: {back_time:.2f} s")
+
+if __name__ == "__main__":
+    main()
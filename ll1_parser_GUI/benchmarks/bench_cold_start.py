@@ -0,0 +1,69 @@
+# bench_cold_start.py
+# Tiempo de arranque en frío del parser LALR: cada medición es un proceso
+# nuevo que importa fortran_analyzer y construye el parser.
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cada modo construye el parser de una forma distinta e imprime los segundos transcurridos
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {directory!r})
+import fortran_analyzer
+imported = time.perf_counter()
+{build}
+end = time.perf_counter()
+print(end - start, end - imported)
+"""
+
+MODES = {
+    'cache': "parser, origin = fortran_analyzer.build_parser()\nassert origin == 'cache'",
+    'regenerado': "parser, origin = fortran_analyzer.build_parser(tables_path={missing!r})",
+    'yacc clásico': "parser, origin = fortran_analyzer.build_parser(use_cache=False)",
+}
+
+def cold_start(directory, build, runs):
+    """
+    Lanza `runs` procesos y devuelve dos listas en milisegundos: arranque
+    total (importación + parser) y sólo la construcción del parser
+    """
+    code = SNIPPET.format(directory=directory, build=build)
+    totals, builds = [], []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', code], cwd=directory,
+                                capture_output=True, text=True, check=True)
+        total, build_time = result.stdout.strip().splitlines()[-1].split()
+        totals.append(float(total) * 1000)
+        builds.append(float(build_time) * 1000)
+    return totals, builds
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque en frío: tablas en cache vs regeneración")
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    # Se trabaja sobre una copia para que el modo clásico pueda escribir sus
+    # archivos sin tocar el repositorio
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, 'src')
+        shutil.copytree(SOURCE_DIR, directory, ignore=shutil.ignore_patterns('__pycache__', 'benchmarks'))
+        missing = os.path.join(tmp, 'sin_tablas.py')
+        print(f"{'modo':16s} {'total p50 (ms)':>15s} {'parser p50 (ms)':>16s} {'parser mín (ms)':>16s}")
+        for name, build in MODES.items():
+            if name == 'yacc clásico':
+                # Sin tablas previas: yacc regenera y escribe parsetab.py y parser.out
+                build = "import os\nfor f in ('parsetab.py', 'parser.out'):\n" \
+                        "    os.path.exists(f) and os.remove(f)\n" + build
+            totals, builds = cold_start(directory, build.format(missing=missing), args.runs)
+            print(f"{name:16s} {statistics.median(totals):15.2f} "
+                  f"{statistics.median(builds):16.2f} {min(builds):16.2f}")
+
+if __name__ == "__main__":
+    main()
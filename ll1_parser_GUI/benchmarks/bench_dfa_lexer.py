@@ -0,0 +1,62 @@
+# bench_dfa_lexer.py
+# Tokens por segundo del lexer PLY contra el autómata en tablas
+# (dfa_lexer.DFALexer), sobre un archivo grande y sobre muchos archivos
+# pequeños generados con FortranTestGenerator
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dfa_lexer import DFALexer
+from ll1_parser import lexer_factory
+from test_generator import FortranTestGenerator
+
+def make_corpus(files, seed):
+    random.seed(seed)
+    generator = FortranTestGenerator()
+    return [generator.generate_valid_test(complexity=random.randint(1, 3)) for _ in range(files)]
+
+def count_tokens(lexer, inputs):
+    """Lexea cada entrada con un clon del lexer y devuelve (tokens, segundos)"""
+    tokens = 0
+    start = time.perf_counter()
+    for data in inputs:
+        clone = lexer.clone()
+        clone.input(data)
+        for _ in clone:
+            tokens += 1
+    return tokens, time.perf_counter() - start
+
+def best_of(repeat, lexer, inputs):
+    results = [count_tokens(lexer, inputs) for _ in range(repeat)]
+    return min(results, key=lambda result: result[1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tokens/s: PLY contra DFALexer")
+    parser.add_argument('--files', type=int, default=5000, help="programas generados")
+    parser.add_argument('--repeat', type=int, default=3, help="repeticiones (se informa la mejor)")
+    parser.add_argument('--seed', type=int, default=1148)
+    args = parser.parse_args()
+
+    programs = make_corpus(args.files, args.seed)
+    big = "\n".join(programs)
+    print(f"=== Lexers: {args.files} programas, {len(big) / 1e6:.1f} MB ===")
+    for title, inputs in (("Un archivo grande", [big]),
+                          ("Archivos pequeños", programs),
+                          ("Buffer de bytes", [big.encode('ascii')])):
+        print(f"--- {title} ---")
+        rates = {}
+        for name, lexer in (("PLY", lexer_factory.get_lexer()), ("DFA", DFALexer())):
+            if name == "PLY" and isinstance(inputs[0], bytes):
+                continue
+            tokens, seconds = best_of(args.repeat, lexer, inputs)
+            rates[name] = tokens / seconds
+            print(f"{name:4s} {tokens} tokens en {seconds:.3f} s  |  {rates[name]:,.0f} tokens/s")
+        if len(rates) == 2:
+            print(f"Aceleración: {rates['DFA'] / rates['PLY']:.2f}x")
+
+if __name__ == "__main__":
+    main()
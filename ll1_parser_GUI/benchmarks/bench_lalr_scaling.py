@@ -0,0 +1,68 @@
+# bench_lalr_scaling.py
+# Mide cómo escala el parser LALR (FortranAnalyzer) con la cantidad de
+# sentencias. Con statement_list recursiva por la izquierda el costo por
+# sentencia debe mantenerse constante de 1k a 1M sentencias.
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fortran_analyzer import FortranAnalyzer
+
+def build_program(count):
+    """Programa plano con asignaciones, IF y DO en proporción fija"""
+    lines = []
+    for i in range(count):
+        kind = i % 10
+        if kind == 8:
+            lines.append(f"IF (X{i} > {i}) THEN\n    Y = Y + 1\nENDIF")
+        elif kind == 9:
+            lines.append(f"DO I = 1, {i}\n    Z = Z * I\nENDDO")
+        else:
+            lines.append(f"X{i} = (A + B) * {i}")
+    return "\n".join(lines)
+
+def measure(analyzer, count, repeat, keep_gc=False):
+    """Mejor tiempo de `repeat` corridas para un programa de `count` sentencias"""
+    code = build_program(count)
+    best = None
+    for _ in range(repeat):
+        analyzer.ast = None
+        gc.collect()
+        # Las colecciones del GC crecen con el heap vivo y no dependen de la
+        # gramática; por defecto se excluyen para medir sólo el parser
+        if not keep_gc:
+            gc.disable()
+        try:
+            start = time.perf_counter()
+            success, message = analyzer.analyze(code)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        assert success and len(analyzer.ast.children[0].children) == count, message
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalamiento del parser LALR por cantidad de sentencias")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3, help="corridas por tamaño (se reporta la mejor)")
+    parser.add_argument('--gc', action='store_true', help="mantener el recolector de basura activo al medir")
+    args = parser.parse_args()
+
+    analyzer = FortranAnalyzer()
+    print(f"{'sentencias':>12s} {'tiempo (s)':>12s} {'µs/sentencia':>14s}")
+    per_statement = []
+    for count in args.sizes:
+        elapsed = measure(analyzer, count, args.repeat if count < 1000000 else 1, args.gc)
+        per_statement.append(elapsed / count * 1e6)
+        print(f"{count:12d} {elapsed:12.3f} {per_statement[-1]:14.2f}")
+
+    # En tiempo lineal el costo por sentencia no crece con el tamaño
+    print(f"Relación costo/sentencia (mayor/menor tamaño): {per_statement[-1] / per_statement[0]:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_lexer_factory.py
+# Compara la latencia por archivo de LL1Parser.parse reconstruyendo el lexer
+# en cada llamada (comportamiento anterior) contra la fábrica de lexers.
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ply.lex as lex
+import ll1_parser
+from ll1_parser import LL1Parser
+from test_generator import FortranTestGenerator
+
+class RebuildLexerParser(LL1Parser):
+    """
+    Reproduce el comportamiento anterior: lex.lex() en cada parse. El resto
+    es LL1Parser.parse (que reinicia posiciones y diagnósticos), así sólo
+    difiere la construcción del lexer
+    """
+
+    def parse(self, code):
+        return super().parse(code, lexer=lex.lex(module=ll1_parser))
+
+def write_corpus(directory, num_files, seed):
+    """Escribe num_files programas pequeños en directory"""
+    random.seed(seed)
+    generator = FortranTestGenerator()
+    paths = []
+    for i in range(num_files):
+        path = os.path.join(directory, f"prog_{i:05d}.f77")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generator.generate_valid_test(complexity=random.randint(1, 3)))
+        paths.append(path)
+    return paths
+
+def run(parser, paths):
+    """Analiza cada archivo y devuelve las latencias en milisegundos"""
+    latencies = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        start = time.perf_counter()
+        try:
+            parser.parse(code)
+        except SyntaxError:
+            pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def report(name, latencies):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{name:22s} media={statistics.mean(ordered):.4f} ms  "
+          f"p50={statistics.median(ordered):.4f} ms  p99={p99:.4f} ms  "
+          f"total={sum(ordered) / 1000:.2f} s")
+    return statistics.mean(ordered)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la fábrica de lexers")
+    parser.add_argument('--files', type=int, default=5000, help="cantidad de archivos del corpus")
+    parser.add_argument('--seed', type=int, default=1148)
+    parser.add_argument('--corpus', help="directorio con un corpus existente (*.f77)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+                           if name.endswith(('.f', '.for', '.f77')))
+        else:
+            paths = write_corpus(tmp, args.files, args.seed)
+
+        # Silenciar los mensajes de error léxico del corpus aleatorio
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                before = run(RebuildLexerParser(), paths)
+                after = run(LL1Parser(), paths)
+            finally:
+                sys.stdout = stdout
+
+    print(f"=== LL1Parser.parse: {len(paths)} archivos ===")
+    mean_before = report("lex.lex() por llamada", before)
+    mean_after = report("LexerFactory (clon)", after)
+    print(f"Aceleración: {mean_before / mean_after:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_lsp.py
+# Latencias del servidor LSP (lsp_server.py) con su cliente de prueba:
+# abre un documento generado con FortranTestGenerator, lo edita línea por
+# línea y mide el tiempo hasta cada publishDiagnostics (sin contar el
+# debounce), también con un error de sintaxis en el buffer (como mientras
+# se escribe), y el de documentSymbol y definition sobre texto sin
+# cambios, que deben responderse sin volver a analizar
+import argparse
+import math
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lsp_server import LSPClient
+from ll1_parser import FortranLL1Analyzer
+from test_generator import FortranTestGenerator
+
+URI = 'file:///bench.f77'
+ASSIGNMENT = re.compile(r'\s*[A-Za-z]\w*\s*=[^=]')
+
+def percentile(samples, fraction):
+    """Percentil por rango más cercano de una lista ordenada"""
+    samples = sorted(samples)
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+def report(title, samples):
+    print(f"{title:28s} p50 {percentile(samples, 0.5) * 1e3:8.2f} ms  p99 {percentile(samples, 0.99) * 1e3:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencias del servidor LSP")
+    parser.add_argument('--statements', type=int, default=5000, help="sentencias del documento")
+    parser.add_argument('--edits', type=int, default=100)
+    parser.add_argument('--debounce', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=1148)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    code = FortranTestGenerator(args.seed).generate_program(args.statements)
+    lines = code.split('\n')
+    # Líneas con asignaciones: agregar ' + 1' al final deja el programa válido
+    editable = [index for index, line in enumerate(lines) if ASSIGNMENT.match(line)]
+
+    start = time.perf_counter()
+    FortranLL1Analyzer().analyze(code)
+    full = time.perf_counter() - start
+    print(f"=== {args.statements} sentencias, {len(lines)} líneas, {len(code) / 1024:.0f} KB ===")
+    print(f"{'análisis completo (referencia)':28s} {full * 1e3:8.2f} ms")
+
+    with LSPClient(debounce=args.debounce) as client:
+        client.initialize()
+        start = time.perf_counter()
+        client.open(URI, code)
+        client.wait_notification('textDocument/publishDiagnostics')
+        print(f"{'didOpen → diagnósticos':28s} {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+        def edit(version, line, text):
+            """Agrega text al final de la línea y espera los diagnósticos"""
+            column = len(lines[line])
+            start = time.perf_counter()
+            client.change(URI, version, [{'range': {'start': {'line': line, 'character': column},
+                                                    'end': {'line': line, 'character': column}},
+                                          'text': text}])
+            lines[line] += text
+            notification = client.wait_notification('textDocument/publishDiagnostics')
+            return time.perf_counter() - start - args.debounce, notification
+
+        edits, symbols, definitions = [], [], []
+        for version in range(2, args.edits + 2):
+            line = rng.choice(editable)
+            elapsed, _ = edit(version, line, ' + 1')
+            edits.append(elapsed)
+
+            for samples, method, params in (
+                    (symbols, 'textDocument/documentSymbol', {}),
+                    (definitions, 'textDocument/definition',
+                     {'position': {'line': line, 'character': len(lines[line]) - 5}})):
+                start = time.perf_counter()
+                client.request(method, dict(params, textDocument={'uri': URI}))
+                samples.append(time.perf_counter() - start)
+        report("didChange → diagnósticos", edits)
+        report("documentSymbol", symbols)
+        report("definition", definitions)
+
+        # Un '+' colgando a mitad del documento y las mismas ediciones
+        version = args.edits + 2
+        _, notification = edit(version, editable[len(editable) // 2], ' +')
+        assert notification['diagnostics'], "el error no se informó"
+        errors = []
+        for version in range(version + 1, version + args.edits + 1):
+            line = rng.choice(editable)
+            elapsed, _ = edit(version, line, ' + 1')
+            errors.append(elapsed)
+        report("didChange con un error", errors)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench_server.py
+# Latencia de analysis_server contra lanzar un proceso por análisis: levanta
+# el servidor en un socket temporal, le envía programas generados con
+# FortranTestGenerator (uno por petición y en lotes) e informa p50/p99 y
+# documentos/s; como referencia mide el arranque de un proceso que importa
+# el analizador y analiza un programa
+import argparse
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analysis_server import AnalysisClient
+from test_generator import FortranTestGenerator
+
+def percentile(samples, fraction):
+    """Percentil por rango más cercano de una lista ordenada"""
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+def wait_for_server(socket_path, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with AnalysisClient(socket_path) as client:
+                client.request({'op': 'ping'})
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("El servidor no respondió")
+
+def measure(client, programs, parser_kind, batch):
+    """Latencias (s) de cada petición de `batch` documentos"""
+    latencies = []
+    for start in range(0, len(programs), batch):
+        documents = [{'code': code} for code in programs[start:start + batch]]
+        begin = time.perf_counter()
+        client.analyze(documents, parser_kind)
+        latencies.append(time.perf_counter() - begin)
+    latencies.sort()
+    return latencies
+
+def process_startup(code, parser_kind, repeat):
+    """Mejor tiempo de un proceso nuevo que construye el analizador y analiza code"""
+    module, name = (('fortran_analyzer', 'FortranAnalyzer') if parser_kind == 'lalr'
+                    else ('ll1_parser', 'FortranLL1Analyzer'))
+    script = f"import sys; from {module} import {name}; {name}().analyze(sys.stdin.read())"
+    best = math.inf
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, '-c', script], input=code, text=True, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - begin)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia del servidor de análisis")
+    parser.add_argument('--programs', type=int, default=1000)
+    parser.add_argument('--statements', type=int, default=10, help="sentencias por programa")
+    parser.add_argument('--batch', type=int, default=50, help="documentos por petición en la prueba por lotes")
+    parser.add_argument('-j', '--processes', type=int, default=0, help="procesos del servidor (0 = hilos)")
+    parser.add_argument('--seed', type=int, default=1148)
+    args = parser.parse_args()
+
+    generator = FortranTestGenerator(args.seed)
+    programs = [generator.generate_program(args.statements) for _ in range(args.programs)]
+    socket_path = os.path.join(tempfile.mkdtemp(), 'analysis.sock')
+    # Sin cache: cada pasada reenvía los mismos programas y se mide el análisis, no aciertos
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'analysis_server.py'), 'serve',
+                               '--socket', socket_path, '-j', str(args.processes), '--cache-size', '0'])
+    try:
+        wait_for_server(socket_path)
+        with AnalysisClient(socket_path) as client:
+            print(f"=== {args.programs} programas de {args.statements} sentencias ===")
+            for parser_kind in ('lalr', 'll1'):
+                for batch in (1, args.batch):
+                    latencies = measure(client, programs, parser_kind, batch)
+                    total = sum(latencies)
+                    print(f"{parser_kind:4s} lotes de {batch:3d}: p50 {percentile(latencies, 0.5) * 1e3:7.3f} ms  "
+                          f"p99 {percentile(latencies, 0.99) * 1e3:7.3f} ms  |  {args.programs / total:,.0f} docs/s")
+                startup = process_startup(programs[0], parser_kind, 3)
+                print(f"{parser_kind:4s} un proceso por análisis: {startup * 1e3:.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+if __name__ == "__main__":
+    main()
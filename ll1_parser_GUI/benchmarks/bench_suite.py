@@ -0,0 +1,195 @@
+# bench_suite.py
+# Suite de benchmarks reproducible: corpus generados con semilla en varios
+# tamaños y profundidades de anidamiento, y cada etapa medida por separado
+# (lexer PLY, lexer en tablas, LL1Parser.parse, parse LALR de
+# FortranAnalyzer, visualización del AST con Graphviz y con TreeLayout).
+# Informa tokens/s, memoria pico y latencias p50/p99 por programa, y guarda
+# los resultados en JSON para comparar corridas entre commits (--compare).
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ast_layout import TreeLayout
+from dfa_lexer import DFALexer
+from fortran_analyzer import FortranAnalyzer, visualize_ast
+from ll1_parser import LL1Parser, lexer_factory
+from test_generator import FortranTestGenerator
+
+# === CORPUS ===
+
+def make_corpus(seed, programs, statements, depth, operands):
+    """`programs` programas válidos de unas `statements` sentencias cada uno"""
+    generator = FortranTestGenerator(f"{seed}-{statements}-{depth}-{operands}", max_nesting=depth,
+                                     expression_length=operands)
+    return [generator.generate_program(statements) for _ in range(programs)]
+
+def count_tokens(code):
+    lexer = DFALexer()
+    lexer.input(code)
+    return sum(1 for _ in lexer)
+
+# === ETAPAS ===
+# Cada etapa es (preparar, medir): preparar arma el estado reutilizable y
+# medir(estado, programa, ast) procesa un programa
+
+def lex_ply(state, code, ast):
+    lexer = lexer_factory.get_lexer(code)
+    for _ in lexer:
+        pass
+
+def lex_dfa(state, code, ast):
+    lexer = DFALexer()
+    lexer.input(code)
+    for _ in lexer:
+        pass
+
+def parse_ll1(state, code, ast):
+    state.parse(code)
+
+def parse_lalr(state, code, ast):
+    success, message = state.analyze(code)
+    assert success, message
+
+def render_graphviz(state, code, ast):
+    visualize_ast(ast).source
+
+def render_layout(state, code, ast):
+    TreeLayout(ast, budget=math.inf)
+
+STAGES = {
+    'lexer': (lambda: None, lex_ply),
+    'lexer-dfa': (lambda: None, lex_dfa),
+    'll1': (LL1Parser, parse_ll1),
+    'lalr': (FortranAnalyzer, parse_lalr),
+    'graphviz': (lambda: None, render_graphviz),
+    'layout': (lambda: None, render_layout),
+}
+
+# === MEDICIÓN ===
+
+def percentile(samples, fraction):
+    """Percentil por rango más cercano de una lista ordenada"""
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+def run_stage(stage, corpus, asts, repeat, memory):
+    prepare, measure = STAGES[stage]
+    state = prepare()
+    latencies, totals = [], []
+    for _ in range(repeat):
+        gc.collect()
+        total = 0.0
+        for code, ast in zip(corpus, asts):
+            start = time.perf_counter()
+            measure(state, code, ast)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            total += elapsed
+        totals.append(total)
+    peak = None
+    if memory:
+        # Pasada aparte: tracemalloc hace más lento el código medido
+        gc.collect()
+        tracemalloc.start()
+        peak = 0
+        for code, ast in zip(corpus, asts):
+            tracemalloc.reset_peak()
+            measure(state, code, ast)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    latencies.sort()
+    return min(totals), latencies, peak
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path, threshold):
+    """Imprime el cambio respecto a otra corrida; devuelve la cantidad de regresiones"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['corpus'], r['stage']): r for r in baseline['results']}
+    print(f"\n=== Comparación con {baseline_path} (commit {baseline['meta'].get('commit')}) ===")
+    regressions = 0
+    for result in results:
+        old = previous.get((result['corpus'], result['stage']))
+        if old is None:
+            continue
+        speed = result['tokens_per_s'] / old['tokens_per_s']
+        p99 = result['p99_ms'] / old['p99_ms'] if old['p99_ms'] else 1.0
+        slower = speed < 1 - threshold
+        regressions += slower
+        print(f"{result['corpus']:>16s} {result['stage']:>10s}  tokens/s x{speed:.2f}  p99 x{p99:.2f}"
+              f"{'  REGRESIÓN' if slower else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa sobre corpus con semilla")
+    parser.add_argument('--seed', type=int, default=1148)
+    parser.add_argument('--programs', type=int, default=100, help="programas por corpus")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 200], help="sentencias por programa")
+    parser.add_argument('--depths', type=int, nargs='+', default=[1, 4], help="anidamiento máximo de IF/DO")
+    parser.add_argument('--operands', type=int, default=6, help="operandos máximos por expresión")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=3, help="pasadas por etapa (tokens/s de la mejor)")
+    parser.add_argument('--no-memory', action='store_true', help="no medir la memoria pico")
+    parser.add_argument('-o', '--output', help="archivo JSON de resultados")
+    parser.add_argument('--compare', metavar='JSON', help="resultados de otra corrida para comparar")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="caída de tokens/s que cuenta como regresión (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = []
+    ll1 = LL1Parser()
+    print(f"{'corpus':>16s} {'etapa':>10s} {'tokens/s':>12s} {'p50 ms':>9s} {'p99 ms':>9s} {'pico KB':>9s}")
+    for statements in args.sizes:
+        for depth in args.depths:
+            name = f"s{statements}-d{depth}"
+            corpus = make_corpus(args.seed, args.programs, statements, depth, args.operands)
+            tokens = sum(count_tokens(code) for code in corpus)
+            # Las etapas de visualización reciben el AST ya construido
+            asts = [ll1.parse(code) for code in corpus]
+            for stage in args.stages:
+                seconds, latencies, peak = run_stage(stage, corpus, asts, args.repeat, not args.no_memory)
+                result = {
+                    'corpus': name, 'statements': statements, 'depth': depth, 'operands': args.operands,
+                    'programs': args.programs, 'bytes': sum(len(code) for code in corpus), 'tokens': tokens,
+                    'stage': stage, 'seconds': seconds, 'tokens_per_s': tokens / seconds,
+                    'p50_ms': percentile(latencies, 0.50) * 1e3, 'p99_ms': percentile(latencies, 0.99) * 1e3,
+                    'peak_bytes': peak,
+                }
+                results.append(result)
+                peak_text = f"{peak / 1024:9.0f}" if peak is not None else f"{'-':>9s}"
+                print(f"{name:>16s} {stage:>10s} {result['tokens_per_s']:12,.0f} "
+                      f"{result['p50_ms']:9.3f} {result['p99_ms']:9.3f} {peak_text}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': args.seed, 'programs': args.programs,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# diff_dfa_lexer.py
+# Prueba diferencial del lexer en tablas (dfa_lexer.DFALexer) contra el lexer
+# PLY: sobre un corpus generado (programas válidos, mutaciones carácter a
+# carácter y texto aleatorio) ambos deben entregar los mismos tokens y
+# reportar los mismos caracteres ilegales en las mismas posiciones.
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dfa_lexer import DFALexer
+from ll1_parser import lexer_factory
+from test_generator import FortranTestGenerator
+
+# Fragmentos que ejercitan los casos límite del lexer
+FRAGMENTS = ['IF', 'if', 'Then', 'ENDIF', 'EndDo', 'endif1', 'DOX', 'do', 'read', 'WRITE',
+             '1.', '1.5', '.5', '12.34.5', '==', '!=', '<=', '>=', '<', '>', '=', '! nota',
+             '\n', '\r\n', '\t', ' ', '@', 'ñ', '?', '$', '_', '(', ')', ',', '+', '-', '*', '/']
+ALPHABET = 'AZaz09 \t\n.!=<>+-*/(),@ñ\r'
+
+def mutate(code, rng, count):
+    """Inserta, borra o reemplaza count caracteres/fragmentos al azar"""
+    chars = list(code)
+    for _ in range(count):
+        position = rng.randrange(len(chars) + 1)
+        action = rng.random()
+        if action < 0.4:
+            chars[position:position] = rng.choice(FRAGMENTS)
+        elif action < 0.7 and position < len(chars):
+            del chars[position]
+        elif position < len(chars):
+            chars[position] = rng.choice(ALPHABET)
+    return ''.join(chars)
+
+def corpus(count, seed):
+    """Programas del generador, sus mutaciones y texto aleatorio"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    generator = FortranTestGenerator()
+    for _ in range(count):
+        code = generator.generate_valid_test(complexity=rng.randint(1, 3))
+        yield code
+        yield mutate(code, rng, rng.randint(1, 8))
+        yield ''.join(rng.choice(FRAGMENTS + list(ALPHABET)) for _ in range(rng.randint(0, 60)))
+
+def scan(lexer, data):
+    """Tokens (tipo, valor, tipo del valor, línea, posición) y errores (posición, línea, carácter)"""
+    errors = []
+
+    def on_error(token):
+        errors.append((token.lexpos, token.lexer.lineno, token.value[0]))
+        token.lexer.skip(1)
+
+    lexer.lexerrorf = on_error
+    lexer.lineno = 1
+    lexer.input(data)
+    tokens = [(t.type, t.value, type(t.value).__name__, t.lineno, t.lexpos) for t in lexer]
+    return tokens, errors
+
+def first_difference(expected, actual):
+    for index, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return index, a, b
+    return min(len(expected), len(actual)), expected[len(actual):][:1], actual[len(expected):][:1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba diferencial DFALexer contra PLY")
+    parser.add_argument('--programs', type=int, default=3000, help="programas base del corpus")
+    parser.add_argument('--seed', type=int, default=1148)
+    args = parser.parse_args()
+
+    ply_lexer = lexer_factory.get_lexer()
+    dfa_lexer = DFALexer()
+    cases = failures = 0
+    for code in corpus(args.programs, args.seed):
+        expected = scan(ply_lexer, code)
+        inputs = [('str', code)]
+        if code.isascii():
+            # Sobre un buffer de bytes las posiciones coinciden si el texto es ASCII
+            inputs.append(('bytes', code.encode('ascii')))
+        for kind, data in inputs:
+            cases += 1
+            actual = scan(dfa_lexer, data)
+            if actual != expected:
+                failures += 1
+                which = 0 if actual[0] != expected[0] else 1
+                index, a, b = first_difference(expected[which], actual[which])
+                print(f"DIFERENCIA ({kind}, {'tokens' if which == 0 else 'errores'} #{index}) "
+                      f"en {code!r}:\n  PLY: {a}\n  DFA: {b}")
+                if failures >= 10:
+                    return 1
+    print(f"{cases} entradas comparadas, {failures} diferencias")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
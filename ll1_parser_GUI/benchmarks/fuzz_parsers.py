@@ -0,0 +1,256 @@
+# fuzz_parsers.py
+# Fuzzing diferencial entre los dos parsers de la misma gramática: LL1Parser
+# (ll1_parser.py) y el LALR de PLY (fortran_analyzer.py). Los casos salen de
+# FortranTestGenerator (programas válidos, mutaciones de caracteres y de
+# tokens, fragmentos inválidos) y se reparten entre procesos trabajadores;
+# ambos parsers deben aceptar o rechazar lo mismo y, si aceptan, construir
+# el mismo AST. Los parsers se llaman directamente (no con analyze, que
+# convierte cualquier excepción en un rechazo): una excepción es un fallo
+# aparte. Cada desacuerdo o excepción se minimiza a un reproductor mínimo.
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dfa_lexer import DFALexer
+from diff_dfa_lexer import mutate
+from fortran_analyzer import FortranAnalyzer
+from ll1_parser import FortranLL1Analyzer, LL1Parser
+from source_map import token_end
+from test_generator import FortranTestGenerator
+
+# Clases de fallo que devuelve compare
+DISAGREEMENT = 'desacuerdo'
+EXCEPTION = 'excepción'
+INVALID_TYPES = ['missing_endif', 'missing_enddo', 'invalid_syntax', 'unclosed_parenthesis', 'unknown_operator']
+# Tokens que se insertan en las mutaciones por tokens
+TOKENS = ['IF', 'THEN', 'ENDIF', 'DO', 'ENDDO', '(', ')', '=', '==', ',', '+', '*', '<', 'X', '1', '2.5']
+
+# === CASOS ===
+
+def tokens_of(code):
+    """Texto de cada token de code (los comentarios y los caracteres ilegales se pierden)"""
+    lexer = DFALexer()
+    lexer.lexerrorf = lambda token: token.lexer.skip(1)
+    lexer.input(code)
+    return [code[token.lexpos:token_end(token)] for token in lexer]
+
+def mutate_tokens(code, rng, count):
+    """Borra, duplica, intercambia o inserta count tokens"""
+    tokens = tokens_of(code)
+    for _ in range(count):
+        position = rng.randrange(len(tokens) + 1)
+        action = rng.random()
+        if action < 0.3 and position < len(tokens):
+            del tokens[position]
+        elif action < 0.5 and position < len(tokens):
+            tokens.insert(position, tokens[position])
+        elif action < 0.7 and position + 1 < len(tokens):
+            tokens[position], tokens[position + 1] = tokens[position + 1], tokens[position]
+        else:
+            tokens.insert(position, rng.choice(TOKENS))
+    return ' '.join(tokens)
+
+def insert_invalid(code, generator, rng):
+    """Un fragmento inválido del generador entre dos líneas de code"""
+    lines = code.split('\n')
+    lines.insert(rng.randrange(len(lines) + 1), generator.generate_invalid_test(rng.choice(INVALID_TYPES)))
+    return '\n'.join(lines)
+
+def cases(seed, batch, size):
+    """Los size casos del lote batch: dependen sólo de (seed, batch)"""
+    rng = random.Random(f"{seed}-{batch}")
+    generator = FortranTestGenerator(rng.random(), max_nesting=rng.randint(1, 4),
+                                     expression_length=rng.choice([None, 3, 8]))
+    for _ in range(size):
+        code = generator.generate_program(rng.randint(1, 8))
+        kind = rng.random()
+        if kind < 0.3:
+            yield code
+        elif kind < 0.6:
+            yield mutate(code, rng, rng.randint(1, 4))
+        elif kind < 0.9:
+            yield mutate_tokens(code, rng, rng.randint(1, 3))
+        else:
+            yield insert_invalid(code, generator, rng)
+
+# === COMPARACIÓN ===
+# Un analizador de cada tipo por proceso (los crea init_worker)
+_ll1 = None
+_lalr = None
+
+def init_worker():
+    global _ll1, _lalr
+    _ll1 = FortranLL1Analyzer(lexer_backend='dfa')
+    _lalr = FortranAnalyzer(lexer_backend='dfa')
+    # Los parsers imprimen cada error en la salida estándar
+    sys.stdout = open(os.devnull, 'w')
+
+def same_tree(a, b):
+    """Igualdad estructural (tipo, valor y tipo del valor de cada nodo) sin recursión"""
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if (x.type != y.type or x.value != y.value or type(x.value) is not type(y.value)
+                or len(x.children) != len(y.children)):
+            return False
+        stack.extend(zip(x.children, y.children))
+    return True
+
+def parse_ll1(code):
+    """(aceptó, AST) del LL1Parser con recuperación, que no lanza SyntaxError"""
+    parser = LL1Parser(_ll1.parser.lexer_factory, recover=True)
+    ast = parser.parse(code)
+    return not parser.diagnostics, ast
+
+def parse_lalr(code):
+    """(aceptó, AST) de una sesión LALR"""
+    with _lalr.session() as session:
+        success, _ = session.parse(code)
+        return success, session.ast
+
+def compare(code):
+    """
+    (fallo, aceptado): fallo es None si los parsers coinciden o un par
+    (clase, descripción) con clase DISAGREEMENT o EXCEPTION.
+    """
+    results = []
+    for name, parse in (('LL(1)', parse_ll1), ('LALR', parse_lalr)):
+        try:
+            results.append(parse(code))
+        except Exception as e:
+            return (EXCEPTION, f"{name} lanza {type(e).__name__}"), False
+    (ll1_ok, ll1_ast), (lalr_ok, lalr_ast) = results
+    if ll1_ok != lalr_ok:
+        return (DISAGREEMENT, f"LL(1) {'acepta' if ll1_ok else 'rechaza'} y "
+                              f"LALR {'acepta' if lalr_ok else 'rechaza'}"), False
+    if ll1_ok and not same_tree(ll1_ast, lalr_ast):
+        return (DISAGREEMENT, "ASTs distintos"), False
+    return None, ll1_ok
+
+def run_batch(task):
+    """Corre un lote en el trabajador: (casos, aceptados, fallos [(código, (clase, descripción))])"""
+    seed, batch, size, limit = task
+    count = accepted = 0
+    found = []
+    for code in cases(seed, batch, size):
+        count += 1
+        problem, ok = compare(code)
+        if problem is None:
+            accepted += ok
+        elif len(found) < limit:
+            found.append((code, problem))
+    return count, accepted, found
+
+# === MINIMIZACIÓN ===
+
+def reduce_units(units, join, keeps):
+    """ddmin simplificado: quita trozos cada vez más chicos mientras keeps(join(trozos)) siga siendo cierto"""
+    parts = 2
+    while len(units) >= 2:
+        chunk = math.ceil(len(units) / parts)
+        for start in range(0, len(units), chunk):
+            candidate = units[:start] + units[start + chunk:]
+            if keeps(join(candidate)):
+                units = candidate
+                parts = max(parts - 1, 2)
+                break
+        else:
+            if chunk == 1:
+                break
+            parts = min(parts * 2, len(units))
+    return units
+
+def remove_pairs(units, join, keeps, limit=80):
+    """Quita dos unidades no contiguas a la vez (un DO con su ENDDO), hasta que no se pueda más"""
+    changed = True
+    while changed and len(units) <= limit:
+        changed = False
+        for first, second in itertools.combinations(range(len(units)), 2):
+            candidate = units[:first] + units[first + 1:second] + units[second + 1:]
+            if keeps(join(candidate)):
+                units = candidate
+                changed = True
+                break
+    return units
+
+def minimize(code, problem):
+    """Reproductor mínimo con el mismo fallo: por líneas, luego por tokens, luego por caracteres"""
+    keeps = lambda candidate: compare(candidate)[0] == problem
+    for split, join in ((lambda c: c.split('\n'), '\n'.join),
+                        (tokens_of, ' '.join),
+                        (list, ''.join)):
+        units = split(code)
+        # Separar en tokens pierde comentarios y caracteres ilegales: sólo si conserva el fallo
+        if keeps(join(units)):
+            units = reduce_units(units, join, keeps)
+            if join is not ''.join:
+                units = remove_pairs(units, join, keeps)
+            code = join(units)
+    return code
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzing diferencial LL(1) contra LALR")
+    parser.add_argument('--cases', type=int, default=100000, help="casos a probar")
+    parser.add_argument('--seconds', type=float, help="en lugar de --cases, probar durante este tiempo")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="procesos trabajadores")
+    parser.add_argument('--seed', type=int, default=1148)
+    parser.add_argument('--batch', type=int, default=500, help="casos por lote enviado a un trabajador")
+    parser.add_argument('--max-failures', type=int, default=20, help="fallos a minimizar como máximo")
+    parser.add_argument('-o', '--output', help="directorio donde guardar los reproductores")
+    args = parser.parse_args()
+
+    if args.seconds is not None:
+        tasks = ((args.seed, batch, args.batch, args.max_failures) for batch in itertools.count())
+    else:
+        batches = math.ceil(args.cases / args.batch)
+        tasks = ((args.seed, batch, min(args.batch, args.cases - batch * args.batch), args.max_failures)
+                 for batch in range(batches))
+
+    total = accepted = 0
+    found = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.jobs, initializer=init_worker) as pool:
+        for count, ok, problems in pool.imap_unordered(run_batch, tasks):
+            total += count
+            accepted += ok
+            found.extend(problems)
+            if (args.seconds is not None and time.perf_counter() - start >= args.seconds) or \
+                    len(found) >= args.max_failures:
+                pool.terminate()
+                break
+    elapsed = time.perf_counter() - start
+    print(f"{total} casos en {elapsed:.1f} s ({total / elapsed:,.0f} casos/s, "
+          f"{total / elapsed * 3600 / 1e6:.2f} M/hora con {args.jobs} procesos); "
+          f"{accepted} aceptados por ambos")
+
+    if not found:
+        print("Sin desacuerdos ni excepciones")
+        return 0
+    # La minimización corre en este proceso con sus propios analizadores
+    stdout = sys.stdout
+    init_worker()
+    reproducers = {}
+    for code, problem in found[:args.max_failures]:
+        reproducers.setdefault(minimize(code, problem), problem)
+    sys.stdout = stdout
+    exceptions = sum(kind == EXCEPTION for _, (kind, _) in found)
+    print(f"{len(found) - exceptions} desacuerdos, {exceptions} excepciones, "
+          f"{len(reproducers)} reproductores distintos:")
+    for index, (code, (kind, problem)) in enumerate(sorted(reproducers.items(), key=lambda item: len(item[0]))):
+        print(f"--- {kind}: {problem}: {code!r}")
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            name = 'desacuerdo' if kind == DISAGREEMENT else 'excepcion'
+            with open(os.path.join(args.output, f"{name}_{index}.f77"), 'w', encoding='utf-8') as f:
+                f.write(code)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
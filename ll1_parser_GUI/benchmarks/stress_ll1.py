@@ -0,0 +1,74 @@
+# stress_ll1.py
+# Pruebas de estrés del parser LL(1): programas con cientos de miles de
+# sentencias y expresiones con decenas de miles de operandos. Antes de
+# convertir statement_list'/expression'/term' en ciclos, ambos casos
+# superaban el límite de recursión de Python.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ll1_parser import LL1Parser
+
+def check_statements(parser, count):
+    """Programa plano de `count` asignaciones"""
+    code = "\n".join(f"X{i} = X{i} + {i}" for i in range(count))
+    start = time.perf_counter()
+    ast = parser.parse(code)
+    elapsed = time.perf_counter() - start
+    statements = ast.children[0].children
+    assert len(statements) == count, len(statements)
+    assert statements[-1].children[0].value == f"X{count - 1}"
+    return elapsed
+
+def check_expression(parser, operands, op):
+    """Asignación con una cadena A0 op A1 op ... de `operands` operandos"""
+    code = "R = " + f" {op} ".join(f"A{i}" for i in range(operands))
+    start = time.perf_counter()
+    ast = parser.parse(code)
+    elapsed = time.perf_counter() - start
+    # Asociatividad izquierda: el operando derecho de cada BinOp es una hoja
+    # y el último operando cuelga de la raíz de la expresión
+    node = ast.children[0].children[0].children[1]
+    depth = 0
+    while node.type == 'BinOp':
+        assert node.value == op
+        assert node.children[1].value == f"A{operands - 1 - depth}"
+        node = node.children[0]
+        depth += 1
+    assert depth == operands - 1 and node.value == "A0", depth
+    return elapsed
+
+def check_nesting(parser, statements, depth):
+    """Bloques DO anidados `depth` niveles con `statements` sentencias en el interior"""
+    body = "\n".join(f"Y = Y + {i}" for i in range(statements))
+    code = "".join(f"DO I{d} = 1, 10\n" for d in range(depth)) + body + "\nENDDO" * depth
+    start = time.perf_counter()
+    ast = parser.parse(code)
+    elapsed = time.perf_counter() - start
+    node = ast.children[0].children[0]
+    for _ in range(depth - 1):
+        node = node.children[3].children[0]
+    assert len(node.children[3].children) == statements
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de estrés del parser LL(1)")
+    parser.add_argument('--statements', type=int, default=100000)
+    parser.add_argument('--operands', type=int, default=50000)
+    parser.add_argument('--streaming', action='store_true', help="usar el modo de tokens en streaming")
+    args = parser.parse_args()
+
+    ll1 = LL1Parser(streaming=args.streaming)
+    print(f"Límite de recursión de Python: {sys.getrecursionlimit()}")
+    print(f"{args.statements} sentencias: {check_statements(ll1, args.statements):.2f} s")
+    for op in ('+', '*', '<'):
+        print(f"{args.operands} operandos '{op}': {check_expression(ll1, args.operands, op):.2f} s")
+    print(f"DO anidado 100 niveles x {args.statements // 10} sentencias: "
+          f"{check_nesting(ll1, args.statements // 10, 100):.2f} s")
+    print("OK")
+
+if __name__ == "__main__":
+    main()
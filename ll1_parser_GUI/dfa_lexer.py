@@ -0,0 +1,251 @@
+# dfa_lexer.py
+# Lexer alternativo al de PLY: un autómata finito determinista en tablas que
+# recorre la entrada una sola vez, carácter por carácter, sin expresiones
+# regulares ni búsquedas en el diccionario de palabras reservadas
+from ply.lex import LexError
+
+from ll1_parser import reserved
+
+# === CLASES DE CARACTERES ===
+# Cada byte se traduce a una clase; las letras que aparecen en palabras
+# reservadas tienen clase propia (mayúsculas y minúsculas comparten clase)
+# para que el autómata reconozca IF, ENDDO, etc. sin pasar a minúsculas
+OTHER, BLANK, NEWLINE, BANG, DIGIT, DOT, LETTER = range(7)
+
+# Operadores: texto → tipo. '!=' no está porque '!' siempre inicia un
+# comentario (en PLY t_COMMENT se prueba antes que t_NOTEQUALS)
+OPERATORS = {
+    '+': 'PLUS', '-': 'MINUS', '*': 'TIMES', '/': 'DIVIDE',
+    '(': 'LPAREN', ')': 'RPAREN', ',': 'COMMA', '=': 'ASSIGN',
+    '==': 'EQUALS', '<': 'LESS', '>': 'GREATER', '<=': 'LESSEQUAL', '>=': 'GREATEREQUAL',
+}
+
+def _build_classes():
+    classes = [OTHER] * 256
+    for char in ' \t':
+        classes[ord(char)] = BLANK
+    classes[ord('\n')] = NEWLINE
+    classes[ord('!')] = BANG
+    classes[ord('.')] = DOT
+    for code in range(ord('0'), ord('9') + 1):
+        classes[code] = DIGIT
+    for code in range(ord('a'), ord('z') + 1):
+        classes[code] = classes[code - 32] = LETTER
+    names = {}
+    for char in sorted(set(''.join(OPERATORS)) | set(''.join(reserved))):
+        names[char] = len(names) + LETTER + 1
+        classes[ord(char)] = names[char]
+        if char.isalpha():
+            classes[ord(char.upper())] = names[char]
+    return classes, names
+
+CLASS_OF, CHAR_CLASS = _build_classes()
+CLASS_COUNT = len(CHAR_CLASS) + LETTER + 1
+LETTER_CLASSES = [LETTER] + [code for char, code in CHAR_CLASS.items() if char.isalpha()]
+
+# === AUTÓMATA ===
+# Tipos internos que no producen token
+IGNORE, LINES, COMMENT = '<ignore>', '<newline>', '<comment>'
+
+def _build_automaton():
+    """
+    Tablas del autómata: TRANSITIONS[estado][clase] → estado (-1 si no hay
+    transición) y ACCEPT[estado] → tipo del token reconocido (None si el
+    estado no acepta). El estado 0 es el inicial.
+    """
+    transitions, accept = [], []
+
+    def state(token_type=None):
+        transitions.append([-1] * CLASS_COUNT)
+        accept.append(token_type)
+        return len(accept) - 1
+
+    start = state()
+
+    blank = state(IGNORE)
+    transitions[start][BLANK] = transitions[blank][BLANK] = blank
+
+    newline = state(LINES)
+    transitions[start][NEWLINE] = transitions[newline][NEWLINE] = newline
+
+    # Comentario: '!' y todo lo que sigue hasta el fin de la línea
+    comment = state(COMMENT)
+    transitions[start][BANG] = comment
+    transitions[comment] = [comment] * CLASS_COUNT
+    transitions[comment][NEWLINE] = -1
+
+    # Números: \d+(\.\d+)?  ('1.' no es número: se acepta '1' y el punto es ilegal)
+    integer, dot, fraction = state('NUMBER'), state(), state('NUMBER')
+    transitions[start][DIGIT] = transitions[integer][DIGIT] = integer
+    transitions[integer][DOT] = dot
+    transitions[dot][DIGIT] = transitions[fraction][DIGIT] = fraction
+
+    # Identificadores, con un trie de palabras reservadas dentro
+    identifier = state('ID')
+    for code in LETTER_CLASSES + [DIGIT]:
+        transitions[identifier][code] = identifier
+    prefixes = {'': start}
+    for word in sorted(reserved):
+        for length in range(1, len(word) + 1):
+            prefix = word[:length]
+            if prefix not in prefixes:
+                prefixes[prefix] = state(reserved.get(prefix, 'ID'))
+                transitions[prefixes[word[:length - 1]]][CHAR_CLASS[word[length - 1]]] = prefixes[prefix]
+    for prefix, current in prefixes.items():
+        row = transitions[current]
+        for code in LETTER_CLASSES + ([DIGIT] if prefix else []):
+            if row[code] == -1:
+                row[code] = identifier
+
+    # Operadores (trie por si hay de dos caracteres)
+    operators = {'': start}
+    for text in sorted(OPERATORS, key=len):
+        operators[text] = state(OPERATORS[text])
+        transitions[operators[text[:-1]]][CHAR_CLASS[text[-1]]] = operators[text]
+
+    return transitions, accept, comment
+
+TRANSITIONS, ACCEPT, COMMENT_STATE = _build_automaton()
+ACCEPTING = [token_type is not None for token_type in ACCEPT]
+
+class Token:
+    """
+    Token con los mismos atributos que ply.lex.LexToken (length: largo de
+    los NUMBER). Como en PLY, lexer sólo se asigna en los tokens de error;
+    yacc lo completa en el token que entrega a p_error.
+    """
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer', 'length')
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    __str__ = __repr__
+
+class DFALexer:
+    """
+    Reemplazo de un lexer PLY (input, token, iteración, clone, skip,
+    lineno, lexpos, lexerrorf) que produce los mismos tipos y valores de
+    token. La entrada puede ser str o un buffer de bytes (bytes, bytearray,
+    mmap, memoryview de bytes); en un buffer lexpos son offsets en bytes.
+
+    Ante un carácter ilegal llama a lexerrorf como PLY, pero el valor del
+    token de error es sólo ese carácter y no el resto de la entrada.
+    """
+
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        self.lexerrorf = None
+        self._buffer = b''
+        self._text = True
+
+    def clone(self):
+        lexer = DFALexer()
+        lexer.lexerrorf = self.lexerrorf
+        return lexer
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+        self._text = isinstance(data, str)
+        if self._text:
+            # Un byte por carácter: los no ASCII (siempre ilegales fuera de
+            # los comentarios) se vuelven '?', que también es ilegal
+            self._buffer = data.encode('ascii', 'replace')
+        else:
+            self._buffer = data
+
+    def skip(self, n):
+        self.lexpos += n
+
+    def _slice(self, start, end):
+        if self._text:
+            return self.lexdata[start:end]
+        return bytes(self._buffer[start:end]).decode('latin-1')
+
+    def token(self):
+        buffer, length = self._buffer, self.lexlen
+        transitions, accepting, accept, classes = TRANSITIONS, ACCEPTING, ACCEPT, CLASS_OF
+        pos = self.lexpos
+        while pos < length:
+            start = pos
+            state = transitions[0][classes[buffer[pos]]]
+            if state < 0:
+                token = self._error(start)
+                if token:
+                    return token
+                pos = self.lexpos
+                continue
+            pos += 1
+            if state == COMMENT_STATE:
+                # El comentario llega hasta el próximo salto de línea
+                pos = self._line_end(pos)
+                continue
+            # Avanzar mientras haya transición, recordando el último estado que acepta
+            last_state, last_pos = state, pos
+            row = transitions[state]
+            while pos < length:
+                state = row[classes[buffer[pos]]]
+                if state < 0:
+                    break
+                pos += 1
+                row = transitions[state]
+                if accepting[state]:
+                    last_state, last_pos = state, pos
+            pos = last_pos
+            token_type = accept[last_state]
+            if token_type is IGNORE:
+                continue
+            if token_type is LINES:
+                self.lineno += pos - start
+                continue
+            value = self._slice(start, pos)
+            token = Token(token_type, value, self.lineno, start)
+            if token_type == 'NUMBER':
+                token.length = pos - start
+                token.value = float(value) if '.' in value else int(value)
+            self.lexpos = pos
+            return token
+        self.lexpos = pos
+        return None
+
+    def _line_end(self, pos):
+        find = getattr(self._buffer, 'find', None)
+        if find is not None:
+            end = find(b'\n', pos) if not self._text else self.lexdata.find('\n', pos)
+            return self.lexlen if end < 0 else end
+        newline = ord('\n')
+        while pos < self.lexlen and self._buffer[pos] != newline:
+            pos += 1
+        return pos
+
+    def _error(self, pos):
+        """Carácter ilegal en pos: lexerrorf debe saltarlo; devuelve lo que lexerrorf devuelva"""
+        char = self._slice(pos, pos + 1)
+        if self.lexerrorf is None:
+            raise LexError(f"Illegal character '{char}' at index {pos}", char)
+        token = Token('error', char, self.lineno, pos)
+        token.lexer = self
+        self.lexpos = pos
+        result = self.lexerrorf(token)
+        if self.lexpos == pos:
+            raise LexError(f"Scanning error. Illegal character '{char}'", char)
+        return result
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = self.token()
+        if token is None:
+            raise StopIteration
+        return token
@@ -0,0 +1,90 @@
+# diagnostics.py
+# Diagnósticos estructurados de los analizadores: tipo de error, posición,
+# token encontrado y conjunto de tokens esperados
+
+# Cómo se muestran los tokens esperados en los mensajes
+# (los símbolos entre comillas; palabras clave, ID y NUMBER por su nombre)
+TOKEN_DISPLAY = {
+    'PLUS': "'+'", 'MINUS': "'-'", 'TIMES': "'*'", 'DIVIDE': "'/'",
+    'LPAREN': "'('", 'RPAREN': "')'", 'COMMA': "','", 'ASSIGN': "'='",
+    'EQUALS': "'=='", 'NOTEQUALS': "'!='", 'LESS': "'<'", 'GREATER': "'>'",
+    'LESSEQUAL': "'<='", 'GREATEREQUAL': "'>='",
+    '$end': 'fin de archivo',
+}
+
+def describe_expected(expected):
+    """'A, B o C' a partir de una secuencia de tipos de token"""
+    names = [TOKEN_DISPLAY.get(name, name) for name in expected]
+    if len(names) <= 1:
+        return ''.join(names)
+    return f"{', '.join(names[:-1])} o {names[-1]}"
+
+class Diagnostic:
+    """
+    Un error léxico o sintáctico. line y column son None si el error está
+    en el fin del archivo; expected es la tupla de tipos de token válidos
+    en ese punto (vacía si no aplica). offset es la posición del error en
+    la entrada (en bytes si se analizó un buffer, ver analyze_path).
+    """
+    __slots__ = ('kind', 'line', 'column', 'found', 'expected', 'offset')
+
+    def __init__(self, kind, line, column, found=None, expected=(), offset=None):
+        self.kind = kind
+        self.line = line
+        self.column = column
+        self.found = found
+        self.expected = tuple(expected)
+        self.offset = offset
+
+    def __str__(self):
+        if self.line is None:
+            msg = f"Error {self.kind}: fin inesperado del archivo"
+        elif self.kind == 'léxico':
+            msg = f"Error léxico en línea {self.line}, columna {self.column}: carácter ilegal '{self.found}'"
+        else:
+            msg = f"Error {self.kind} en línea {self.line}, columna {self.column}: token inesperado '{self.found}'"
+        if self.expected:
+            msg += f", se esperaba {describe_expected(self.expected)}"
+        return msg
+
+    def __repr__(self):
+        return f"Diagnostic({self.kind!r}, {self.line}, {self.column}, {self.found!r}, {self.expected!r})"
+
+    def as_dict(self):
+        """Forma serializable a JSON"""
+        return {'kind': self.kind, 'line': self.line, 'column': self.column,
+                'found': self.found, 'expected': list(self.expected), 'offset': self.offset,
+                'message': str(self)}
+
+class AnalysisResult:
+    """
+    Resultado de un análisis reentrante (run() de los analizadores): no
+    queda guardado en el analizador. Se desempaqueta como (éxito, mensaje).
+    """
+    __slots__ = ('success', 'message', 'ast', 'positions', 'diagnostics')
+
+    def __init__(self, success, message, ast=None, positions=None, diagnostics=()):
+        self.success = success
+        self.message = message
+        self.ast = ast
+        self.positions = positions
+        self.diagnostics = list(diagnostics)
+
+    def __iter__(self):
+        yield self.success
+        yield self.message
+
+    def __repr__(self):
+        return f"AnalysisResult({self.success!r}, {self.message!r})"
+
+def position(diagnostic):
+    """Clave de orden por posición (los errores en el fin del archivo van al final)"""
+    return (diagnostic.line is None, diagnostic.line or 0, diagnostic.column or 0)
+
+def summarize(diagnostics):
+    """Mensaje con todos los diagnósticos de un análisis"""
+    if len(diagnostics) == 1:
+        return str(diagnostics[0])
+    lines = [f"Se encontraron {len(diagnostics)} errores:"]
+    lines.extend(f"  {diagnostic}" for diagnostic in diagnostics)
+    return '\n'.join(lines)
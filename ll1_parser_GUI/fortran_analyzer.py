@@ -2,7 +2,17 @@
 import ply.lex as lex
 import ply.yacc as yacc
 import graphviz
+import copy
+import importlib.util
+import os
 import re
+import sys
+import threading
+from contextlib import contextmanager
+
+from analysis_worker import AnalysisCancelled
+from diagnostics import AnalysisResult, Diagnostic, position, summarize
+from source_map import NodePositions, NullPositions, SourceMap, cached_positions, column_of, map_file, token_end
 
 # === ANALIZADOR LÉXICO ===
 tokens = [
@@ -23,6 +33,10 @@ reserved = {
 
 tokens += list(reserved.values())
 
+# Orden de los tokens esperados en los diagnósticos: el de declaración, con el
+# fin del archivo al final (el mismo en que los lista el parser LL(1))
+EXPECTED_ORDER = {name: index for index, name in enumerate(tokens + ['$end'])}
+
 # Tokens simples
 t_PLUS = r'\+'
 t_MINUS = r'-'
@@ -47,6 +61,7 @@ def t_ID(t):
 
 def t_NUMBER(t):
     r'\d+(\.\d+)?'
+    t.length = len(t.value)    # largo en el texto (el valor pierde el formato)
     t.value = float(t.value) if '.' in t.value else int(t.value)
     return t
 
@@ -62,8 +77,7 @@ t_ignore = ' \t'
 
 def find_column(input_text, token):
     """Calcula la columna de un token en el texto de entrada"""
-    line_start = input_text.rfind('\n', 0, token.lexpos) + 1
-    return (token.lexpos - line_start) + 1
+    return column_of(input_text, token.lexpos)
 
 def t_error(t):
     col = find_column(t.lexer.lexdata, t)
@@ -72,25 +86,52 @@ def t_error(t):
 
 # === ANALIZADOR SINTÁCTICO ===
 class Node:
+    """
+    Nodo del AST. Usa __slots__ (sin __dict__ por instancia) y las hojas
+    comparten una tupla vacía como hijos. Para árboles muy grandes ver
+    ast_arena.ASTArena, la forma plana en arreglos paralelos. row es la
+    fila del nodo en su NodePositions (None si no tiene posición).
+    """
+    __slots__ = ('type', 'children', 'value', 'row')
+    
     def __init__(self, type, children=None, value=None):
         self.type = type
-        self.children = children if children is not None else []
+        self.children = children if children is not None else ()
         self.value = value
+        self.row = None
 
     def __repr__(self):
         return f"{self.type}({self.value})" if self.value else self.type
 
+# Cada acción registra los offsets de su nodo en p.parser.positions
+# (NodePositions del análisis en curso): los tokens traen lexpos y los
+# nodos hijos ya tienen su posición registrada
+
 def p_program(p):
     '''program : statement_list'''
     p[0] = Node('Program', [p[1]])
+    p.parser.positions.copy_span(p[0], p[1])
 
 def p_statement_list(p):
-    '''statement_list : statement
-                     | statement statement_list'''
+    '''statement_list : statement_list statement
+                     | statement'''
+    # Recursión por la izquierda: cada sentencia se reduce apenas termina
+    # y se agrega en su lugar a la lista ya construida (tiempo lineal)
+    # Las sentencias con error (None) no se agregan al AST parcial, y con
+    # keep_ast=False (sólo verificar) no se agrega ninguna
+    positions = p.parser.positions
+    statement = p[len(p) - 1] if p.parser.keep_ast else None
     if len(p) == 2:
-        p[0] = Node('StatementList', [p[1]])
+        p[0] = Node('StatementList', [statement] if statement is not None else [])
+        if statement is not None:
+            positions.copy_span(p[0], statement)
+        else:
+            positions.discard(p[0])
     else:
-        p[0] = Node('StatementList', [p[1]] + p[2].children)
+        if statement is not None:
+            p[1].children.append(statement)
+            positions.cover(p[1], statement)
+        p[0] = p[1]
 
 def p_statement(p):
     '''statement : assignment
@@ -98,19 +139,39 @@ def p_statement(p):
                 | do_loop'''
     p[0] = p[1]
 
+def p_statement_error(p):
+    'statement : error'
+    # Recuperación en modo pánico: PLY descarta tokens hasta uno que pueda
+    # seguir a una sentencia (ID, IF, DO, ENDIF, ENDDO o el fin del archivo)
+    p[0] = None
+    # Ya resincronizado en el comienzo de una sentencia: sin errok PLY calla
+    # los errores hasta desplazar tres tokens y se pierden los de las líneas
+    # siguientes (el LL(1) sí los informa)
+    p.parser.errok()
+
 def p_assignment(p):
     'assignment : ID ASSIGN expression'
-    p[0] = Node('Assignment', [Node('ID', value=p[1]), p[3]])
+    positions = p.parser.positions
+    target = Node('ID', value=p[1])
+    start = p.slice[1].lexpos
+    positions.record(target, start, token_end(p.slice[1]))
+    p[0] = Node('Assignment', [target, p[3]])
+    positions.record(p[0], start, positions.end(p[3]))
 
 def p_if_statement(p):
     'if_statement : IF LPAREN expression RPAREN THEN statement_list ENDIF'
     p[0] = Node('IfStatement', [p[3], p[6]])
+    p.parser.positions.record(p[0], p.slice[1].lexpos, token_end(p.slice[7]))
 
 def p_do_loop(p):
     'do_loop : DO ID ASSIGN expression COMMA expression statement_list ENDDO'
+    positions = p.parser.positions
+    var = Node('ID', value=p[2])
+    positions.record(var, p.slice[2].lexpos, token_end(p.slice[2]))
     p[0] = Node('DoLoop', [
-        Node('ID', value=p[2]), p[4], p[6], p[7]
+        var, p[4], p[6], p[7]
     ])
+    positions.record(p[0], p.slice[1].lexpos, token_end(p.slice[8]))
 
 def p_expression_binop(p):
     '''expression : expression PLUS term
@@ -122,6 +183,8 @@ def p_expression_binop(p):
                   | expression LESSEQUAL term
                   | expression GREATEREQUAL term'''
     p[0] = Node('BinOp', [p[1], p[3]], value=p[2])
+    positions = p.parser.positions
+    positions.record(p[0], positions.start(p[1]), positions.end(p[3]))
 
 def p_expression_term(p):
     'expression : term'
@@ -131,6 +194,8 @@ def p_term_binop(p):
     '''term : term TIMES factor
             | term DIVIDE factor'''
     p[0] = Node('BinOp', [p[1], p[3]], value=p[2])
+    positions = p.parser.positions
+    positions.record(p[0], positions.start(p[1]), positions.end(p[3]))
 
 def p_term_factor(p):
     'term : factor'
@@ -139,14 +204,18 @@ def p_term_factor(p):
 def p_factor_id(p):
     'factor : ID'
     p[0] = Node('ID', value=p[1])
+    p.parser.positions.record(p[0], p.slice[1].lexpos, token_end(p.slice[1]))
 
 def p_factor_number(p):
     'factor : NUMBER'
     p[0] = Node('Number', value=p[1])
+    p.parser.positions.record(p[0], p.slice[1].lexpos, token_end(p.slice[1]))
 
 def p_factor_expr(p):
     'factor : LPAREN expression RPAREN'
     p[0] = p[2]
+    # La expresión entre paréntesis ocupa también los paréntesis
+    p.parser.positions.record(p[0], p.slice[1].lexpos, token_end(p.slice[3]))
 
 def p_error(p):
     if p:
@@ -177,19 +246,408 @@ def visualize_ast(node, graph=None, parent=None, edge_label=""):
     
     return graph
 
+# === TABLAS LALR ===
+# parsetab.py se distribuye junto al módulo y se carga por ruta, de modo que
+# no depende del directorio de trabajo ni de sys.path
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsetab.py')
+
+def grammar_signature():
+    """Firma de la gramática actual, la misma que PLY guarda en _lr_signature"""
+    module = sys.modules[__name__]
+    pinfo = yacc.ParserReflect({k: getattr(module, k) for k in dir(module)}, log=yacc.NullLogger())
+    pinfo.get_all()
+    return pinfo.signature()
+
+# Módulos de los que depende un resultado guardado en cache: las acciones (y el
+# lexer PLY), el lexer DFA y sus palabras reservadas, las posiciones, los
+# diagnósticos y el formato en disco
+SIGNATURE_MODULES = (__name__, 'dfa_lexer', 'll1_parser', 'source_map', 'diagnostics', 'ast_binary')
+
+def parser_signature():
+    """Firma para caches de ASTs: la gramática y el código de sus acciones y de los módulos que usan"""
+    from parse_cache import code_signature
+    return code_signature(SIGNATURE_MODULES, grammar_signature().encode('utf-8'))
+
+def load_tables(path=TABLES_PATH):
+    """Carga el módulo de tablas precompiladas, o None si no existe o no es válido"""
+    if not os.path.exists(path):
+        return None
+    try:
+        spec = importlib.util.spec_from_file_location('fortran_parsetab', path)
+        tables = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(tables)
+    except Exception:
+        return None
+    if getattr(tables, '_tabversion', None) != yacc.__tabversion__:
+        return None
+    return tables
+
+def build_parser(use_cache=True, tables_path=TABLES_PATH):
+    """
+    Construye el parser LALR y devuelve (parser, origen de las tablas).
+    
+    use_cache=True: usa las tablas de parsetab.py sin escribir ningún archivo;
+    si la firma de la gramática no coincide las regenera sólo en memoria.
+    use_cache=False: yacc.yacc() clásico (regenera y escribe parsetab.py y parser.out).
+    """
+    module = sys.modules[__name__]
+    if not use_cache:
+        return enable_recovery(yacc.yacc(module=module)), 'yacc'
+    
+    tables = load_tables(tables_path)
+    if tables is not None and tables._lr_signature == grammar_signature():
+        # optimize=True: la firma ya fue verificada, PLY no la vuelve a comparar
+        return enable_recovery(yacc.yacc(module=module, tabmodule=tables, optimize=True,
+                                         debug=False, write_tables=False)), 'cache'
+    
+    print("Advertencia: tablas LALR desactualizadas, se regeneran en memoria "
+          "(ejecute 'python fortran_analyzer.py --build-tables')", file=sys.stderr)
+    return enable_recovery(yacc.yacc(module=module, tabmodule='fortran_parsetab_stale', debug=False,
+                                     write_tables=False, errorlog=yacc.NullLogger())), 'regenerado'
+
+class _RecoveryActions(dict):
+    """
+    Acciones del estado 'statement : error .'. En LALR ese estado es común
+    a todos los bloques, así que reduciría ante ENDIF/ENDDO aunque el bloque
+    real no los acepte y PLY volvería a fallar en el mismo token sin fin;
+    aquí sólo se reduce si el token es aceptable con la pila actual, y si no
+    PLY lo descarta.
+    """
+
+    def __init__(self, actions, parser):
+        super().__init__(actions)
+        self.parser = parser
+
+    def get(self, token_type, default=None):
+        action = dict.get(self, token_type)
+        if action is None or _accepts(self.parser, self.parser.statestack, token_type, action):
+            return action
+        return default
+
+def _accepts(parser, statestack, token_type, action):
+    """Simula las reducciones sobre una copia de la pila hasta desplazar (True) o fallar (False)"""
+    stack = list(statestack)
+    while action is not None:
+        if action >= 0:
+            return True
+        production = parser.productions[-action]
+        if production.len:
+            del stack[-production.len:]
+        stack.append(parser.goto[stack[-1]][production.name])
+        action = dict.get(parser.action[stack[-1]], token_type)
+    return False
+
+def enable_recovery(parser):
+    """
+    Quita la reducción por defecto de 'statement : error' para que, tras un
+    error, PLY lea el siguiente token y descarte los que no pueden seguir a
+    una sentencia (si reduce sin leerlo vuelve a fallar en el mismo token)
+    """
+    rule = next(i for i, production in enumerate(parser.productions)
+                if production.str == 'statement -> error')
+    for state, action in list(parser.defaulted_states.items()):
+        if action == -rule:
+            del parser.defaulted_states[state]
+    for state, actions in parser.action.items():
+        if -rule in actions.values():
+            parser.action[state] = _RecoveryActions(actions, parser)
+    # Las acciones registran las posiciones de los nodos aquí
+    parser.positions = NodePositions()
+    parser.keep_ast = True
+    return parser
+
+def write_tables():
+    """Regenera parsetab.py y parser.out junto al módulo si la gramática cambió"""
+    tables = load_tables()
+    if tables is not None and tables._lr_signature == grammar_signature():
+        return False
+    yacc.yacc(module=sys.modules[__name__], tabmodule='parsetab',
+              outputdir=os.path.dirname(TABLES_PATH), debug=True)
+    return True
+
+# === SESIONES DE ANÁLISIS ===
+def clone_parser(parser):
+    """
+    Parser LALR con su propio estado de análisis (pilas, errorfunc,
+    posiciones) que comparte las tablas con parser: no se reconstruye nada.
+    Los estados con _RecoveryActions se envuelven de nuevo, porque leen la
+    pila del parser que los usa.
+    """
+    clone = copy.copy(parser)
+    clone.action = {state: _RecoveryActions(actions, clone) if isinstance(actions, _RecoveryActions) else actions
+                    for state, actions in parser.action.items()}
+    clone.positions = NodePositions()
+    clone.keep_ast = True
+    return clone
+
+# Cabecera de cada bloque en la pila del parser (después de IF/DO) y los
+# símbolos que pueden seguirla en su cuerpo: con otro símbolo (p. ej. un
+# operador) la cabecera quedó incompleta
+BLOCK_HEADERS = {'IF': ('LPAREN', 'expression', 'RPAREN', 'THEN'),
+                 'DO': ('ID', 'ASSIGN', 'expression', 'COMMA', 'expression')}
+EXPRESSION_SYMBOLS = {'expression', 'term', 'factor'}
+BODY_START = {'statement_list', 'statement', 'ID', 'error'}
+
+def _header_complete(header, symbols):
+    if len(symbols) < len(header):
+        return False
+    for symbol, expected in zip(symbols, header):
+        if symbol.type != expected and not (expected == 'expression' and symbol.type in EXPRESSION_SYMBOLS):
+            return False
+    return len(symbols) == len(header) or symbols[len(header)].type in BODY_START
+
+class AnalysisSession:
+    """
+    Estado de un análisis LALR: lexer y parser propios, diagnósticos, AST y
+    posiciones. La usa un solo hilo a la vez; FortranAnalyzer.session() las
+    presta desde un pool.
+    """
+    
+    def __init__(self, lexer, parser):
+        self.lexer = lexer
+        self.parser = parser
+        # Los errores se registran en self.diagnostics además de informarse
+        self.parser.errorfunc = self.syntax_error
+        self.diagnostics = []
+        self.ast = None
+        self.positions = NodePositions()    # offsets de los nodos de self.ast
+        # Líneas y columnas de la entrada en curso: de la sesión, así las
+        # sesiones concurrentes no comparten (ni se pisan) el índice
+        self.source = SourceMap('')
+        self.token = None
+        self.before = None    # pila de estados al pedir el lookahead actual
+    
+    def next_token(self):
+        """
+        Token para PLY, que lo pide en un estado sin reducción por defecto:
+        se guarda la pila de ese momento, porque con un token erróneo LALR
+        puede reducir antes de detectar el error (lookaheads fusionados) y
+        el estado del error ya no acepta todo lo que se esperaba
+        """
+        self.before = self.parser.statestack[:]
+        return self.token()
+    
+    def lex_error(self, t):
+        self.diagnostics.append(Diagnostic('léxico', t.lexer.lineno,
+                                           self.source.column(t.lexpos), t.value[0], offset=t.lexpos))
+        t_error(t)
+    
+    def syntax_error(self, p):
+        # Tokens que el estado en que se leyó el token acepta de verdad (una
+        # reducción puede llevar a un estado que los rechaza). Un token que
+        # vuelve a fallar tras la recuperación no se volvió a leer: se usa
+        # la pila actual
+        parser = self.parser
+        stack = self.before if self.before is not None else parser.statestack
+        self.before = None
+        actions = parser.action[stack[-1]]
+        expected = sorted((name for name in actions
+                           if name != 'error' and _accepts(parser, stack, name, dict.get(actions, name))),
+                          key=EXPECTED_ORDER.get)
+        if p:
+            diagnostic = Diagnostic('sintáctico', p.lineno, self.source.column(p.lexpos),
+                                    p.value, expected, p.lexpos)
+        else:
+            diagnostic = Diagnostic('sintáctico', None, None, expected=expected)
+        self.diagnostics.append(diagnostic)
+        p_error(p)
+    
+    def partial_ast(self):
+        """
+        AST con las sentencias ya reducidas cuando PLY abandona el análisis
+        (error en el fin del archivo, p. ej. un bloque sin cerrar). Se arma
+        desde el tope de la pila hacia el fondo: cada IF/DO abierto con la
+        cabecera completa queda como bloque con las sentencias de su cuerpo
+        y se agrega a la lista que lo contiene, como lo cierra el parser
+        LL(1) en el fin del archivo. Un bloque con la cabecera incompleta se
+        omite, como una sentencia con error.
+        """
+        positions = self.parser.positions
+        frames = [(None, [])]    # (IF/DO abierto, o None para el programa; símbolos que lo siguen)
+        for symbol in self.parser.symstack[1:]:
+            if symbol.type in BLOCK_HEADERS:
+                frames.append((symbol, []))
+            else:
+                frames[-1][1].append(symbol)
+        block = None
+        for opener, symbols in reversed(frames):
+            header = BLOCK_HEADERS[opener.type] if opener is not None else ()
+            if opener is not None and not _header_complete(header, symbols):
+                block = None
+                continue
+            rest = symbols[len(header):]
+            statements = []
+            if rest and rest[0].type == 'statement_list':
+                statements.extend(rest[0].value.children)
+            if block is not None:
+                statements.append(block)
+            body = Node('StatementList', statements)
+            if statements:
+                positions.record(body, positions.start(statements[0]), positions.end(statements[-1]))
+            if opener is None:
+                program = Node('Program', [body])
+                positions.copy_span(program, body)
+                return program
+            # El bloque abarca hasta su última sentencia o el fin de la cabecera
+            last = symbols[len(header) - 1]
+            end = positions.end(last.value) if isinstance(last.value, Node) else token_end(last)
+            if statements:
+                end = positions.end(statements[-1])
+            values = [symbol.value for symbol in symbols]
+            if opener.type == 'IF':
+                block = Node('IfStatement', [values[1], body])
+            else:
+                var = Node('ID', value=values[0])
+                positions.record(var, symbols[0].lexpos, token_end(symbols[0]))
+                block = Node('DoLoop', [var, values[2], values[4], body])
+            positions.record(block, opener.lexpos, end)
+    
+    def parse(self, data, lexer=None, keep_ast=True):
+        """
+        Análisis LALR de data (str o buffer de bytes) desde la línea 1;
+        devuelve (éxito, mensaje). lexer reemplaza al de la sesión (p. ej.
+        un envoltorio); con keep_ast=False sólo se verifica la entrada.
+        """
+        lexer = lexer if lexer is not None else self.lexer
+        lexer.lexerrorf = self.lex_error
+        lexer.lineno = 1
+        self.diagnostics = []
+        self.source = SourceMap(data)
+        self.positions = NodePositions(data) if keep_ast else NullPositions()
+        self.parser.positions = self.positions
+        self.parser.keep_ast = keep_ast
+        self.token = lexer.token
+        self.before = None
+        try:
+            self.ast = self.parser.parse(data, lexer=lexer, tokenfunc=self.next_token)
+        finally:
+            self.parser.keep_ast = True
+            self.token = self.before = None
+        if self.diagnostics and self.ast is None:
+            # Con errores queda el AST parcial (las sentencias con error se omiten)
+            self.ast = self.partial_ast()
+        if not keep_ast:
+            self.ast = None
+            self.positions = NodePositions()
+        if self.diagnostics:
+            self.diagnostics.sort(key=position)
+            return False, summarize(self.diagnostics)
+        return True, "Análisis exitoso"
+    
+    def reset(self):
+        """Suelta el resultado anterior antes de volver al pool"""
+        self.diagnostics = []
+        self.ast = None
+        self.source = SourceMap('')
+        self.positions = NodePositions()
+        self.parser.positions = self.positions
+
 # === ANALIZADOR PRINCIPAL ===
 class FortranAnalyzer:
-    def __init__(self):
-        self.lexer = lex.lex()
-        self.parser = yacc.yacc()
+    """
+    analyze() y analyze_path() dejan el resultado en el analizador (ast,
+    diagnostics, positions) y usan self.lexer, que puede reemplazarse por
+    un envoltorio; no deben llamarse desde dos hilos a la vez. run() es
+    reentrante: cada llamada toma una sesión (lexer y parser propios) de un
+    pool de hasta pool_size sesiones, y las tablas LALR se cargan una vez.
+    """
+    
+    def __init__(self, use_cache=True, cache=None, lexer_backend='ply', pool_size=4):
+        # lexer_backend: 'ply' o 'dfa' (mismos tokens, ver dfa_lexer.py)
+        self.lexer_backend = lexer_backend
+        if lexer_backend == 'dfa':
+            from dfa_lexer import DFALexer
+            self.lexer_template = DFALexer()
+        else:
+            self.lexer_template = lex.lex()
+        # Tablas compartidas por todas las sesiones (durante el análisis sólo se leen)
+        self.parser, self.tables_source = build_parser(use_cache)
+        self.lexer = self.lexer_template.clone()
+        self.pool_size = pool_size
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self.diagnostics = []
         self.ast = None
+        self.positions = NodePositions()    # offsets de los nodos de self.ast
+        self.mapping = None    # mmap del archivo de analyze_path
+        # cache: parse_cache.ParseCache opcional, compartible entre analizadores
+        self.cache = cache
+        self.signature = parser_signature() if cache is not None else None
+    
+    @contextmanager
+    def session(self):
+        """Presta una AnalysisSession del pool (o crea una) y la devuelve al terminar"""
+        with self._pool_lock:
+            session = self._pool.pop() if self._pool else None
+        if session is None:
+            session = AnalysisSession(self.lexer_template.clone(), clone_parser(self.parser))
+        try:
+            yield session
+        finally:
+            session.reset()
+            with self._pool_lock:
+                if len(self._pool) < self.pool_size:
+                    self._pool.append(session)
+    
+    def run(self, code, lexer=None):
+        """Análisis reentrante de code: devuelve un AnalysisResult y no modifica el analizador"""
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(code, 'lalr', self.lexer_backend, self.signature)
+            cached = self.cache.get(key, Node)
+            if cached is not None:
+                message, ast, positions = cached
+                return AnalysisResult(True, message, ast, cached_positions(positions, code))
+        with self.session() as session:
+            try:
+                success, message = session.parse(code, lexer)
+            except AnalysisCancelled:
+                raise
+            except Exception as e:
+                return AnalysisResult(False, f"Error: {str(e)}", diagnostics=session.diagnostics)
+            result = AnalysisResult(success, message, session.ast, session.positions, session.diagnostics)
+        if success and key is not None and result.ast is not None:
+            self.cache.put(key, message, result.ast, result.positions)
+        return result
     
     def analyze(self, code):
+        result = self.run(code, self.lexer)
+        self.ast = result.ast
+        self.positions = result.positions if result.positions is not None else NodePositions()
+        self.diagnostics = result.diagnostics
+        return result.success, result.message
+    
+    def analyze_path(self, path, keep_ast=True, lexer=None):
+        """
+        Analiza un archivo sin leerlo a un str: el lexer en tablas recorre un
+        mmap del archivo y las posiciones (diagnósticos y self.positions) son
+        offsets en bytes. Con keep_ast=False sólo se verifica: las listas de
+        sentencias quedan vacías y no se guardan posiciones.
+        lexer: lexer de bytes ya construido (p. ej. el que envuelve el worker).
+        """
+        from dfa_lexer import DFALexer
+        self.close_mapping()
+        self.diagnostics = []
         try:
-            self.ast = self.parser.parse(code, lexer=self.lexer)
-            return True, "Análisis exitoso"
+            self.mapping = map_file(path)
+            with self.session() as session:
+                try:
+                    return session.parse(self.mapping, lexer or DFALexer(), keep_ast)
+                finally:
+                    self.ast, self.positions, self.diagnostics = session.ast, session.positions, session.diagnostics
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             return False, f"Error: {str(e)}"
+        finally:
+            if not keep_ast:
+                self.close_mapping()
+    
+    def close_mapping(self):
+        """Libera el mmap del último analyze_path (self.positions lo usa para línea y columna)"""
+        if hasattr(self.mapping, 'close'):
+            self.mapping.close()
+        self.mapping = None
     
     def generate_ast_image(self, filename="ast"):
         if self.ast:
@@ -200,6 +658,13 @@ class FortranAnalyzer:
 
 # === EJECUCIÓN Y PRUEBAS ===
 if __name__ == "__main__":
+    if '--build-tables' in sys.argv:
+        if write_tables():
+            print(f"Tablas LALR escritas en {TABLES_PATH}")
+        else:
+            print("Las tablas LALR ya están al día")
+        sys.exit(0)
+    
     analyzer = FortranAnalyzer()
     
     # Casos de prueba
@@ -3,9 +3,247 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk, messagebox, filedialog
 from fortran_analyzer import FortranAnalyzer
-from ll1_parser import FortranLL1Analyzer
-import os
-from PIL import Image, ImageTk
+from ll1_parser import FortranLL1Analyzer, lexer_factory
+from incremental import IncrementalAnalyzer
+from parse_cache import ParseCache
+from analysis_worker import AnalysisWorker, CheckpointLexer, CheckpointLexerFactory
+from dfa_lexer import DFALexer
+from token_table import TokenTable
+from ast_layout import TreeLayout
+
+class TokenTableView(tk.Frame):
+    """
+    Tabla de tokens virtualizada: sólo existen filas para lo visible y se
+    rellenan desde una TokenTable al desplazarse
+    """
+    COLUMNS = (('#', 70), ('Tipo', 130), ('Valor', 170), ('Línea', 60), ('Columna', 70))
+    
+    def __init__(self, master):
+        super().__init__(master)
+        self.table = None
+        self.first = 0
+        self.rows = 1
+        
+        self.tree = ttk.Treeview(self, columns=[name for name, _ in self.COLUMNS],
+                                 show='headings', selectmode='none')
+        for name, width in self.COLUMNS:
+            self.tree.heading(name, text=name, anchor=tk.W)
+            self.tree.column(name, width=width, anchor=tk.W)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.tree.bind('<Configure>', self.on_resize)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self.on_wheel)
+    
+    def set_table(self, table):
+        """Muestra otra tabla (None la vacía) desde el primer token"""
+        self.table = table
+        self.first = 0
+        self.render()
+    
+    def render(self):
+        """Rellena las filas visibles a partir del token self.first"""
+        total = len(self.table) if self.table is not None else 0
+        self.first = max(0, min(self.first, total - self.rows))
+        count = min(self.rows, total - self.first)
+        
+        # Reutilizar los ítems existentes; sólo se crean o borran al cambiar el alto
+        items = self.tree.get_children()
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+        for _ in range(len(items), count):
+            self.tree.insert('', tk.END)
+        for offset, item in enumerate(self.tree.get_children()):
+            type, value, line, column = self.table.row(self.first + offset)
+            self.tree.item(item, values=(self.first + offset + 1, type, value, line, column))
+        
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + count) / total)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # Una fila menos por el encabezado
+        rows = max(1, event.height // row_height - 1)
+        if rows != self.rows:
+            self.rows = rows
+            self.render()
+    
+    def on_scroll(self, action, amount, unit=None):
+        if self.table is None:
+            return
+        if action == 'moveto':
+            self.first = int(float(amount) * len(self.table))
+        else:
+            self.first += int(amount) * (self.rows if unit == 'pages' else 1)
+        self.render()
+    
+    def on_wheel(self, event):
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self.on_scroll('scroll', step, 'units')
+        return 'break'
+
+class ASTCanvasView(tk.Frame):
+    """
+    Dibuja el AST directamente en un Canvas con disposición Reingold–Tilford.
+    Arrastrar desplaza, la rueda hace zoom y un clic en un nodo lo expande o
+    colapsa; un doble clic llama a on_select(nodo). Sólo se dibujan los
+    nodos y aristas que caen en la ventana.
+    """
+    X_SPACING = 100    # píxeles entre hermanos con zoom 1
+    Y_SPACING = 70     # píxeles entre niveles con zoom 1
+    NODE_WIDTH = 88
+    NODE_HEIGHT = 34
+    MIN_SCALE, MAX_SCALE = 0.1, 3.0
+    
+    def __init__(self, master, on_select=None):
+        super().__init__(master)
+        self.layout = None
+        self.on_select = on_select
+        self.scale = 1.0
+        # Posición en el canvas del origen de la disposición
+        self.offset_x = self.offset_y = 0.0
+        self.drag_start = None
+        self.dragged = False
+        
+        self.canvas = tk.Canvas(self, bg='white')
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        
+        self.canvas.bind('<Configure>', lambda event: self.redraw())
+        self.canvas.bind('<ButtonPress-1>', self.on_press)
+        self.canvas.bind('<B1-Motion>', self.on_drag)
+        self.canvas.bind('<ButtonRelease-1>', self.on_release)
+        self.canvas.bind('<Double-Button-1>', self.on_double_click)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.canvas.bind(sequence, self.on_wheel)
+    
+    def set_tree(self, ast):
+        """Muestra otro árbol (None lo borra) con la raíz centrada arriba"""
+        self.layout = TreeLayout(ast) if ast is not None else None
+        self.scale = 1.0
+        if self.layout is not None:
+            self.offset_x = self.canvas.winfo_width() / 2 - self.layout.root.x * self.X_SPACING
+        self.offset_y = self.NODE_HEIGHT
+        self.redraw()
+    
+    def fit(self):
+        """Ajusta el zoom para que el árbol expandido quepa en la ventana"""
+        if self.layout is None:
+            return
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        scale = min((width - self.NODE_WIDTH) / max(1.0, self.layout.width * self.X_SPACING),
+                    (height - self.NODE_HEIGHT) / max(1.0, self.layout.height * self.Y_SPACING))
+        self.scale = max(self.MIN_SCALE, min(1.0, scale))
+        self.offset_x = (width - self.layout.width * self.X_SPACING * self.scale) / 2
+        self.offset_y = self.NODE_HEIGHT * self.scale
+        self.redraw()
+    
+    def expand_all(self):
+        if self.layout is not None:
+            self.layout.expand_all()
+            self.redraw()
+    
+    # === COORDENADAS ===
+    
+    def to_screen(self, item):
+        return (self.offset_x + item.x * self.X_SPACING * self.scale,
+                self.offset_y + item.depth * self.Y_SPACING * self.scale)
+    
+    def to_layout(self, x, y):
+        return ((x - self.offset_x) / (self.X_SPACING * self.scale),
+                (y - self.offset_y) / (self.Y_SPACING * self.scale))
+    
+    # === DIBUJO ===
+    
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete('all')
+        if self.layout is None:
+            canvas.create_text(250, 150, text="No hay AST disponible.\nAnalice código válido primero.",
+                               font=('Arial', 12))
+            return
+        
+        # Ventana visible en unidades de la disposición, ampliada medio nodo
+        half_width = self.NODE_WIDTH / 2 / self.X_SPACING
+        half_height = self.NODE_HEIGHT / 2 / self.Y_SPACING
+        x0, y0 = self.to_layout(0, 0)
+        x1, y1 = self.to_layout(canvas.winfo_width(), canvas.winfo_height())
+        x0, x1, y0, y1 = x0 - half_width, x1 + half_width, y0 - half_height, y1 + half_height
+        
+        box_width = self.NODE_WIDTH * self.scale / 2
+        box_height = self.NODE_HEIGHT * self.scale / 2
+        for parent, child in self.layout.visible_edges(x0, x1, y0, y1):
+            px, py = self.to_screen(parent)
+            cx, cy = self.to_screen(child)
+            canvas.create_line(px, py + box_height, cx, cy - box_height, fill='#777777')
+        
+        # Con zoom muy bajo sólo se dibujan las cajas
+        font_size = int(9 * self.scale)
+        for item in self.layout.visible(x0, x1, y0, y1):
+            x, y = self.to_screen(item)
+            collapsed = item.collapsed and item.has_children
+            canvas.create_rectangle(x - box_width, y - box_height, x + box_width, y + box_height,
+                                    fill='#ffe0b2' if collapsed else '#e3f2fd', outline='#455a64')
+            if font_size >= 5:
+                canvas.create_text(x, y, text=item.label, font=('Arial', font_size),
+                                   width=self.NODE_WIDTH * self.scale)
+                if collapsed:
+                    canvas.create_text(x, y + box_height, anchor=tk.N, fill='#e65100',
+                                       text=f"+{len(item.node.children)}", font=('Arial', font_size))
+    
+    # === EVENTOS ===
+    
+    def on_press(self, event):
+        self.drag_start = (event.x, event.y)
+        self.dragged = False
+    
+    def on_drag(self, event):
+        if self.drag_start is None:
+            return
+        dx, dy = event.x - self.drag_start[0], event.y - self.drag_start[1]
+        if abs(dx) + abs(dy) > 2:
+            self.dragged = True
+        self.offset_x += dx
+        self.offset_y += dy
+        self.drag_start = (event.x, event.y)
+        self.redraw()
+    
+    def on_release(self, event):
+        if self.dragged or self.layout is None:
+            return
+        # Clic sin arrastre: expandir o colapsar el nodo bajo el cursor
+        item = self.item_at(event)
+        if item is not None and item.has_children:
+            before = item.x
+            self.layout.toggle(item)
+            # Mantener el nodo en el mismo lugar de la pantalla
+            self.offset_x += (before - item.x) * self.X_SPACING * self.scale
+            self.redraw()
+    
+    def on_double_click(self, event):
+        # Los dos clics ya expandieron y volvieron a colapsar el nodo (o al revés)
+        item = self.item_at(event) if self.layout is not None else None
+        if item is not None and self.on_select is not None:
+            self.on_select(item.node)
+    
+    def item_at(self, event):
+        """Nodo de la disposición bajo el cursor, o None"""
+        x, y = self.to_layout(event.x, event.y)
+        return self.layout.node_at(x, y, self.NODE_WIDTH / 2 / self.X_SPACING,
+                                   self.NODE_HEIGHT / 2 / self.Y_SPACING)
+    
+    def on_wheel(self, event):
+        factor = 1.2 if event.num == 4 or event.delta > 0 else 1 / 1.2
+        scale = max(self.MIN_SCALE, min(self.MAX_SCALE, self.scale * factor))
+        # Zoom centrado en el cursor
+        self.offset_x = event.x - (event.x - self.offset_x) * scale / self.scale
+        self.offset_y = event.y - (event.y - self.offset_y) * scale / self.scale
+        self.scale = scale
+        self.redraw()
+        return 'break'
 
 class CompilerGUI:
     def __init__(self):
@@ -13,11 +251,24 @@ class CompilerGUI:
         self.window.title("Analizador Léxico y Sintáctico - Fortran77")
         self.window.geometry("1000x700")
         
-        # Analizadores
-        self.lalr_analyzer = FortranAnalyzer()
-        self.ll1_analyzer = FortranLL1Analyzer()
+        # Analizadores (con cache compartida: re-analizar código sin cambios es inmediato)
+        self.parse_cache = ParseCache(maxsize=64)
+        self.lalr_analyzer = FortranAnalyzer(cache=self.parse_cache)
+        self.ll1_analyzer = FortranLL1Analyzer(cache=self.parse_cache)
+        # En el editor el LL(1) re-parsea sólo las líneas afectadas por cada edición
+        self.incremental_analyzer = IncrementalAnalyzer(CheckpointLexerFactory(lexer_factory))
         self.current_analyzer = self.lalr_analyzer
         
+        # El análisis corre en un hilo de fondo; el lexer del LALR (y los del
+        # LL(1) incremental) revisan cada cierto número de tokens si el
+        # trabajo fue reemplazado o cancelado; el del LALR además guarda los
+        # tokens para la pestaña Tokens
+        self.lalr_analyzer.lexer = CheckpointLexer(self.lalr_analyzer.lexer)
+        self.worker = AnalysisWorker(self.run_analysis)
+        self.polling = False
+        # Offsets de los nodos del último AST mostrado (para ir del árbol al código)
+        self.positions = None
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -85,6 +336,17 @@ RESULT = (A + B) * C / D"""
         tk.Button(button_frame, text="💾 Guardar", 
                  command=self.save_file).pack(side=tk.LEFT, padx=5)
         
+        tk.Button(button_frame, text="📄 Analizar archivo", 
+                 command=self.analyze_file).pack(side=tk.LEFT, padx=5)
+        
+        tk.Button(button_frame, text="⏹ Cancelar", 
+                 command=self.cancel_analysis).pack(side=tk.LEFT, padx=5)
+        
+        # Avance del análisis en curso
+        self.progress = ttk.Progressbar(button_frame, length=120, 
+                                        mode='determinate', maximum=100)
+        self.progress.pack(side=tk.RIGHT, padx=5)
+        
         # Columna derecha: Resultados y visualización
         right_frame = tk.Frame(main_frame)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
@@ -110,26 +372,27 @@ RESULT = (A + B) * C / D"""
         tokens_frame = tk.Frame(self.notebook)
         self.notebook.add(tokens_frame, text="🔤 Tokens")
         
-        self.tokens_text = scrolledtext.ScrolledText(tokens_frame, 
-                                                      width=50, height=20,
-                                                      font=('Courier New', 9))
-        self.tokens_text.pack(fill=tk.BOTH, expand=True)
+        self.tokens_view = TokenTableView(tokens_frame)
+        self.tokens_view.pack(fill=tk.BOTH, expand=True)
         
         # Pestaña 3: AST (imagen)
         ast_frame = tk.Frame(self.notebook)
         self.notebook.add(ast_frame, text="🌳 Árbol Sintáctico")
         
-        self.ast_canvas = tk.Canvas(ast_frame, bg='white')
-        self.ast_canvas.pack(fill=tk.BOTH, expand=True)
+        self.ast_view = ASTCanvasView(ast_frame, on_select=self.show_node_source)
+        self.ast_view.pack(fill=tk.BOTH, expand=True)
         
         ast_buttons = tk.Frame(ast_frame)
         ast_buttons.pack(fill=tk.X)
         
-        tk.Button(ast_buttons, text="🖼 Generar Imagen AST", 
-                 command=self.generate_ast_image).pack(side=tk.LEFT, padx=5, pady=5)
+        tk.Button(ast_buttons, text="⤢ Ajustar Vista", 
+                 command=self.ast_view.fit).pack(side=tk.LEFT, padx=5, pady=5)
         
-        tk.Button(ast_buttons, text="🔄 Actualizar Vista", 
-                 command=self.refresh_ast_view).pack(side=tk.LEFT, padx=5, pady=5)
+        tk.Button(ast_buttons, text="➕ Expandir Todo", 
+                 command=self.ast_view.expand_all).pack(side=tk.LEFT, padx=5, pady=5)
+        
+        tk.Button(ast_buttons, text="🖼 Exportar Imagen AST", 
+                 command=self.generate_ast_image).pack(side=tk.LEFT, padx=5, pady=5)
         
         # === BARRA DE ESTADO ===
         self.status_bar = tk.Label(self.window, text="Listo", 
@@ -146,103 +409,198 @@ RESULT = (A + B) * C / D"""
             self.status_bar.config(text="Parser LL(1) seleccionado")
     
     def analyze_code(self):
-        """Analiza el código ingresado"""
+        """Envía el código al hilo de análisis (una petición nueva reemplaza a la anterior)"""
         code = self.code_text.get('1.0', tk.END)
         
         if not code.strip():
             messagebox.showwarning("Advertencia", "Por favor ingrese código a analizar")
             return
         
-        self.status_bar.config(text="Analizando...")
-        self.window.update()
-        
+        self.worker.submit(code, self.parser_var.get())
+        self.start_polling("Analizando...")
+    
+    def analyze_file(self):
+        """Analiza un archivo sin cargarlo en el editor (para archivos muy grandes)"""
+        filename = filedialog.askopenfilename(
+            title="Analizar archivo",
+            filetypes=[("Fortran", "*.f *.for *.f77"), ("Texto", "*.txt"), ("Todos", "*.*")]
+        )
+        if filename:
+            self.worker.submit(None, self.parser_var.get(), path=filename)
+            self.start_polling(f"Analizando {filename}...")
+    
+    def start_polling(self, text):
+        """Reinicia el avance y lee los eventos del trabajador hasta que termine"""
+        self.progress['value'] = 0
+        self.status_bar.config(text=text)
+        if not self.polling:
+            self.polling = True
+            self.window.after(50, self.poll_analysis)
+    
+    def cancel_analysis(self):
+        """Cancela el análisis en curso"""
+        if self.worker.busy:
+            self.worker.cancel()
+            self.progress['value'] = 0
+            self.status_bar.config(text="⏹ Análisis cancelado")
+    
+    def run_analysis(self, job):
+        """Trabajo del hilo de fondo: análisis sintáctico y tabla de tokens (no toca widgets)"""
+        if job.path is not None:
+            return self.run_file_analysis(job)
+        code = job.code
+        result = {'update': None}
+        
+        # Los tokens salen de la misma pasada del lexer que usa el parser
+        job.report("Análisis sintáctico", 0.0)
+        if job.parser_kind == "LL1":
+            analyzer = self.incremental_analyzer
+            analyzer.job = analyzer.lexer_factory.job = job
+            try:
+                success, message = analyzer.analyze(code)
+            finally:
+                analyzer.job = analyzer.lexer_factory.job = None
+            self.ll1_analyzer.ast = self.incremental_analyzer.ast
+            result['update'] = self.incremental_analyzer.last_update
+            # Copias: el analizador modifica su tabla de tokens y sus
+            # posiciones en la próxima edición (el árbol no: cada edición
+            # crea una raíz nueva y deja intacta la anterior)
+            table = self.incremental_analyzer.token_table.copy()
+            ast = self.incremental_analyzer.ast
+            positions = self.incremental_analyzer.positions.snapshot()
+        else:
+            lexer = self.lalr_analyzer.lexer
+            lexer.job = job
+            lexer.table = table = TokenTable()
+            success, message = self.lalr_analyzer.analyze(code)
+            if not table:
+                # Acierto de cache: el parser no leyó tokens, se lexea sólo para la tabla
+                lexer.input(code)
+                while lexer.token() is not None:
+                    pass
+            ast = self.lalr_analyzer.ast
+            positions = self.lalr_analyzer.positions
+        result.update(success=success, message=message, tokens=table, ast=ast, positions=positions)
+        return result
+    
+    def run_file_analysis(self, job):
+        """
+        Verifica un archivo sobre un mmap, sin leerlo a un str: no se arman
+        la tabla de tokens ni el AST, así la memoria no crece con el archivo
+        """
+        lexer = CheckpointLexer(DFALexer())
+        lexer.job = job
+        lexer.stage = "Verificando archivo"
+        analyzer = self.ll1_analyzer if job.parser_kind == "LL1" else self.lalr_analyzer
+        job.report(lexer.stage, 0.0)
+        success, message = analyzer.analyze_path(job.path, keep_ast=False, lexer=lexer)
+        return {'update': None, 'success': success, 'message': message, 'tokens': None,
+                'ast': None, 'positions': None, 'path': job.path, 'token_count': lexer.delivered}
+    
+    def poll_analysis(self):
+        """Procesa en el hilo de Tk los eventos del análisis en segundo plano"""
+        # Si el trabajador ya estaba libre antes de leer la cola, sus eventos ya están en ella
+        busy = self.worker.busy
+        for kind, data in self.worker.poll():
+            if kind == 'progress':
+                stage, fraction = data
+                self.progress['value'] = fraction * 100
+                self.status_bar.config(text=f"{stage}... {fraction:.0%}")
+            elif kind == 'done':
+                self.progress['value'] = 100
+                self.show_results(data)
+            elif kind == 'error':
+                self.progress['value'] = 0
+                self.status_bar.config(text=f"❌ Error interno del análisis: {data}")
+        if busy:
+            self.window.after(50, self.poll_analysis)
+        else:
+            self.polling = False
+    
+    def show_results(self, result):
+        """Muestra los resultados de un análisis terminado"""
         # Limpiar resultados anteriores
         self.result_text.delete('1.0', tk.END)
-        self.tokens_text.delete('1.0', tk.END)
         
-        # Análisis léxico (tokens)
         self.result_text.insert(tk.END, "=== ANÁLISIS LÉXICO ===\n\n")
-        try:
-            lexer = lex.lex(module=__import__('fortran_analyzer'))
-            lexer.input(code)
-            
-            token_count = 0
-            for token in lexer:
-                token_count += 1
-                self.tokens_text.insert(tk.END, 
-                    f"{token_count:3d}. {token.type:15s} = {token.value}\n")
-            
-            self.result_text.insert(tk.END, f"✅ Tokens identificados: {token_count}\n\n")
-        except Exception as e:
-            self.result_text.insert(tk.END, f"❌ Error léxico: {e}\n\n")
+        self.tokens_view.set_table(result['tokens'])
+        self.ast_view.set_tree(result['ast'])
+        self.positions = result['positions']
+        if result['tokens'] is not None:
+            self.result_text.insert(tk.END, f"✅ Tokens identificados: {len(result['tokens'])}\n\n")
+        else:
+            # Archivo analizado sin cargarlo en el editor: sólo el conteo
+            self.result_text.insert(tk.END, f"Archivo: {result['path']}\n")
+            self.result_text.insert(tk.END, f"✅ Tokens identificados: {result['token_count']}\n\n")
         
         # Análisis sintáctico
         self.result_text.insert(tk.END, "=== ANÁLISIS SINTÁCTICO ===\n\n")
         
-        if self.parser_var.get() == "LL1":
-            success, message = self.ll1_analyzer.analyze(code)
-        else:
-            success, message = self.lalr_analyzer.analyze(code)
-        
-        if success:
-            self.result_text.insert(tk.END, f"✅ {message}\n")
+        if result['success']:
+            self.result_text.insert(tk.END, f"✅ {result['message']}\n")
             self.result_text.insert(tk.END, "\nEstructura sintáctica válida.\n")
-            self.result_text.insert(tk.END, "Puede visualizar el AST en la pestaña 'Árbol Sintáctico'.\n")
-            self.status_bar.config(text="✅ Análisis completado exitosamente")
+            if result['ast'] is not None:
+                self.result_text.insert(tk.END, "Puede visualizar el AST en la pestaña 'Árbol Sintáctico'.\n")
+            self.status_bar.config(text="✅ Análisis completado exitosamente" + self.update_summary(result['update']))
         else:
-            self.result_text.insert(tk.END, f"❌ {message}\n")
+            self.result_text.insert(tk.END, f"❌ {result['message']}\n")
+            if result['ast'] is not None:
+                self.result_text.insert(tk.END, "\nLa pestaña 'Árbol Sintáctico' muestra el AST parcial (las sentencias con errores se omiten).\n")
+            elif result['tokens'] is None:
+                self.result_text.insert(tk.END, "\nEn un archivo analizado sin cargarlo las columnas se cuentan en bytes.\n")
             self.status_bar.config(text="❌ Errores encontrados")
         
         # Configurar colores
         self.result_text.tag_config('success', foreground='green')
         self.result_text.tag_config('error', foreground='red')
     
-    def generate_ast_image(self):
-        """Genera imagen del AST"""
-        if self.parser_var.get() == "LL1" and self.ll1_analyzer.ast:
-            # Para LL1, usar visualización del AST
-            from fortran_analyzer import visualize_ast
-            graph = visualize_ast(self.ll1_analyzer.ast)
-            graph.render('ast_ll1', format='png', cleanup=True)
-            self.status_bar.config(text="✅ Imagen AST generada: ast_ll1.png")
-            self.refresh_ast_view('ast_ll1.png')
-        elif self.lalr_analyzer.ast:
-            msg = self.lalr_analyzer.generate_ast_image('ast_lalr')
-            self.status_bar.config(text=f"✅ {msg}")
-            self.refresh_ast_view('ast_lalr.png')
-        else:
-            messagebox.showinfo("Info", "Primero debe analizar código válido")
-    
-    def refresh_ast_view(self, filename=None):
-        """Muestra la imagen del AST en el canvas"""
-        if filename is None:
-            filename = 'ast_lalr.png' if self.parser_var.get() == "LALR" else 'ast_ll1.png'
-        
-        if not os.path.exists(filename):
-            self.ast_canvas.delete('all')
-            self.ast_canvas.create_text(250, 150, 
-                text="No hay imagen AST disponible.\nGenere el AST primero.",
-                font=('Arial', 12))
+    def show_node_source(self, node):
+        """Selecciona en el editor el código de un nodo del AST (doble clic en el árbol)"""
+        span = self.positions.range(node) if self.positions is not None else None
+        if span is None:
             return
-        
+        (line, column), (end_line, end_column) = span
+        start, end = f"{line}.{column - 1}", f"{end_line}.{end_column - 1}"
+        self.code_text.tag_remove(tk.SEL, '1.0', tk.END)
+        self.code_text.tag_add(tk.SEL, start, end)
+        self.code_text.mark_set(tk.INSERT, start)
+        self.code_text.see(start)
+        self.code_text.focus_set()
+        self.status_bar.config(text=f"{node.type}: línea {line}, columna {column} a línea {end_line}, columna {end_column}")
+    
+    def update_summary(self, update):
+        """Texto para la barra de estado con el alcance del último re-análisis LL(1)"""
+        if update is None:
+            return ""
+        if update['mode'] == 'incremental':
+            first, last = update['lines']
+            return f" (incremental: líneas {first}-{last}, {update['statements']} sentencias)"
+        return f" ({update['mode']})"
+    
+    def generate_ast_image(self):
+        """Exporta el AST a PNG con Graphviz (requiere el programa dot)"""
         try:
-            img = Image.open(filename)
-            # Redimensionar si es muy grande
-            max_size = (600, 500)
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            self.ast_photo = ImageTk.PhotoImage(img)
-            self.ast_canvas.delete('all')
-            self.ast_canvas.create_image(10, 10, anchor=tk.NW, image=self.ast_photo)
-            self.ast_canvas.config(scrollregion=self.ast_canvas.bbox('all'))
+            if self.parser_var.get() == "LL1" and self.ll1_analyzer.ast:
+                # Para LL1, usar visualización del AST
+                from fortran_analyzer import visualize_ast
+                graph = visualize_ast(self.ll1_analyzer.ast)
+                graph.render('ast_ll1', format='png', cleanup=True)
+                self.status_bar.config(text="✅ Imagen AST generada: ast_ll1.png")
+            elif self.lalr_analyzer.ast:
+                msg = self.lalr_analyzer.generate_ast_image('ast_lalr')
+                self.status_bar.config(text=f"✅ {msg}")
+            else:
+                messagebox.showinfo("Info", "Primero debe analizar código válido")
         except Exception as e:
-            messagebox.showerror("Error", f"No se pudo cargar la imagen: {e}")
+            messagebox.showerror("Error", f"No se pudo generar la imagen: {e}")
     
     def clear_code(self):
         """Limpia el editor de código"""
         self.code_text.delete('1.0', tk.END)
         self.result_text.delete('1.0', tk.END)
-        self.tokens_text.delete('1.0', tk.END)
+        self.tokens_view.set_table(None)
+        self.ast_view.set_tree(None)
+        self.positions = None
         self.status_bar.config(text="Editor limpiado")
     
     def load_file(self):
@@ -283,6 +641,5 @@ RESULT = (A + B) * C / D"""
 
 # === PUNTO DE ENTRADA ===
 if __name__ == "__main__":
-    import ply.lex as lex  # Importar aquí para el análisis léxico en la GUI
     app = CompilerGUI()
     app.run()
@@ -0,0 +1,486 @@
+# incremental.py
+# Re-análisis incremental para el editor: sólo se re-lexea y re-parsea la
+# menor región de líneas que contiene la edición, reutilizando el resto del AST
+from diagnostics import Diagnostic, position, summarize
+from ll1_parser import LL1Parser, Node, STATEMENT_FIRST_NAMES, lexer_factory
+from source_map import NodePositions, PendingShifts, SourceMap, preorder
+from token_table import TokenTable
+
+INF = float('inf')
+
+class _SpanParser(LL1Parser):
+    """
+    LL1Parser que además registra, por id de nodo, las líneas que ocupa
+    cada sentencia y la región de líneas de cada lista de sentencias. Con
+    job (AnalysisJob de la GUI) revisa la cancelación e informa el avance
+    cada CHECK_EVERY sentencias.
+    """
+    CHECK_EVERY = 500
+
+    def __init__(self, recover=False, lexer_factory=lexer_factory, job=None):
+        super().__init__(lexer_factory, recover=recover)
+        self.job = job
+        self.statements = 0
+        self.spans = {}      # id(sentencia) → [primera línea, última línea, época, sincroniza]
+        self.regions = {}    # id(StatementList) → [línea de apertura, línea de cierre, época]
+        self.last_token = None
+
+    def start(self, code, first_line=1):
+        """Prepara el lexer y el primer token; las líneas se numeran desde first_line"""
+        self.input_code = code
+        self.source = SourceMap(code, first_line)
+        self.positions = NodePositions(code)    # offsets relativos a code
+        self.last_end = 0
+        self.lexer = self.lexer_factory.get_lexer(code)
+        self.lexer.lineno = first_line
+        self.lexer.lexerrorf = self.lex_error
+        self.diagnostics = []
+        self.last_token = None
+        self.tokens = list(self.lexer)
+        self.pos = 0
+        self.current_token = self.next_token()
+
+    def parse_statements(self, code, first_line):
+        """
+        Analiza `code` como una lista de sentencias completa y devuelve sus
+        nodos; SyntaxError si sobra entrada o hubo errores léxicos.
+        """
+        self.start(code, first_line)
+        body = self.statement_list()
+        del self.regions[id(body)]
+        self.positions.discard(body)
+        if self.current_token is not None:
+            self.error(STATEMENT_FIRST_NAMES)
+        if self.diagnostics:
+            raise SyntaxError("Error léxico en la región editada")
+        return body.children
+
+    def parse_region(self, code, first_line):
+        """
+        Analiza con recuperación `code`, sentencias de primer nivel desde
+        un punto de sincronización, como program(); devuelve las sentencias
+        reconocidas y deja los errores en self.diagnostics.
+        """
+        self.start(code, first_line)
+        program = self.program()
+        body = program.children[0]
+        del self.regions[id(body)]
+        self.positions.discard(body)
+        self.positions.discard(program)
+        return body.children
+
+    def consume(self, expected_type=None):
+        token = super().consume(expected_type)
+        self.last_token = token
+        return token
+
+    def statement(self):
+        if self.job is not None:
+            self.statements += 1
+            if self.statements % self.CHECK_EVERY == 0:
+                self.job.check()
+                self.job.report("Análisis sintáctico", self.pos / max(1, len(self.tokens)))
+        token = self.current_token
+        first = token.lineno if token is not None else None
+        # Punto de sincronización: sentencia de primer nivel que empieza su
+        # línea sin un error informado en su primer token. El análisis desde
+        # ahí no depende de lo anterior (ver IncrementalAnalyzer._reparse_top)
+        sync = (token is not None and not self.closers and token.lexpos != self.last_report
+                and (self.pos < 2 or self.tokens[self.pos - 2].lineno < token.lineno))
+        node = super().statement()
+        self.spans[id(node)] = [first, self.last_token.lineno, 0, sync]
+        return node
+
+    def statement_list(self):
+        open_line = self.last_token.lineno if self.last_token is not None else 0
+        node = super().statement_list()
+        close_line = self.current_token.lineno if self.current_token is not None else INF
+        self.regions[id(node)] = [open_line, close_line, 0]
+        return node
+
+def _common_prefix(a, b):
+    """Largo del prefijo común (búsqueda binaria, comparaciones en C)"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.startswith(b[lo:mid], lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix(a, b, limit):
+    """Largo del sufijo común, sin superar limit caracteres"""
+    lo, hi = 0, limit
+    la, lb = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a.endswith(b[lb - mid:lb - lo], 0, la - lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _body(node):
+    """StatementList hija de un IF o DO (None para asignaciones)"""
+    if node.type == 'IfStatement':
+        return node.children[1]
+    if node.type == 'DoLoop':
+        return node.children[3]
+    return None
+
+class IncrementalAnalyzer:
+    """
+    Analizador LL(1) con la misma interfaz que FortranLL1Analyzer
+    (analyze(code) → (éxito, mensaje) y self.ast) que conserva el análisis
+    anterior: ante una edición re-parsea sólo las líneas de las sentencias
+    afectadas dentro del bloque IF/DO más interno que las contiene y
+    reutiliza el resto del árbol. Si la región no se puede re-parsear por
+    separado, o el código tiene errores, se re-parsea con recuperación el
+    tramo de sentencias de primer nivel entre dos puntos de sincronización
+    alrededor de la edición; el árbol parcial y los diagnósticos del resto
+    se conservan.
+
+    Un árbol ya entregado no se modifica (la GUI lo dibuja mientras llega
+    la próxima edición): la edición crea una copia de la lista de
+    sentencias afectada y de sus ancestros hasta una raíz nueva, y
+    comparte el resto de los nodos.
+
+    lexer_factory y job permiten a la GUI cancelar un análisis largo (ver
+    analysis_worker.CheckpointLexerFactory); una cancelación no modifica
+    el estado.
+    """
+
+    def __init__(self, lexer_factory=lexer_factory):
+        self.lexer_factory = lexer_factory
+        self.job = None    # AnalysisJob del análisis en curso (GUI)
+        self.ast = None
+        self.text = None
+        self.spans = {}
+        self.regions = {}
+        self.line_shifts = PendingShifts()    # desplazamientos de spans y regions sin aplicar
+        self.token_table = None    # tokens del texto actual (los mismos que consume el parser)
+        self.positions = NodePositions()    # offsets de los nodos en el texto actual
+        self.diagnostics = []
+        self.last_update = None
+
+    # === ANÁLISIS COMPLETO ===
+
+    def full_parse(self, code):
+        # Con recuperación: ante errores se informan todos y queda el AST parcial
+        parser = _SpanParser(recover=True, lexer_factory=self.lexer_factory, job=self.job)
+        self.ast = parser.parse(code)
+        self.positions = parser.positions
+        self.diagnostics = sorted(parser.diagnostics, key=position)
+        self.token_table = TokenTable.from_tokens(parser.tokens, parser.source)
+        self.last_update = {'mode': 'completo', 'lines': None, 'statements': None}
+        # También con errores: el árbol parcial describe el texto y las
+        # próximas ediciones se re-parsean por tramos (_reparse_top)
+        self.text = code
+        self.spans = parser.spans
+        self.regions = parser.regions
+        self.line_shifts = PendingShifts()
+        return self._status("Análisis exitoso (Parser LL(1))")
+
+    def _status(self, message):
+        if self.diagnostics:
+            return False, summarize(self.diagnostics)
+        return True, message
+
+    # === ANÁLISIS INCREMENTAL ===
+
+    def analyze(self, code):
+        if self.text is None or self.ast is None:
+            return self.full_parse(code)
+        if code == self.text:
+            self.last_update = {'mode': 'sin cambios', 'lines': None, 'statements': 0}
+            return self._status("Análisis exitoso (Parser LL(1))")
+        edit = self._edit(code)
+        if not self.diagnostics:
+            try:
+                return self._reparse(code, edit)
+            except SyntaxError:
+                pass
+        return self._reparse_top(code, edit)
+
+    def _edit(self, new):
+        """
+        Alcance de la edición: (prefijo común, fin de lo insertado en new,
+        primera y última línea dañadas del texto anterior, variación de líneas)
+        """
+        old = self.text
+        prefix = _common_prefix(old, new)
+        suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+        old_end, new_end = len(old) - suffix, len(new) - suffix
+        first = old.count('\n', 0, prefix) + 1
+        last = first + old.count('\n', prefix, old_end)
+        delta = new.count('\n', prefix, new_end) - old.count('\n', prefix, old_end)
+        return prefix, new_end, first, last, delta
+
+    def _bounds(self, new, edit, lo, hi):
+        """Offsets en new de las líneas lo..hi+delta (lo está dentro del prefijo común)"""
+        prefix, new_end, first, _, delta = edit
+        old = self.text
+        begin = old.rfind('\n', 0, prefix) + 1
+        for _ in range(first - lo):
+            begin = old.rfind('\n', 0, begin - 1) + 1
+        if hi == INF:
+            return begin, len(new)
+        end = new_end
+        for _ in range(hi + delta - (first + new.count('\n', prefix, new_end)) + 1):
+            end = new.find('\n', end)
+            if end < 0:
+                return begin, len(new)
+            end += 1
+        return begin, end
+
+    def _reparse(self, new, edit):
+        first, last, delta = edit[2:]
+        statement_list, start, stop, lo, hi, path = self._locate(first, last)
+        begin, end = self._bounds(new, edit, lo, hi)
+        parser = _SpanParser(lexer_factory=self.lexer_factory, job=self.job)
+        statements = parser.parse_statements(new[begin:end], lo)
+        if path:
+            # Dentro de un bloque no hay puntos de sincronización
+            for node in statements:
+                parser.spans[id(node)][3] = False
+        self._splice(new, statement_list, start, stop, path, parser, statements, begin, end, lo, hi, delta)
+        self.diagnostics = []
+        self.last_update = {'mode': 'incremental', 'lines': (lo, hi + delta),
+                            'statements': len(statements)}
+        return True, "Análisis exitoso (Parser LL(1), incremental)"
+
+    def _reparse_top(self, new, edit):
+        """
+        Re-parsea con recuperación las sentencias de primer nivel entre el
+        último punto de sincronización anterior a la edición y el primero
+        posterior (o el inicio y el fin del texto). Si el tramo deja un
+        bloque abierto o una sentencia incompleta (error en el fin del
+        tramo) se extiende a los puntos de sincronización siguientes.
+        """
+        first, last, delta = edit[2:]
+        statement_list = self.ast.children[0]
+        children = statement_list.children
+        spans, current = self.spans, self._current
+        # El primer token de la sentencia inicial debe quedar antes de la
+        # edición: las sentencias anteriores lo miraron como lookahead
+        start = self._bisect(children, first, 0) - 1
+        while start >= 0 and not spans[id(children[start])][3]:
+            start -= 1
+        lo = current(spans[id(children[start])])[0] if start >= 0 else 1
+        start = max(start, 0)
+        stop = self._bisect(children, last + 1, 0)
+        while stop < len(children) and not spans[id(children[stop])][3]:
+            stop += 1
+        while True:
+            hi = current(spans[id(children[stop])])[0] - 1 if stop < len(children) else INF
+            begin, end = self._bounds(new, edit, lo, hi)
+            parser = _SpanParser(recover=True, lexer_factory=self.lexer_factory, job=self.job)
+            statements = parser.parse_region(new[begin:end], lo)
+            if hi == INF or all(d.line is not None for d in parser.diagnostics):
+                break
+            # Se extiende hasta otro punto de sincronización, duplicando el tramo
+            stop = min(len(children), stop + max(1, stop - start))
+            while stop < len(children) and not spans[id(children[stop])][3]:
+                stop += 1
+
+        # Diagnósticos: los del tramo reemplazan a los de sus líneas
+        kept = []
+        char_delta = len(new) - len(self.text)
+        for d in self.diagnostics:
+            if d.line is None:
+                if hi != INF:
+                    kept.append(d)
+            elif d.line < lo:
+                kept.append(d)
+            elif d.line > hi:
+                kept.append(Diagnostic(d.kind, d.line + delta, d.column, d.found, d.expected,
+                                       d.offset + char_delta))
+        for d in parser.diagnostics:
+            if d.offset is not None:
+                d.offset += begin
+            kept.append(d)
+
+        self._splice(new, statement_list, start, stop, [], parser, statements, begin, end,
+                     lo, hi, delta if hi != INF else 0)
+        self.diagnostics = sorted(kept, key=position)
+        self.last_update = {'mode': 'incremental',
+                            'lines': (lo, hi + delta if hi != INF else lo + new.count('\n', begin, end)),
+                            'statements': len(statements)}
+        return self._status("Análisis exitoso (Parser LL(1), incremental)")
+
+    def _splice(self, new, statement_list, start, stop, path, parser, statements, begin, end, lo, hi, delta):
+        """
+        Reemplaza las sentencias start..stop de statement_list por las
+        re-parseadas de las líneas lo..hi (begin..end en new) y actualiza
+        posiciones, tokens y líneas
+        """
+        children = statement_list.children
+        removed = children[start:stop]
+        statement_list = self._replace(statement_list, children[:start] + statements + children[stop:], path)
+        for node in removed:
+            self._forget(node)
+        if delta:
+            self._shift(hi, delta)
+        self._update_positions(statement_list, begin, end, len(new) - len(self.text), parser.positions)
+        self.positions.set_text(new)
+        self.token_table.splice_lines(lo, hi, TokenTable.from_tokens(parser.tokens, parser.source), delta)
+        # Las líneas de la región ya están en el texto nuevo
+        epoch = self.line_shifts.epoch
+        for table, lines in ((self.spans, parser.spans), (self.regions, parser.regions)):
+            for key, entry in lines.items():
+                entry[2] = epoch
+                table[key] = entry
+        self.text = new
+
+    def _locate(self, first, last):
+        """
+        Busca la lista de sentencias más interna que contiene las líneas
+        first..last y la corrida de sentencias a re-parsear. Devuelve
+        (lista, inicio, fin, primera línea, última línea, camino), donde
+        camino son los pares (lista, índice del bloque IF/DO) desde la raíz.
+        """
+        spans = self.spans
+        current = self._current
+        path = []
+        statement_list = self.ast.children[0]
+        while True:
+            children = statement_list.children
+            # Primera sentencia que termina en/después de first, y fin de la corrida
+            start = self._bisect(children, first, 1)
+            stop = self._bisect(children, last + 1, 0)
+            if stop - start == 1:
+                body = _body(children[start])
+                if body is not None:
+                    open_line, close_line, _ = current(self.regions[id(body)])
+                    if open_line < first and last < close_line:
+                        path.append((statement_list, start))
+                        statement_list = body
+                        continue
+            break
+
+        while True:
+            lo, hi = first, last
+            if start < stop:
+                lo = min(lo, current(spans[id(children[start])])[0])
+                hi = max(hi, current(spans[id(children[stop - 1])])[1])
+            # Las sentencias vecinas no pueden compartir líneas con la región
+            while start > 0 and current(spans[id(children[start - 1])])[1] >= lo:
+                start -= 1
+                lo = min(lo, current(spans[id(children[start])])[0])
+            while stop < len(children) and current(spans[id(children[stop])])[0] <= hi:
+                stop += 1
+                hi = max(hi, current(spans[id(children[stop - 1])])[1])
+            open_line, close_line, _ = current(self.regions[id(statement_list)])
+            if open_line < lo and hi < close_line:
+                return statement_list, start, stop, lo, hi, path
+            # La región toca la cabecera o el cierre del bloque: subir un nivel
+            statement_list, index = path.pop()
+            children = statement_list.children
+            first_line, last_line = current(spans[id(children[index])])[:2]
+            first = min(lo, first_line)
+            last = max(hi, last_line)
+            start, stop = index, index + 1
+
+    def _bisect(self, children, line, side):
+        """Primer índice cuya línea final (side=1) o inicial (side=0) es >= line"""
+        spans = self.spans
+        lo, hi = 0, len(children)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._current(spans[id(children[mid])])[side] < line:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _replace(self, statement_list, children, path):
+        """
+        Copia de statement_list con otros hijos, y de sus ancestros (los de
+        path y la raíz) apuntando a las copias; self.ast pasa a la raíz
+        nueva. Las copias heredan la fila, las líneas y la región de su
+        original.
+        """
+        copy = edited = Node('StatementList', children)
+        self._rename(statement_list, copy)
+        for parent, index in reversed(path):
+            block = parent.children[index]
+            body = _body(block)
+            new_block = Node(block.type, [copy if child is body else child for child in block.children],
+                             block.value)
+            self._rename(block, new_block)
+            siblings = list(parent.children)
+            siblings[index] = new_block
+            copy = Node('StatementList', siblings)
+            self._rename(parent, copy)
+        program = Node('Program', [copy])
+        self._rename(self.ast, program)
+        self.ast = program
+        return edited
+
+    def _rename(self, old, new):
+        self.positions.replace(old, new)
+        for table in (self.spans, self.regions):
+            entry = table.pop(id(old), None)
+            if entry is not None:
+                table[id(new)] = entry
+
+    def _update_positions(self, statement_list, begin, end, char_delta, region):
+        """
+        Offsets tras reemplazar el texto begin..end (en el texto nuevo): se
+        desplaza lo posterior, se agregan los nodos re-parseados y se
+        recalcula el alcance de la lista que los contiene
+        """
+        positions = self.positions
+        if char_delta:
+            positions.shift(end - char_delta, char_delta)
+        positions.merge(region, begin)
+        children = statement_list.children
+        if children:
+            positions.record(statement_list, positions.start(children[0]), positions.end(children[-1]))
+        else:
+            positions.discard(statement_list)
+        program = self.ast
+        if statement_list is program.children[0]:
+            positions.discard(program)
+            positions.copy_span(program, statement_list)
+        # Las filas de los nodos reemplazados quedan libres: se compacta de vez en cuando
+        if len(positions.starts) > 2 * len(positions) + 1024:
+            positions.compact(program)
+
+    def _forget(self, root):
+        """Elimina las posiciones registradas de una sentencia y sus anidadas"""
+        for node in preorder(root):
+            self.positions.discard(node)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            self.spans.pop(id(node), None)
+            body = _body(node)
+            if body is not None:
+                self.regions.pop(id(body), None)
+                stack.extend(body.children)
+
+    def _shift(self, after, delta):
+        """
+        Desplaza delta líneas las posiciones posteriores a la línea after:
+        se anota y _current lo aplica a cada entrada al leerla. Cada
+        PendingShifts.LIMIT ediciones se ponen al día todas.
+        """
+        shifts = self.line_shifts
+        shifts.shift(after + 1, delta)
+        if len(shifts.log) >= PendingShifts.LIMIT:
+            for table in (self.spans, self.regions):
+                for entry in table.values():
+                    self._current(entry)
+            shifts.rebase()
+
+    def _current(self, entry):
+        """Entrada de spans o regions ([primera, última, época, ...]) al día"""
+        shifts = self.line_shifts
+        epoch = entry[2]
+        if epoch != shifts.epoch:
+            entry[0] = shifts.current(entry[0], epoch)
+            entry[1] = shifts.current(entry[1], epoch)
+            entry[2] = shifts.epoch
+        return entry
@@ -2,6 +2,11 @@
 # Parser LL(1) Descendente Recursivo para Fortran77 simplificado
 import ply.lex as lex
 import re
+import sys
+
+from analysis_worker import AnalysisCancelled
+from diagnostics import AnalysisResult, Diagnostic, position, summarize
+from source_map import NodePositions, NullPositions, SourceMap, cached_positions, column_of, map_file, token_end
 
 # === ANALIZADOR LÉXICO (reutilizado) ===
 tokens = [
@@ -45,6 +50,7 @@ def t_ID(t):
 
 def t_NUMBER(t):
     r'\d+(\.\d+)?'
+    t.length = len(t.value)    # largo en el texto (el valor pierde el formato)
     t.value = float(t.value) if '.' in t.value else int(t.value)
     return t
 
@@ -59,25 +65,96 @@ def t_newline(t):
 t_ignore = ' \t'
 
 def find_column(input_text, token):
-    line_start = input_text.rfind('\n', 0, token.lexpos) + 1
-    return (token.lexpos - line_start) + 1
+    return column_of(input_text, token.lexpos)
 
 def t_error(t):
     col = find_column(t.lexer.lexdata, t)
     print(f"Error léxico: Carácter ilegal '{t.value[0]}' en línea {t.lexer.lineno}, columna {col}")
     t.lexer.skip(1)
 
+# === FÁBRICA DE LEXERS ===
+class LexerFactory:
+    """
+    Construye el lexer una sola vez (en PLY, expresión maestra incluida) y
+    entrega clones baratos para cada análisis, con el estado y lineno
+    reiniciados. backend='dfa' usa dfa_lexer.DFALexer, el autómata en
+    tablas que produce los mismos tokens.
+    """
+    
+    def __init__(self, module=None, backend='ply'):
+        self.module = module
+        self.backend = backend
+        self._base = None
+    
+    def base(self):
+        """Lexer plantilla; se construye en el primer uso"""
+        if self._base is None:
+            if self.backend == 'dfa':
+                from dfa_lexer import DFALexer
+                self._base = DFALexer()
+            else:
+                self._base = lex.lex(module=self.module)
+        return self._base
+    
+    def get_lexer(self, code=None):
+        """Devuelve un clon limpio del lexer, opcionalmente con la entrada cargada"""
+        lexer = self.base().clone()
+        lexer.lineno = 1
+        lexer.lexstate = 'INITIAL'
+        lexer.lexstatestack = []
+        if code is not None:
+            lexer.input(code)
+        return lexer
+
+lexer_factory = LexerFactory(sys.modules[__name__])
+dfa_lexer_factory = LexerFactory(backend='dfa')
+LEXER_FACTORIES = {'ply': lexer_factory, 'dfa': dfa_lexer_factory}
+
 # === NODO DEL AST ===
 class Node:
+    """
+    Nodo del AST. Usa __slots__ (sin __dict__ por instancia) y las hojas
+    comparten una tupla vacía como hijos. Para árboles muy grandes ver
+    ast_arena.ASTArena, la forma plana en arreglos paralelos. row es la
+    fila del nodo en su NodePositions (None si no tiene posición).
+    """
+    __slots__ = ('type', 'children', 'value', 'row')
+    
     def __init__(self, type, children=None, value=None):
         self.type = type
-        self.children = children if children is not None else []
+        self.children = children if children is not None else ()
         self.value = value
+        self.row = None
 
     def __repr__(self):
         return f"{self.type}({self.value})" if self.value else self.type
 
 # === PARSER LL(1) DESCENDENTE RECURSIVO ===
+# Conjuntos FIRST usados para decidir cada producción
+STATEMENT_FIRST = frozenset(['ID', 'IF', 'DO'])
+EXPRESSION_OPS = frozenset(['PLUS', 'MINUS', 'EQUALS', 'NOTEQUALS', 'LESS', 'GREATER', 'LESSEQUAL', 'GREATEREQUAL'])
+TERM_OPS = frozenset(['TIMES', 'DIVIDE'])
+# Terminadores de bloque: en modo pánico también son puntos de sincronización
+BLOCK_END = frozenset(['ENDIF', 'ENDDO'])
+# Conjuntos esperados (en orden) para los mensajes de error
+STATEMENT_FIRST_NAMES = ('ID', 'IF', 'DO')
+FACTOR_FIRST = ('ID', 'NUMBER', 'LPAREN')
+# Orden de los tokens esperados: el de declaración, con el fin del archivo al
+# final (el mismo que usa el parser LALR)
+EXPECTED_ORDER = {name: index for index, name in enumerate(tokens + ['$end'])}
+# Tokens que aceptan las producciones ε recién elegidas al terminar un término
+# o una expresión: también se esperan en el error que siga
+TERM_SUFFIX = frozenset(TERM_OPS)
+EXPRESSION_SUFFIX = TERM_OPS | EXPRESSION_OPS
+NO_SUFFIX = frozenset()
+
+class ParseError(SyntaxError):
+    """Error sintáctico ya registrado en modo recuperación; lo atrapa la lista de sentencias"""
+    
+    def __init__(self, diagnostic):
+        super().__init__(str(diagnostic))
+        self.diagnostic = diagnostic
+
 class LL1Parser:
     """
     Gramática LL(1) sin recursividad izquierda:
@@ -100,27 +177,104 @@ class LL1Parser:
     mulop → TIMES | DIVIDE
     
     factor → ID | NUMBER | LPAREN expression RPAREN
+    
+    Con recover=True no se detiene en el primer error: recuperación en modo
+    pánico que sincroniza en el primer ID/IF/DO o ENDIF/ENDDO después del
+    error (el terminador de otro bloque se informa y se descarta); todos los errores quedan en self.diagnostics y parse()
+    devuelve el AST parcial con las sentencias que sí se reconocieron.
     """
     
-    def __init__(self):
-        self.lexer = lex.lex()
+    def __init__(self, lexer_factory=lexer_factory, streaming=False, recover=False):
+        self.lexer_factory = lexer_factory
+        self.lexer = lexer_factory.get_lexer()
+        # streaming=True: los tokens se piden al lexer a medida que el parser
+        # avanza (memoria O(1)); streaming=False: se materializan en self.tokens
+        self.streaming = streaming
+        self.token_stream = None
         self.tokens = []
         self.pos = 0
         self.current_token = None
         self.input_code = ""
+        self.source = SourceMap("")    # líneas y columnas de input_code
+        self.positions = NodePositions()    # offsets de cada nodo del AST construido
+        self.last_end = 0    # fin del último token consumido
+        self.keep_ast = True    # False: sólo verificar, las sentencias no se guardan
+        self.recover = recover
+        self.diagnostics = []
+        self.closers = []    # terminadores de los bloques abiertos (para los mensajes)
+        self.last_report = None    # offset del último error informado (-1: fin del archivo)
+        self.suffix = NO_SUFFIX    # FIRST de las producciones ε elegidas desde el último token
     
-    def error(self, expected=""):
-        if self.current_token:
-            col = find_column(self.input_code, self.current_token)
-            msg = f"Error sintáctico en línea {self.current_token.lineno}, columna {col}: "
-            msg += f"token inesperado '{self.current_token.value}'"
-            if expected:
-                msg += f", se esperaba {expected}"
+    # === ERRORES Y RECUPERACIÓN ===
+    
+    def report(self, expected=()):
+        """
+        Registra un error sintáctico en el token actual y devuelve su
+        diagnóstico. Un token se informa una sola vez aunque varias reglas
+        lo rechacen (p. ej. una lista vacía y luego el bloque que la sigue).
+        Los esperados incluyen los que aceptaban las producciones ε elegidas
+        antes de llegar a este token (p. ej. un operador tras una expresión).
+        """
+        token = self.current_token
+        offset = token.lexpos if token else -1
+        if offset == self.last_report:
+            return self.diagnostics[-1]
+        self.last_report = offset
+        expected = tuple(sorted(self.suffix.union(expected), key=EXPECTED_ORDER.get))
+        self.suffix = NO_SUFFIX
+        if token:
+            diagnostic = Diagnostic('sintáctico', token.lineno, self.source.column(token.lexpos),
+                                    token.value, expected, token.lexpos)
+        else:
+            diagnostic = Diagnostic('sintáctico', None, None, expected=expected)
+        self.diagnostics.append(diagnostic)
+        return diagnostic
+    
+    def error(self, expected=()):
+        diagnostic = self.report(expected)
+        if self.recover:
+            raise ParseError(diagnostic)
+        raise SyntaxError(str(diagnostic))
+    
+    def lex_error(self, t):
+        """Registra el carácter ilegal; t_error lo informa y lo salta"""
+        self.diagnostics.append(Diagnostic('léxico', t.lexer.lineno,
+                                           self.source.column(t.lexpos), t.value[0], offset=t.lexpos))
+        t_error(t)
+    
+    def synchronize(self):
+        """
+        Modo pánico: descarta tokens desde el del error hasta un terminador de
+        bloque o un token que inicie una sentencia (ID, IF, DO), en la misma
+        línea o no, como hace la recuperación del parser LALR. Siempre avanza:
+        el error nunca está en el primer token de una sentencia.
+        """
+        while self.current_token is not None:
+            token_type = self.current_token.type
+            if token_type in BLOCK_END or token_type in STATEMENT_FIRST:
+                return
+            self.current_token = self.next_token()
+    
+    def skip_token(self):
+        """Descarta el token actual (que no puede iniciar nada) y sincroniza"""
+        self.current_token = self.next_token()
+        self.synchronize()
+    
+    # === POSICIONES ===
+    
+    def make(self, type, start, children=None, value=None):
+        """Crea un nodo que abarca desde start hasta el último token consumido"""
+        node = Node(type, children, value)
+        self.positions.record(node, start, self.last_end)
+        return node
+    
+    def close_list(self, node):
+        """Una lista de sentencias abarca de su primera a su última sentencia"""
+        if node.children:
+            positions = self.positions
+            positions.record(node, positions.start(node.children[0]), positions.end(node.children[-1]))
         else:
-            msg = "Error sintáctico: fin inesperado del archivo"
-            if expected:
-                msg += f", se esperaba {expected}"
-        raise SyntaxError(msg)
+            self.positions.discard(node)
     
     def peek(self):
         """Devuelve el token actual sin consumirlo (lookahead)"""
@@ -129,62 +283,140 @@ class LL1Parser:
     def consume(self, expected_type=None):
         """Consume el token actual y avanza al siguiente"""
         if expected_type and (not self.current_token or self.current_token.type != expected_type):
-            self.error(expected_type)
+            self.error((expected_type,))
         
         token = self.current_token
+        self.current_token = self.next_token()
+        self.suffix = NO_SUFFIX
+        if token is not None:
+            self.last_end = token_end(token)
+        return token
+    
+    def next_token(self):
+        """Siguiente token de la entrada, o None al final"""
+        if self.streaming:
+            return next(self.token_stream, None)
         if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
             self.pos += 1
-        else:
-            self.current_token = None
-        return token
+            return self.tokens[self.pos - 1]
+        return None
     
-    def parse(self, code):
-        """Punto de entrada del parser"""
+    def parse(self, code, lexer=None, keep_ast=True):
+        """
+        Punto de entrada del parser. lexer: lexer ya construido (con lineno
+        en 1) en lugar de un clon de la fábrica; keep_ast=False sólo verifica
+        la entrada y devuelve un Program con la lista de sentencias vacía.
+        """
         self.input_code = code
-        # Reiniciar el lexer para este código
-        self.lexer = lex.lex()  # Crear un nuevo lexer cada vez
-        self.lexer.input(code)
-        self.tokens = list(self.lexer)
-        self.pos = 1  # Empezar en 1 porque current_token ya tiene el primer token
-        self.current_token = self.tokens[0] if self.tokens else None
+        self.source = SourceMap(code)
+        self.positions = NodePositions(code) if keep_ast else NullPositions(code)
+        self.keep_ast = keep_ast
+        self.last_end = 0
+        if lexer is None:
+            # Clon del lexer precompilado: lineno y estado reiniciados para este código
+            lexer = self.lexer_factory.get_lexer(code)
+        else:
+            lexer.input(code)
+        self.lexer = lexer
+        self.lexer.lexerrorf = self.lex_error
+        self.diagnostics = []
+        self.closers = []
+        self.last_report = None
+        self.suffix = NO_SUFFIX
+        if self.streaming:
+            # current_token actúa como buffer de un token de lookahead
+            self.tokens = []
+            self.token_stream = iter(self.lexer.token, None)
+        else:
+            self.tokens = list(self.lexer)
+            self.pos = 0
+        self.current_token = self.next_token()
         
-        return self.program()
+        ast = self.program()
+        if self.streaming:
+            # Terminar de leer la entrada para reportar los mismos errores léxicos
+            for _ in self.token_stream:
+                pass
+            self.token_stream = None
+        return ast
     
     # === PRODUCCIONES ===
     
     def program(self):
-        """program → statement_list"""
+        """program → statement_list $"""
         stmts = self.statement_list()
-        return Node('Program', [stmts])
+        # Lo que sigue a la lista de sentencias (p. ej. un ENDIF sin IF) sobra
+        while self.current_token is not None:
+            try:
+                self.error(STATEMENT_FIRST_NAMES + ('$end',))
+            except ParseError:
+                self.skip_token()
+                self.statement_list_prime(stmts.children)
+                self.close_list(stmts)
+        program = Node('Program', [stmts])
+        self.positions.copy_span(program, stmts)
+        return program
     
     def statement_list(self):
         """statement_list → statement statement_list'"""
         statements = []
         
-        # FIRST(statement) = {ID, IF, DO}
-        if self.peek() and self.peek().type in ['ID', 'IF', 'DO']:
-            statements.append(self.statement())
-            statements.extend(self.statement_list_prime())
+        # FIRST(statement) = {ID, IF, DO}; statement_list' ya empieza por statement,
+        # pero la lista no puede quedar vacía (un bloque sin cuerpo, un archivo
+        # sólo con comentarios). Otros tokens los informa statement_list'.
+        token = self.current_token
+        if token is None or token.type in BLOCK_END:
+            if self.recover:
+                self.report(STATEMENT_FIRST_NAMES)
+            else:
+                self.error(STATEMENT_FIRST_NAMES)
+        self.statement_list_prime(statements, empty=True)
         
-        return Node('StatementList', statements)
+        node = Node('StatementList', statements)
+        self.close_list(node)
+        return node
     
-    def statement_list_prime(self):
-        """statement_list' → statement statement_list' | ε"""
-        statements = []
+    def statement_list_prime(self, statements, empty=False):
+        """
+        statement_list' → statement statement_list' | ε
         
+        La recursión por la derecha se resuelve como un ciclo que agrega cada
+        sentencia en la lista recibida (sin copiar listas ni crecer la pila).
+        empty: la lista todavía no tiene sentencias, así que su terminador
+        aún no se espera.
+        """
         # FIRST(statement) = {ID, IF, DO}
         # FOLLOW(statement_list') = {ENDIF, ENDDO, $}
-        if self.peek() and self.peek().type in ['ID', 'IF', 'DO']:
-            statements.append(self.statement())
-            statements.extend(self.statement_list_prime())
+        while self.current_token is not None:
+            token_type = self.current_token.type
+            if token_type in STATEMENT_FIRST:
+                empty = False
+                try:
+                    statement = self.statement()
+                    if self.keep_ast:
+                        statements.append(statement)
+                except ParseError:
+                    # La sentencia con error se omite del AST parcial
+                    self.synchronize()
+            elif self.recover and not (self.closers and token_type == self.closers[-1]):
+                # Un token que no inicia sentencia ni cierra este bloque (también
+                # el terminador de otro bloque): se informa y se descarta, como
+                # en el LALR (que lo reduce a una sentencia con error), y el
+                # bloque sigue abierto
+                closer = () if empty else (self.closers[-1] if self.closers else '$end',)
+                self.report(STATEMENT_FIRST_NAMES + closer)
+                self.skip_token()
+                empty = False
+            else:
+                break
         
+        self.suffix = self.suffix.union(STATEMENT_FIRST)
         return statements
     
     def statement(self):
         """statement → assignment | if_statement | do_loop"""
         if not self.peek():
-            self.error("sentencia (ID, IF o DO)")
+            self.error(STATEMENT_FIRST_NAMES)
         
         token_type = self.peek().type
         
@@ -195,37 +427,54 @@ class LL1Parser:
         elif token_type == 'DO':
             return self.do_loop()
         else:
-            self.error("ID, IF o DO")
+            self.error(STATEMENT_FIRST_NAMES)
     
     def assignment(self):
         """assignment → ID ASSIGN expression"""
         id_token = self.consume('ID')
+        target = self.make('ID', id_token.lexpos, value=id_token.value)
         self.consume('ASSIGN')
         expr = self.expression()
-        return Node('Assignment', [Node('ID', value=id_token.value), expr])
+        return self.make('Assignment', id_token.lexpos, [target, expr])
     
     def if_statement(self):
         """if_statement → IF LPAREN expression RPAREN THEN statement_list ENDIF"""
-        self.consume('IF')
+        if_token = self.consume('IF')
         self.consume('LPAREN')
         condition = self.expression()
         self.consume('RPAREN')
         self.consume('THEN')
+        self.closers.append('ENDIF')
         body = self.statement_list()
-        self.consume('ENDIF')
-        return Node('IfStatement', [condition, body])
+        self.closers.pop()
+        self.close_block('ENDIF')
+        return self.make('IfStatement', if_token.lexpos, [condition, body])
     
     def do_loop(self):
         """do_loop → DO ID ASSIGN expression COMMA expression statement_list ENDDO"""
-        self.consume('DO')
+        do_token = self.consume('DO')
         loop_var = self.consume('ID')
+        var = self.make('ID', loop_var.lexpos, value=loop_var.value)
         self.consume('ASSIGN')
         start = self.expression()
         self.consume('COMMA')
         end = self.expression()
+        self.closers.append('ENDDO')
         body = self.statement_list()
-        self.consume('ENDDO')
-        return Node('DoLoop', [Node('ID', value=loop_var.value), start, end, body])
+        self.closers.pop()
+        self.close_block('ENDDO')
+        return self.make('DoLoop', do_token.lexpos, [var, start, end, body])
+    
+    def close_block(self, terminator):
+        """
+        Consume ENDIF/ENDDO. En modo recuperación, si falta (fin del archivo)
+        se informa y se da por insertado; el terminador de otro bloque ya lo
+        descartó statement_list'.
+        """
+        if self.recover and (self.current_token is None or self.current_token.type != terminator):
+            self.report((terminator,))
+            return None
+        return self.consume(terminator)
     
     def expression(self):
         """expression → term expression'"""
@@ -233,20 +482,19 @@ class LL1Parser:
         return self.expression_prime(left)
     
     def expression_prime(self, left):
-        """expression' → addop term expression' | relop term expression' | ε"""
-        if not self.peek():
-            return left
-        
-        token_type = self.peek().type
+        """
+        expression' → addop term expression' | relop term expression' | ε
         
-        # addop o relop
-        if token_type in ['PLUS', 'MINUS', 'EQUALS', 'NOTEQUALS', 'LESS', 'GREATER', 'LESSEQUAL', 'GREATEREQUAL']:
+        Iterativo: cada operador envuelve al resultado acumulado, lo que deja
+        el árbol BinOp asociado a la izquierda.
+        """
+        # addop o relop; cualquier otro token (o el fin) es ε
+        while self.current_token is not None and self.current_token.type in EXPRESSION_OPS:
             op_token = self.consume()
             right = self.term()
-            node = Node('BinOp', [left, right], value=op_token.value)
-            return self.expression_prime(node)
+            left = self.make('BinOp', self.positions.start(left), [left, right], op_token.value)
         
-        # ε (epsilon)
+        self.suffix = EXPRESSION_SUFFIX
         return left
     
     def term(self):
@@ -255,57 +503,138 @@ class LL1Parser:
         return self.term_prime(left)
     
     def term_prime(self, left):
-        """term' → mulop factor term' | ε"""
-        if not self.peek():
-            return left
-        
-        token_type = self.peek().type
-        
-        # mulop
-        if token_type in ['TIMES', 'DIVIDE']:
+        """term' → mulop factor term' | ε  (iterativo, asociativo a la izquierda)"""
+        # mulop; cualquier otro token (o el fin) es ε
+        while self.current_token is not None and self.current_token.type in TERM_OPS:
             op_token = self.consume()
             right = self.factor()
-            node = Node('BinOp', [left, right], value=op_token.value)
-            return self.term_prime(node)
+            left = self.make('BinOp', self.positions.start(left), [left, right], op_token.value)
         
-        # ε (epsilon)
+        self.suffix = TERM_SUFFIX
         return left
     
     def factor(self):
         """factor → ID | NUMBER | LPAREN expression RPAREN"""
         if not self.peek():
-            self.error("ID, NUMBER o '('")
+            self.error(FACTOR_FIRST)
         
         token_type = self.peek().type
         
         if token_type == 'ID':
             token = self.consume('ID')
-            return Node('ID', value=token.value)
+            return self.make('ID', token.lexpos, value=token.value)
         elif token_type == 'NUMBER':
             token = self.consume('NUMBER')
-            return Node('Number', value=token.value)
+            return self.make('Number', token.lexpos, value=token.value)
         elif token_type == 'LPAREN':
-            self.consume('LPAREN')
+            lparen = self.consume('LPAREN')
             expr = self.expression()
             self.consume('RPAREN')
+            # La expresión entre paréntesis ocupa también los paréntesis
+            self.positions.record(expr, lparen.lexpos, self.last_end)
             return expr
         else:
-            self.error("ID, NUMBER o '('")
+            self.error(FACTOR_FIRST)
+
+# Módulos de los que depende un resultado guardado en cache: el parser (y el
+# lexer PLY), el lexer DFA, las posiciones, los diagnósticos y el formato en disco
+SIGNATURE_MODULES = (__name__, 'dfa_lexer', 'source_map', 'diagnostics', 'ast_binary')
+
+def parser_signature():
+    """Firma para caches de ASTs: en un parser escrito a mano la gramática es el código"""
+    from parse_cache import code_signature
+    return code_signature(SIGNATURE_MODULES)
 
 # === CLASE INTEGRADORA ===
 class FortranLL1Analyzer:
-    def __init__(self):
-        self.parser = LL1Parser()
+    def __init__(self, streaming=False, cache=None, lexer_backend='ply'):
+        # Con recuperación: un análisis informa todos los errores (self.diagnostics)
+        # lexer_backend: 'ply' o 'dfa' (mismos tokens, ver dfa_lexer.py)
+        self.parser = LL1Parser(LEXER_FACTORIES[lexer_backend], streaming=streaming, recover=True)
+        self.lexer_backend = lexer_backend
         self.ast = None
+        self.positions = NodePositions()    # offsets de los nodos de self.ast
+        self.diagnostics = []
+        self.mapping = None    # mmap del archivo de analyze_path
+        # cache: parse_cache.ParseCache opcional, compartible entre analizadores
+        self.cache = cache
+        self.signature = parser_signature() if cache is not None else None
     
     def analyze(self, code):
+        result = self.run(code, self.parser)
+        if result.ast is not None or result.success:
+            # Con errores self.ast queda con el AST parcial
+            self.ast = result.ast
+            self.positions = result.positions
+        self.diagnostics = result.diagnostics
+        return result.success, result.message
+    
+    def run(self, code, parser=None):
+        """
+        Análisis reentrante de code: devuelve un AnalysisResult sin modificar
+        el analizador. Sin parser se usa un LL1Parser nuevo (es barato: su
+        lexer es un clon del precompilado), así varias llamadas pueden correr
+        en paralelo.
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(code, 'll1', self.lexer_backend, self.signature)
+            cached = self.cache.get(key, Node)
+            if cached is not None:
+                message, ast, positions = cached
+                return AnalysisResult(True, message, ast, cached_positions(positions, code))
+        if parser is None:
+            parser = LL1Parser(self.parser.lexer_factory, streaming=self.parser.streaming, recover=True)
+        try:
+            ast = parser.parse(code)
+        except SyntaxError as e:
+            return AnalysisResult(False, str(e), diagnostics=parser.diagnostics)
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            return AnalysisResult(False, f"Error: {str(e)}", diagnostics=parser.diagnostics)
+        diagnostics = sorted(parser.diagnostics, key=position)
+        if diagnostics:
+            return AnalysisResult(False, summarize(diagnostics), ast, parser.positions, diagnostics)
+        message = "Análisis exitoso (Parser LL(1))"
+        if key is not None:
+            self.cache.put(key, message, ast, parser.positions)
+        return AnalysisResult(True, message, ast, parser.positions)
+    
+    def analyze_path(self, path, keep_ast=True, lexer=None):
+        """
+        Analiza un archivo sin leerlo a un str: el lexer en tablas recorre un
+        mmap del archivo, token por token, y las posiciones (diagnósticos y
+        self.positions) son offsets en bytes. Con keep_ast=False sólo se
+        verifica: self.ast queda en None y la memoria no crece con el archivo.
+        lexer: lexer de bytes ya construido (p. ej. el que envuelve el worker).
+        """
+        self.close_mapping()
         try:
-            self.ast = self.parser.parse(code)
+            self.mapping = map_file(path)
+            parser = LL1Parser(dfa_lexer_factory, streaming=True, recover=True)
+            ast = parser.parse(self.mapping, lexer or dfa_lexer_factory.get_lexer(), keep_ast)
+            self.ast = ast if keep_ast else None
+            self.positions = parser.positions if keep_ast else NodePositions()
+            self.diagnostics = sorted(parser.diagnostics, key=position)
+            if self.diagnostics:
+                return False, summarize(self.diagnostics)
             return True, "Análisis exitoso (Parser LL(1))"
         except SyntaxError as e:
             return False, str(e)
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             return False, f"Error: {str(e)}"
+        finally:
+            if not keep_ast:
+                self.close_mapping()
+    
+    def close_mapping(self):
+        """Libera el mmap del último analyze_path (self.positions lo usa para línea y columna)"""
+        if hasattr(self.mapping, 'close'):
+            self.mapping.close()
+        self.mapping = None
 
 # === PRUEBAS ===
 if __name__ == "__main__":
@@ -0,0 +1,483 @@
+# lsp_server.py
+# Servidor Language Server Protocol (transporte stdio) para editores: usa el
+# parser LL(1) a través de IncrementalAnalyzer, así cada edición re-parsea
+# sólo las sentencias afectadas. Publica diagnósticos con un retardo
+# (debounce) tras cada didChange, lista los símbolos del documento
+# (variables asignadas y variables de DO) y resuelve go-to-definition de
+# variables. Los resultados se guardan por versión del documento: una
+# petición sobre texto sin cambios nunca vuelve a analizar.
+import argparse
+import bisect
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+from incremental import IncrementalAnalyzer, _body
+from source_map import SourceMap
+
+DEBOUNCE = 0.3    # segundos sin cambios antes de analizar y publicar diagnósticos
+
+# Constantes del protocolo
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+SYMBOL_VARIABLE = 13
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+SERVER_NOT_INITIALIZED = -32002
+
+# === TRANSPORTE ===
+
+def read_message(stream):
+    """Siguiente mensaje JSON-RPC (cabeceras Content-Length), o None al cerrarse el flujo"""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            if length is not None:
+                break
+            continue
+        name, _, value = line.decode('ascii').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return json.loads(stream.read(length))
+
+def write_message(stream, message):
+    body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    stream.write(b'Content-Length: %d\r\n\r\n' % len(body) + body)
+    stream.flush()
+
+# === POSICIONES ===
+# LSP cuenta líneas desde 0 y columnas en unidades UTF-16
+
+def utf16_length(text):
+    return len(text) if text.isascii() else len(text.encode('utf-16-le')) // 2
+
+def to_lsp(source, offset):
+    """Position LSP de un offset del texto"""
+    index = source.line_index(offset)
+    start = source.line_starts[index]
+    return {'line': index, 'character': utf16_length(source.text[start:offset])}
+
+def from_lsp(source, position):
+    """Offset del texto de una Position LSP (recortada al fin de su línea)"""
+    line = position['line']
+    if line >= source.line_count:
+        return len(source.text)
+    start, end = source.line_span(source.first_line + line)
+    character = position['character']
+    text = source.text[start:end]
+    if text.isascii():
+        return start + min(character, len(text))
+    units = 0
+    for index, char in enumerate(text):
+        if units >= character:
+            return start + index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return end
+
+def lsp_range(source, start, end):
+    return {'start': to_lsp(source, start), 'end': to_lsp(source, end)}
+
+# === DOCUMENTOS ===
+
+class Document:
+    """
+    Un documento abierto: texto, versión y el IncrementalAnalyzer que lo
+    sigue. Lo que se calcula a partir del AST (diagnósticos LSP, tabla de
+    definiciones) se guarda junto con la versión para la que vale. El
+    lock serializa las ediciones, los análisis y las consultas.
+    """
+
+    def __init__(self, uri, text, version):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.revision = 0    # cuenta los cambios (la versión del cliente podría faltar)
+        self.analyzer = IncrementalAnalyzer()
+        self.analyzed = None    # revisión del último análisis
+        self.parses = 0
+        self.lock = threading.Lock()
+        self.timer = None
+        self._source = None
+        self._cache = {}    # nombre → (revisión, valor)
+
+    @property
+    def source(self):
+        if self._source is None or self._source.text is not self.text:
+            self._source = SourceMap(self.text)
+        return self._source
+
+    def apply(self, changes, version):
+        """Aplica los contentChanges de un didChange (completos o por rango)"""
+        for change in changes:
+            if 'range' not in change:
+                self.text = change['text']
+                continue
+            source = self.source
+            start = from_lsp(source, change['range']['start'])
+            end = from_lsp(source, change['range']['end'])
+            self.text = self.text[:start] + change['text'] + self.text[end:]
+        self.version = version
+        self.revision += 1
+
+    def analyze(self):
+        """Analiza el texto actual si esta revisión no se analizó todavía"""
+        if self.analyzed != self.revision:
+            self.analyzer.analyze(self.text)
+            self.analyzed = self.revision
+            self.parses += 1
+        return self.analyzer
+
+    def cached(self, name, compute):
+        """Valor derivado del AST para la versión actual, calculado una vez"""
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != self.revision:
+            self.analyze()
+            entry = self._cache[name] = (self.revision, compute())
+        return entry[1]
+
+    # === VALORES DERIVADOS ===
+
+    def diagnostics(self):
+        source = self.source
+        result = []
+        for diagnostic in self.analyzer.diagnostics:
+            if diagnostic.offset is None:
+                # Error en el fin del archivo
+                start = end = len(self.text)
+            else:
+                start = diagnostic.offset
+                end = min(start + len(str(diagnostic.found or ' ')), source.line_span(source.line(start))[1])
+            result.append({'range': lsp_range(source, start, max(start, end)), 'severity': SEVERITY_ERROR,
+                           'source': 'fortran77-ll1', 'message': str(diagnostic)})
+        return result
+
+    def definitions(self):
+        """
+        Sitios de definición de cada variable (nombre en mayúsculas: Fortran
+        no distingue mayúsculas) en orden del texto: (inicio, fin, nodo ID,
+        sentencia, 'asignación' o 'DO')
+        """
+        table = {}
+        ast = self.analyzer.ast
+        if ast is None:
+            return table
+        positions = self.analyzer.positions
+        # Sólo se recorren las listas de sentencias: las expresiones no definen variables
+        stack = [ast.children[0]] if ast.children else []
+        while stack:
+            statement_list = stack.pop()
+            for node in reversed(statement_list.children):
+                body = _body(node)
+                if body is not None:
+                    stack.append(body)
+            for node in statement_list.children:
+                if node.type == 'Assignment':
+                    kind = 'asignación'
+                elif node.type == 'DoLoop':
+                    kind = 'DO'
+                else:
+                    continue
+                target = node.children[0]
+                span = positions.span(target)
+                if span is not None:
+                    table.setdefault(target.value.upper(), []).append((span[0], span[1], target, node, kind))
+        for sites in table.values():
+            sites.sort(key=lambda site: site[0])
+        return table
+
+    def symbols(self):
+        """DocumentSymbol de cada variable asignada y de cada variable de DO (en su primera definición)"""
+        source = self.source
+        positions = self.analyzer.positions
+        symbols = []
+        seen = set()
+        for sites in self.cached('definitions', self.definitions).values():
+            for start, end, target, statement, kind in sites:
+                if (target.value.upper(), kind) in seen:
+                    continue
+                seen.add((target.value.upper(), kind))
+                statement_span = positions.span(statement) or (start, end)
+                symbols.append({
+                    'name': target.value, 'kind': SYMBOL_VARIABLE,
+                    'detail': 'variable de DO' if kind == 'DO' else 'variable',
+                    'range': lsp_range(source, *statement_span),
+                    'selectionRange': lsp_range(source, start, end),
+                })
+        symbols.sort(key=lambda symbol: (symbol['selectionRange']['start']['line'],
+                                         symbol['selectionRange']['start']['character']))
+        return symbols
+
+    def definition(self, position):
+        """Definición de la variable en position: la más cercana antes del uso (o la primera)"""
+        analyzer = self.analyze()
+        if analyzer.ast is None:
+            return None
+        source = self.source
+        offset = from_lsp(source, position)
+        node = None
+        # Con el cursor justo después del identificador también vale
+        for candidate in (offset, offset - 1):
+            if candidate >= 0:
+                node = analyzer.positions.node_at(analyzer.ast, candidate)
+                if node is not None and node.type == 'ID':
+                    break
+        if node is None or node.type != 'ID':
+            return None
+        sites = self.cached('definitions', self.definitions).get(node.value.upper())
+        if not sites:
+            return None
+        use = analyzer.positions.start(node)
+        index = bisect.bisect_right([site[0] for site in sites], use) - 1
+        start, end = sites[max(index, 0)][:2]
+        return {'uri': self.uri, 'range': lsp_range(source, start, end)}
+
+# === SERVIDOR ===
+
+class LanguageServer:
+    """
+    Bucle del servidor: el hilo principal lee mensajes y atiende las
+    peticiones; los diagnósticos se publican desde un temporizador por
+    documento que se reinicia con cada cambio (debounce).
+    """
+
+    def __init__(self, reader, writer, debounce=DEBOUNCE):
+        self.reader = reader
+        self.writer = writer
+        self.debounce = debounce
+        self.documents = {}
+        self.write_lock = threading.Lock()
+        self.initialized = False
+        self.shutdown_requested = False
+        self.handlers = {
+            'initialize': self.initialize,
+            'shutdown': self.shutdown,
+            'textDocument/didOpen': self.did_open,
+            'textDocument/didChange': self.did_change,
+            'textDocument/didClose': self.did_close,
+            'textDocument/documentSymbol': self.document_symbol,
+            'textDocument/definition': self.goto_definition,
+        }
+
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        with self.write_lock:
+            write_message(self.writer, message)
+
+    def notify(self, method, params):
+        self.send({'method': method, 'params': params})
+
+    def run(self):
+        """Atiende mensajes hasta 'exit' o el fin de la entrada; devuelve el código de salida"""
+        while True:
+            message = read_message(self.reader)
+            if message is None or message.get('method') == 'exit':
+                break
+            self.dispatch(message)
+        for document in self.documents.values():
+            if document.timer is not None:
+                document.timer.cancel()
+        return 0 if self.shutdown_requested else 1
+
+    def dispatch(self, message):
+        method = message.get('method')
+        request_id = message.get('id')
+        handler = self.handlers.get(method)
+        if handler is None:
+            # Las notificaciones desconocidas ('initialized', '$/...') se ignoran
+            if request_id is not None:
+                self.send({'id': request_id, 'error': {'code': METHOD_NOT_FOUND,
+                                                       'message': f"Método no soportado: {method}"}})
+            return
+        if not self.initialized and method != 'initialize':
+            if request_id is not None:
+                self.send({'id': request_id, 'error': {'code': SERVER_NOT_INITIALIZED,
+                                                       'message': "El servidor no fue inicializado"}})
+            return
+        try:
+            result = handler(message.get('params') or {})
+        except (KeyError, TypeError, ValueError) as e:
+            if request_id is not None:
+                self.send({'id': request_id, 'error': {'code': INVALID_REQUEST, 'message': f"Parámetros inválidos: {e}"}})
+            return
+        if request_id is not None:
+            self.send({'id': request_id, 'result': result})
+
+    # === CICLO DE VIDA ===
+
+    def initialize(self, params):
+        self.initialized = True
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': SYNC_INCREMENTAL},
+                'documentSymbolProvider': True,
+                'definitionProvider': True,
+            },
+            'serverInfo': {'name': 'fortran77-ll1'},
+        }
+
+    def shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    # === SINCRONIZACIÓN DE DOCUMENTOS ===
+
+    def did_open(self, params):
+        item = params['textDocument']
+        document = self.documents[item['uri']] = Document(item['uri'], item['text'], item.get('version', 0))
+        # Al abrir se publica sin esperar
+        self.publish(document)
+
+    def did_change(self, params):
+        document = self.documents[params['textDocument']['uri']]
+        with document.lock:
+            document.apply(params['contentChanges'], params['textDocument'].get('version'))
+            self.schedule(document)
+
+    def did_close(self, params):
+        document = self.documents.pop(params['textDocument']['uri'], None)
+        if document is not None:
+            with document.lock:
+                if document.timer is not None:
+                    document.timer.cancel()
+            self.notify('textDocument/publishDiagnostics', {'uri': document.uri, 'diagnostics': []})
+
+    def schedule(self, document):
+        """(Re)inicia el temporizador del documento: se analiza cuando dejan de llegar cambios"""
+        if document.timer is not None:
+            document.timer.cancel()
+        document.timer = threading.Timer(self.debounce, self.publish, (document,))
+        document.timer.daemon = True
+        document.timer.start()
+
+    def publish(self, document):
+        with document.lock:
+            if self.documents.get(document.uri) is not document:
+                return
+            version = document.version
+            diagnostics = document.cached('diagnostics', document.diagnostics)
+            self.notify('textDocument/publishDiagnostics',
+                        {'uri': document.uri, 'version': version, 'diagnostics': diagnostics})
+
+    # === CONSULTAS ===
+
+    def document_symbol(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return None
+        with document.lock:
+            return document.cached('symbols', document.symbols)
+
+    def goto_definition(self, params):
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return None
+        with document.lock:
+            return document.definition(params['position'])
+
+# === CLIENTE DE PRUEBA ===
+
+class LSPClient:
+    """
+    Cliente mínimo para probar el servidor sin un editor: lo lanza como
+    subproceso y habla JSON-RPC por sus tuberías. Las notificaciones del
+    servidor (publishDiagnostics) quedan en una cola.
+    """
+
+    def __init__(self, command=None, debounce=None):
+        if command is None:
+            command = [sys.executable, os.path.abspath(__file__)]
+            if debounce is not None:
+                command += ['--debounce', str(debounce)]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.next_id = 0
+        self.responses = {}
+        self.notifications = queue.Queue()
+        self._condition = threading.Condition()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        while True:
+            message = read_message(self.process.stdout)
+            if message is None:
+                break
+            if 'id' in message and 'method' not in message:
+                with self._condition:
+                    self.responses[message['id']] = message
+                    self._condition.notify_all()
+            else:
+                self.notifications.put(message)
+
+    def notify(self, method, params=None):
+        write_message(self.process.stdin, {'jsonrpc': '2.0', 'method': method, 'params': params or {}})
+
+    def request(self, method, params=None, timeout=30):
+        """Envía una petición y espera su resultado (RuntimeError si el servidor responde un error)"""
+        self.next_id += 1
+        request_id = self.next_id
+        write_message(self.process.stdin, {'jsonrpc': '2.0', 'id': request_id, 'method': method,
+                                           'params': params or {}})
+        with self._condition:
+            if not self._condition.wait_for(lambda: request_id in self.responses, timeout):
+                raise TimeoutError(f"Sin respuesta a {method}")
+            response = self.responses.pop(request_id)
+        if 'error' in response:
+            raise RuntimeError(response['error']['message'])
+        return response.get('result')
+
+    def wait_notification(self, method, timeout=30):
+        """Próxima notificación del método dado (descarta las de otros métodos)"""
+        while True:
+            message = self.notifications.get(timeout=timeout)
+            if message.get('method') == method:
+                return message['params']
+
+    def initialize(self):
+        result = self.request('initialize', {'processId': os.getpid(), 'rootUri': None, 'capabilities': {}})
+        self.notify('initialized')
+        return result
+
+    def open(self, uri, text, version=1):
+        self.notify('textDocument/didOpen', {'textDocument': {'uri': uri, 'languageId': 'fortran',
+                                                              'version': version, 'text': text}})
+
+    def change(self, uri, version, changes):
+        self.notify('textDocument/didChange', {'textDocument': {'uri': uri, 'version': version},
+                                               'contentChanges': changes})
+
+    def close(self):
+        """shutdown + exit; devuelve el código de salida del servidor"""
+        try:
+            self.request('shutdown', timeout=10)
+            self.notify('exit')
+        except (OSError, TimeoutError):
+            self.process.kill()
+        self.process.stdin.close()
+        return self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor LSP de Fortran77 (stdio) con el parser LL(1)")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE,
+                        help="segundos sin cambios antes de publicar diagnósticos")
+    args = parser.parse_args(argv)
+    # El protocolo usa la salida estándar: lo que imprima el análisis va a stderr
+    writer = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    sys.stdout = sys.stderr
+    server = LanguageServer(sys.stdin.buffer, writer, args.debounce)
+    return server.run()
+
+if __name__ == "__main__":
+    sys.exit(main())
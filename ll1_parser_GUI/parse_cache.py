@@ -0,0 +1,127 @@
+# parse_cache.py
+# Cache de ASTs por contenido: LRU en memoria y almacén opcional en disco
+import hashlib
+import importlib
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+
+import ast_binary
+
+def code_signature(modules, extra=b''):
+    """
+    Firma para caches de ASTs: sha1 de extra y del código fuente de cada
+    módulo (nombres importables). Debe listar todos los módulos de los que
+    depende el resultado guardado, o un cambio en uno de ellos serviría
+    ASTs viejos desde el disco.
+    """
+    digest = hashlib.sha1(extra)
+    for name in modules:
+        with open(importlib.import_module(name).__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    Cache de resultados de análisis indexada por hash del código fuente,
+    tipo de parser, lexer y firma del código que produce el resultado.
+
+    En memoria se guarda el propio árbol y sus posiciones (compartidos: no
+    deben modificarse) con desalojo LRU al superar maxsize entradas. Si se
+    indica directory, cada resultado también se guarda en disco en el
+    formato binario de ast_binary (con el mensaje y las posiciones) y
+    sobrevive entre procesos.
+    """
+
+    def __init__(self, maxsize=256, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(code, parser_kind, lexer_backend, signature):
+        """Clave de la entrada: sha256 del código + parser + lexer + firma (ver code_signature)"""
+        digest = hashlib.sha256(code.encode('utf-8', 'surrogatepass')).hexdigest()
+        return f"{parser_kind}-{lexer_backend}-{signature[:16]}-{digest}"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.ast')
+
+    def get(self, key, node_class):
+        """Devuelve (mensaje, ast, posiciones) guardados para la clave, o None si no está"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._load(key, node_class)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, message, ast, positions=None):
+        """Guarda el resultado de un análisis exitoso (positions: NodePositions del árbol)"""
+        entry = (message, ast, positions)
+        with self._lock:
+            self._remember(key, entry)
+        if self.directory:
+            self._store(key, message, ast, positions)
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key, node_class):
+        if not self.directory:
+            return None
+        try:
+            with ast_binary.BinaryAST.open(self._path(key)) as tree:
+                ast, positions = tree.to_tree(node_class)
+                if not tree.has_positions:
+                    positions = None
+                return tree.message, ast, positions
+        except (OSError, ValueError, IndexError, struct.error, BufferError):
+            # Ausente, truncado, corrupto o de un formato anterior: cuenta como fallo
+            return None
+
+    def _store(self, key, message, ast, positions):
+        # Escritura atómica: otro proceso nunca ve un archivo a medio escribir
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(ast_binary.dump(ast, positions, message))
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        """Vacía la memoria (el almacén en disco se conserva)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores de aciertos, fallos y desalojos"""
+        return {'entries': len(self._entries), 'maxsize': self.maxsize,
+                'hits': self.hits, 'disk_hits': self.disk_hits,
+                'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,494 @@
+# source_map.py
+# Índice de inicios de línea de un texto de entrada: convierte offsets de
+# caracteres (lexpos de los tokens) en línea y columna con búsqueda binaria.
+# También guarda los offsets de los nodos del AST (NodePositions)
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, islice
+
+INF = float('inf')
+
+class SourceMap:
+    """
+    Se construye una vez por entrada. line_starts[i] es el offset del
+    primer carácter de la línea first_line + i; las consultas cuestan
+    O(log n) en lugar de recorrer el texto hacia atrás en cada token.
+
+    text puede ser str o un buffer de bytes (bytes, mmap): en un buffer
+    los offsets y las columnas se cuentan en bytes. El índice se arma en
+    la primera consulta, así un análisis sin errores no recorre el texto.
+    """
+    __slots__ = ('text', 'first_line', '_line_starts')
+
+    def __init__(self, text, first_line=1):
+        self.text = text
+        self.first_line = first_line
+        self._line_starts = None
+
+    @property
+    def line_starts(self):
+        if self._line_starts is None:
+            starts = array('q', [0])
+            if isinstance(self.text, str):
+                starts.extend(accumulate(len(line) + 1 for line in self.text.split('\n')[:-1]))
+            else:
+                # Sin copiar el buffer (un mmap puede ser más grande que la memoria libre)
+                starts.extend(match.end() for match in re.finditer(b'\n', self.text))
+            self._line_starts = starts
+        return self._line_starts
+
+    @property
+    def line_count(self):
+        return len(self.line_starts)
+
+    def line_index(self, offset):
+        """Índice (desde 0) de la línea que contiene offset"""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def line(self, offset):
+        return self.first_line + self.line_index(offset)
+
+    def column(self, offset):
+        """Columna (desde 1) de offset dentro de su línea"""
+        return offset - self.line_starts[self.line_index(offset)] + 1
+
+    def position(self, offset):
+        """(línea, columna) de offset"""
+        index = self.line_index(offset)
+        return self.first_line + index, offset - self.line_starts[index] + 1
+
+    def offset(self, line, column=1):
+        """Offset de una línea y columna (inversa de position)"""
+        return self.line_starts[line - self.first_line] + column - 1
+
+    def line_span(self, line):
+        """(inicio, fin) de la línea sin el salto de línea"""
+        index = line - self.first_line
+        start = self.line_starts[index]
+        if index + 1 < len(self.line_starts):
+            return start, self.line_starts[index + 1] - 1
+        return start, len(self.text)
+
+def map_file(path):
+    """
+    Contenido del archivo como mmap de sólo lectura, sin copiarlo a memoria
+    (b'' si está vacío: mmap no acepta largo 0). Se cierra con close().
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def column_of(text, offset):
+    """
+    Columna (desde 1) de offset sin índice de líneas: busca el salto de
+    línea anterior (O(largo de la línea)). Para los mensajes sueltos; un
+    análisis con muchos errores usa el SourceMap de su entrada.
+    """
+    return offset - text.rfind('\n' if isinstance(text, str) else b'\n', 0, offset)
+
+def token_end(token):
+    """Offset siguiente al último carácter del token (los NUMBER guardan su largo en `length`)"""
+    if isinstance(token.value, str):
+        return token.lexpos + len(token.value)
+    return token.lexpos + token.length
+
+def _join(pieces):
+    """(breaks, deltas) de un mapa dado por tramos (inicio, delta) en orden"""
+    breaks, deltas = [], []
+    for start, delta in pieces:
+        if deltas and deltas[-1] == delta:
+            continue
+        if deltas:
+            breaks.append(start)
+        deltas.append(delta)
+    return breaks, deltas
+
+def _then(breaks, deltas, after, delta):
+    """Mapa x + deltas[...] seguido de un desplazamiento (after, delta)"""
+    # En el tramo [lower, upper) el mapa es x + current: el desplazamiento
+    # alcanza a los x >= after - current
+    pieces = []
+    bounds = [-INF] + breaks + [INF]
+    for index, current in enumerate(deltas):
+        lower, upper = bounds[index], bounds[index + 1]
+        cut = after - current
+        if cut <= lower:
+            pieces.append((lower, current + delta))
+        elif cut >= upper:
+            pieces.append((lower, current))
+        else:
+            pieces += ((lower, current), (cut, current + delta))
+    return _join(pieces)
+
+def _before(breaks, deltas, after, delta):
+    """Desplazamiento (after, delta) seguido del mapa x + deltas[...]"""
+    # Debajo de after quedan los tramos del mapa; desde after, los del mapa
+    # corridos -delta
+    pieces = [(-INF, deltas[0])]
+    pieces += ((start, deltas[index + 1]) for index, start in enumerate(breaks) if start < after)
+    first = bisect_right(breaks, after + delta)
+    pieces.append((after, deltas[first] + delta))
+    pieces += ((breaks[index] - delta, deltas[index + 1] + delta) for index in range(first, len(breaks)))
+    return _join(pieces)
+
+class PendingShifts:
+    """
+    Desplazamientos de offsets (o de líneas) anotados sin recorrer los
+    valores: shift(after, delta) suma delta a los valores >= after. Cada
+    valor se pone al día al leerlo según la época (cantidad de
+    desplazamientos anotados) en que se guardó. Los guardados antes del
+    primer desplazamiento pendiente (época base: tras un análisis completo,
+    casi todos) usan el mapa compuesto de todo el registro, O(log k); los
+    posteriores recorren sólo los que les faltan.
+
+    Cuando el registro llega a LIMIT el dueño pone al día todos sus valores
+    y llama a rebase: una pasada completa cada LIMIT ediciones en lugar de
+    una por edición.
+    """
+    LIMIT = 256
+
+    __slots__ = ('base', 'log', 'breaks', 'deltas')
+
+    def __init__(self):
+        self.base = 0       # época de los valores sin desplazamientos pendientes
+        self.log = []       # (after, delta) anotados desde base
+        # Mapa compuesto desde base: x → x + deltas[bisect_right(breaks, x)]
+        self.breaks = []
+        self.deltas = [0]
+
+    @property
+    def epoch(self):
+        return self.base + len(self.log)
+
+    def shift(self, after, delta):
+        self.log.append((after, delta))
+        self.breaks, self.deltas = _then(self.breaks, self.deltas, after, delta)
+
+    def current(self, value, epoch):
+        """value, guardado en la época epoch, con los desplazamientos posteriores"""
+        if epoch == self.base:
+            return value + self.deltas[bisect_right(self.breaks, value)]
+        for after, delta in islice(self.log, epoch - self.base, None):
+            if value >= after:
+                value += delta
+        return value
+
+    def apply(self, values, recent=()):
+        """
+        Lista de values al día: guardados en la época base salvo los pares
+        (índice, época) de recent. Es la pasada completa antes de rebase.
+        """
+        breaks, deltas = self.breaks, self.deltas
+        result = [value + deltas[bisect_right(breaks, value)] for value in values]
+        # Los demás por época, con el mapa compuesto desde el final del registro
+        by_epoch = {}
+        for index, epoch in recent:
+            by_epoch.setdefault(epoch, []).append(index)
+        breaks, deltas = [], [0]
+        pending = self.epoch
+        for epoch in sorted(by_epoch, reverse=True):
+            while pending > epoch:
+                pending -= 1
+                breaks, deltas = _before(breaks, deltas, *self.log[pending - self.base])
+            for index in by_epoch[epoch]:
+                value = values[index]
+                result[index] = value + deltas[bisect_right(breaks, value)]
+        return result
+
+    def copy(self):
+        shifts = PendingShifts()
+        shifts.base, shifts.log = self.base, list(self.log)
+        shifts.breaks, shifts.deltas = self.breaks, self.deltas
+        return shifts
+
+    def rebase(self):
+        """Los valores guardados ya se pusieron al día: se vacía el registro"""
+        self.base = self.epoch
+        self.log = []
+        self.breaks = []
+        self.deltas = [0]
+
+class NodePositions:
+    """
+    Offsets [inicio, fin) de los nodos de un AST, fuera de los nodos: tres
+    arreglos paralelos (starts, ends y el nodo de cada fila) indexados por
+    el número de fila que cada nodo guarda en su slot `row`. Línea y
+    columna se calculan sólo al consultarlas, con el SourceMap del texto.
+    Un nodo sin posición (una lista de sentencias vacía en un AST parcial)
+    no tiene fila.
+
+    Un nodo tiene fila en una sola tabla a la vez: registrarlo en otra (p.
+    ej. con merge) lo mueve, y la anterior deja de conocerlo. Los nodos
+    deben tener el slot `row` (Node de ambos parsers).
+
+    shift no reescribe los arreglos: anota el desplazamiento (PendingShifts)
+    y las consultas lo aplican; `recent` guarda la época de las filas
+    registradas con desplazamientos pendientes.
+    """
+    __slots__ = ('nodes', 'starts', 'ends', 'live', 'text', '_source', 'shifts', 'recent')
+
+    def __init__(self, text=''):
+        self.nodes = []    # nodo de cada fila (None en las filas descartadas)
+        self.starts = array('q')
+        self.ends = array('q')
+        self.live = 0
+        self.text = text
+        self._source = None
+        self.shifts = None    # PendingShifts desde la primera llamada a shift
+        self.recent = {}      # fila → época (sólo las registradas con desplazamientos pendientes)
+
+    def __len__(self):
+        return self.live
+
+    def __contains__(self, node):
+        return self._row(node) is not None
+
+    @property
+    def source(self):
+        """SourceMap del texto, construido en la primera consulta de línea o columna"""
+        if self._source is None:
+            self._source = SourceMap(self.text)
+        return self._source
+
+    def set_text(self, text):
+        self.text = text
+        self._source = None
+
+    def _row(self, node):
+        """Fila de node en esta tabla, o None (la de row puede ser de otra tabla)"""
+        row = node.row
+        if row is not None and row < len(self.nodes) and self.nodes[row] is node:
+            return row
+        return None
+
+    def _at(self, row):
+        """(inicio, fin) de la fila con los desplazamientos pendientes aplicados"""
+        shifts = self.shifts
+        if shifts is None or not shifts.log:
+            return self.starts[row], self.ends[row]
+        epoch = self.recent.get(row, shifts.base)
+        return shifts.current(self.starts[row], epoch), shifts.current(self.ends[row], epoch)
+
+    # === REGISTRO ===
+
+    def record(self, node, start, end):
+        # Se llama una vez por nodo durante el análisis: un nodo nuevo (row
+        # None) va directo a una fila nueva
+        row = node.row
+        nodes = self.nodes
+        if row is not None and row < len(nodes) and nodes[row] is node:
+            self.starts[row] = start
+            self.ends[row] = end
+        else:
+            row = node.row = len(nodes)
+            nodes.append(node)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.live += 1
+        shifts = self.shifts
+        if shifts is not None and shifts.log:
+            self.recent[row] = shifts.epoch
+
+    def copy_span(self, node, other):
+        """node ocupa lo mismo que other (si other no tiene posición, node tampoco)"""
+        row = self._row(other)
+        if row is not None:
+            self.record(node, *self._at(row))
+        else:
+            self.discard(node)
+
+    def cover(self, node, child):
+        """Extiende node hasta el fin de child (una sentencia agregada a una lista)"""
+        row = self._row(child)
+        if row is None:
+            return
+        own = self._row(node)
+        if own is None:
+            self.record(node, *self._at(row))
+        else:
+            self.record(node, self._at(own)[0], self._at(row)[1])
+
+    def replace(self, old, new):
+        """
+        new (una copia de old con otros hijos) toma la fila de old. old
+        conserva su número de fila: lo sigue encontrando un snapshot previo
+        """
+        row = self._row(old)
+        if row is not None:
+            self.nodes[row] = new
+            new.row = row
+
+    def discard(self, node):
+        row = self._row(node)
+        if row is not None:
+            self.nodes[row] = None
+            node.row = None
+            self.live -= 1
+
+    def merge(self, other, offset=0):
+        """Mueve a esta tabla las posiciones de other, desplazadas offset caracteres"""
+        for row, node in enumerate(other.nodes):
+            if node is not None and node.row == row:
+                start, end = other._at(row)
+                self.record(node, start + offset, end + offset)
+
+    def shift(self, after, delta):
+        """
+        Desplaza delta caracteres los offsets >= after (texto insertado o
+        borrado antes). Se anota y se aplica al consultar; los arreglos se
+        reescriben una vez cada PendingShifts.LIMIT llamadas.
+        """
+        if self.shifts is None:
+            self.shifts = PendingShifts()
+        self.shifts.shift(after, delta)
+        if len(self.shifts.log) >= PendingShifts.LIMIT:
+            self.flush()
+
+    def flush(self):
+        """Aplica a los arreglos los desplazamientos pendientes"""
+        shifts = self.shifts
+        if shifts is None or not shifts.log:
+            return
+        recent = self.recent.items()
+        self.starts = array('q', shifts.apply(self.starts, recent))
+        self.ends = array('q', shifts.apply(self.ends, recent))
+        shifts.rebase()
+        self.recent = {}
+
+    def compact(self, root):
+        """Descarta las filas libres y las de nodos que ya no están en el árbol de root"""
+        nodes, starts, ends = [], array('q'), array('q')
+        for node in preorder(root):
+            row = self._row(node)
+            if row is not None:
+                start, end = self._at(row)
+                starts.append(start)
+                ends.append(end)
+                node.row = len(nodes)
+                nodes.append(node)
+        self.nodes, self.starts, self.ends, self.live = nodes, starts, ends, len(nodes)
+        if self.shifts is not None:
+            self.shifts.rebase()
+        self.recent = {}
+
+    def snapshot(self):
+        """Copia de sólo lectura para otro hilo mientras esta tabla sigue cambiando"""
+        copy = PositionsSnapshot(self.text)
+        copy.nodes = list(self.nodes)
+        copy.starts = array('q', self.starts)
+        copy.ends = array('q', self.ends)
+        copy.live = self.live
+        copy.shifts = self.shifts.copy() if self.shifts is not None else None
+        copy.recent = dict(self.recent)
+        return copy
+
+    # === CONSULTAS ===
+
+    def span(self, node):
+        """(inicio, fin) del nodo, o None si no tiene posición"""
+        row = self._row(node)
+        if row is None:
+            return None
+        return self._at(row)
+
+    def start(self, node, default=None):
+        row = self._row(node)
+        return default if row is None else self._at(row)[0]
+
+    def end(self, node, default=None):
+        row = self._row(node)
+        return default if row is None else self._at(row)[1]
+
+    def range(self, node):
+        """((línea, columna) inicial, (línea, columna) final) del nodo, o None"""
+        span = self.span(node)
+        if span is None:
+            return None
+        return self.source.position(span[0]), self.source.position(span[1])
+
+    def node_at(self, root, offset):
+        """Nodo más interno que contiene offset (los hijos están en orden del texto)"""
+        found = None
+        node = root
+        while node is not None:
+            span = self.span(node)
+            if span is not None:
+                if not span[0] <= offset < span[1]:
+                    break
+                found = node
+            children = node.children
+            index = bisect_right(children, offset, key=lambda child: self.start(child, -1)) - 1
+            node = children[index] if index >= 0 else None
+        return found
+
+    # === SERIALIZACIÓN (en el orden de ASTArena) ===
+
+    def to_preorder(self, root):
+        """Arreglos (starts, ends) en preorden de root; -1 para nodos sin posición"""
+        starts, ends = array('q'), array('q')
+        for node in preorder(root):
+            span = self.span(node) or (-1, -1)
+            starts.append(span[0])
+            ends.append(span[1])
+        return starts, ends
+
+    @classmethod
+    def from_preorder(cls, root, starts, ends, text=''):
+        positions = cls(text)
+        for node, start, end in zip(preorder(root), starts, ends):
+            if start >= 0:
+                positions.record(node, start, end)
+        return positions
+
+class NullPositions(NodePositions):
+    """
+    Posiciones que no se guardan: para los análisis que sólo verifican la
+    entrada (sin conservar el AST), la memoria no crece con el tamaño del archivo
+    """
+    __slots__ = ()
+
+    def record(self, node, start, end):
+        pass
+
+class PositionsSnapshot(NodePositions):
+    """
+    Copia de una NodePositions (snapshot) que comparte sus nodos. Si la
+    original renumera o descarta un nodo después de la copia (compact,
+    discard), su slot `row` ya no sirve aquí: se busca por identidad en un
+    índice que se arma en la primera consulta que lo necesita.
+    """
+    __slots__ = ('_index',)
+
+    def __init__(self, text=''):
+        super().__init__(text)
+        self._index = None
+
+    def _row(self, node):
+        row = node.row
+        nodes = self.nodes
+        if row is not None and row < len(nodes) and nodes[row] is node:
+            return row
+        if self._index is None:
+            self._index = {id(other): index for index, other in enumerate(nodes) if other is not None}
+        return self._index.get(id(node))
+
+def cached_positions(positions, code):
+    """Posiciones de un acierto de cache, con el texto que necesitan para línea y columna"""
+    if positions is None:
+        return NodePositions(code)
+    if positions.text != code:
+        # Cargadas del disco: el texto no se guarda con ellas
+        positions.set_text(code)
+    return positions
+
+def preorder(root):
+    """Nodos del árbol en preorden (el mismo orden de ASTArena.from_tree)"""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
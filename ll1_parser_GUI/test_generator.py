@@ -1,61 +1,120 @@
 # test_generator.py
+# Generador de programas Fortran77 de prueba. Con semilla es determinista y
+# puede producir corpus de cualquier tamaño en trozos (stream/write_file)
+# sin tener el programa completo en memoria.
+import argparse
 import random
+import sys
 
 class FortranTestGenerator:
-    def __init__(self):
+    """
+    seed: semilla propia (None usa el módulo random global, como antes).
+    max_nesting: profundidad máxima de bloques IF/DO anidados (1: los
+    cuerpos sólo tienen asignaciones). expression_depth: profundidad
+    máxima del árbol de cada expresión; expression_length: si se da, las
+    expresiones son cadenas de 1 a expression_length operandos.
+    body_statements: (mínimo, máximo) de sentencias por cuerpo de bloque;
+    block_rate: probabilidad de que una sentencia que puede anidar sea un
+    bloque (IF o DO por mitades).
+    """
+    
+    def __init__(self, seed=None, max_nesting=1, expression_depth=2, expression_length=None,
+                 body_statements=(1, 3), block_rate=0.4):
+        self.rng = random.Random(seed) if seed is not None else random
+        self.max_nesting = max_nesting
+        self.expression_depth = expression_depth
+        self.expression_length = expression_length
+        self.body_statements = body_statements
+        self.block_rate = block_rate
+        self.statement_count = 0    # sentencias generadas (incluye las anidadas)
         self.variables = ['X', 'Y', 'Z', 'A', 'B', 'C', 'I', 'J', 'K']
         self.operators = ['+', '-', '*', '/']
-        self.comparisons = ['==', '!=', '<', '>', '<=', '>=']
+        # Sin '!=': el lexer lo toma como el comienzo de un comentario
+        self.comparisons = ['==', '<', '>', '<=', '>=']
+    
+    def generate_operand(self):
+        if self.rng.random() < 0.5:
+            return self.rng.choice(self.variables)
+        return str(self.rng.randint(1, 100))
     
     def generate_expression(self, depth=0):
         """Genera una expresión aritmética aleatoria"""
-        if depth > 2 or random.random() < 0.3:
+        if self.expression_length is not None:
+            return self.generate_chain()
+        if depth > self.expression_depth or self.rng.random() < 0.3:
             # Hoja: variable o número
-            if random.random() < 0.5:
-                return random.choice(self.variables)
-            else:
-                return str(random.randint(1, 100))
+            return self.generate_operand()
         
         # Expresión binaria
         left = self.generate_expression(depth + 1)
         right = self.generate_expression(depth + 1)
-        op = random.choice(self.operators)
+        op = self.rng.choice(self.operators)
         
-        if random.random() < 0.2 and depth == 0:
+        if self.rng.random() < 0.2 and depth == 0:
             return f"({left} {op} {right})"
         return f"{left} {op} {right}"
     
+    def generate_chain(self):
+        """
+        Expresión plana de 1 a expression_length operandos; algunos son un
+        par entre paréntesis (sin anidar, para no crecer la recursión del parser)
+        """
+        parts = []
+        for _ in range(self.rng.randint(1, self.expression_length)):
+            if parts:
+                parts.append(self.rng.choice(self.operators))
+            if self.rng.random() < 0.05:
+                parts.append(f"({self.generate_operand()} {self.rng.choice(self.operators)} {self.generate_operand()})")
+            else:
+                parts.append(self.generate_operand())
+        return " ".join(parts)
+    
     def generate_assignment(self):
         """Genera una asignación aleatoria"""
-        var = random.choice(self.variables)
+        self.statement_count += 1
+        var = self.rng.choice(self.variables)
         expr = self.generate_expression()
         return f"{var} = {expr}"
     
-    def generate_if_statement(self):
+    def generate_statement(self, level=0):
+        """Una sentencia dentro de level bloques: asignación, o IF/DO si aún se puede anidar"""
+        if level < self.max_nesting:
+            choice = self.rng.random()
+            if choice < self.block_rate / 2:
+                return self.generate_if_statement(level + 1)
+            if choice < self.block_rate:
+                return self.generate_do_loop(level + 1)
+        return self.generate_assignment()
+    
+    def generate_body(self, level):
+        """Cuerpo indentado de un bloque de nivel level"""
+        num_statements = self.rng.randint(*self.body_statements)
+        if level >= self.max_nesting:
+            # Sin anidamiento posible: sólo asignaciones
+            return "\n".join("    " + self.generate_assignment() 
+                             for _ in range(num_statements))
+        statements = [self.generate_statement(level) for _ in range(num_statements)]
+        return "\n".join("    " + line for statement in statements for line in statement.split("\n"))
+    
+    def generate_if_statement(self, level=1):
         """Genera una estructura IF aleatoria"""
-        condition_var = random.choice(self.variables)
-        condition_op = random.choice(self.comparisons)
-        condition_val = random.randint(0, 50)
+        self.statement_count += 1
+        condition_var = self.rng.choice(self.variables)
+        condition_op = self.rng.choice(self.comparisons)
+        condition_val = self.rng.randint(0, 50)
         condition = f"{condition_var} {condition_op} {condition_val}"
         
-        # 1-3 statements en el cuerpo
-        num_statements = random.randint(1, 3)
-        body = "\n".join("    " + self.generate_assignment() 
-                        for _ in range(num_statements))
-        
+        body = self.generate_body(level)
         return f"IF ({condition}) THEN\n{body}\nENDIF"
     
-    def generate_do_loop(self):
+    def generate_do_loop(self, level=1):
         """Genera un bucle DO aleatorio"""
-        loop_var = random.choice(['I', 'J', 'K'])
-        start = random.randint(1, 5)
-        end = random.randint(6, 15)
-        
-        # 1-3 statements en el cuerpo
-        num_statements = random.randint(1, 3)
-        body = "\n".join("    " + self.generate_assignment() 
-                        for _ in range(num_statements))
+        self.statement_count += 1
+        loop_var = self.rng.choice(['I', 'J', 'K'])
+        start = self.rng.randint(1, 5)
+        end = self.rng.randint(6, 15)
         
+        body = self.generate_body(level)
         return f"DO {loop_var} = {start}, {end}\n{body}\nENDDO"
     
     def generate_valid_test(self, complexity=1):
@@ -66,17 +125,56 @@ class FortranTestGenerator:
         components.append(self.generate_assignment())
         
         if complexity >= 1:
-            if random.random() < 0.7:
+            if self.rng.random() < 0.7:
                 components.append(self.generate_if_statement())
         
         if complexity >= 2:
-            if random.random() < 0.5:
+            if self.rng.random() < 0.5:
                 components.append(self.generate_do_loop())
         
         # Mezclar componentes
-        random.shuffle(components)
+        self.rng.shuffle(components)
         return "\n".join(components)
     
+    # === CORPUS GRANDES ===
+    
+    def stream(self, target_bytes=None, target_statements=None, chunk_size=1 << 16):
+        """
+        Genera un programa válido de al menos target_bytes caracteres o
+        target_statements sentencias (lo que se alcance primero) y lo
+        entrega en trozos de unos chunk_size caracteres que terminan en
+        un fin de línea; la memoria no depende del tamaño total.
+        """
+        if target_bytes is None and target_statements is None:
+            raise ValueError("Se requiere target_bytes o target_statements")
+        self.statement_count = 0
+        written = 0
+        parts, size = [], 0
+        while ((target_bytes is None or written + size < target_bytes) and
+               (target_statements is None or self.statement_count < target_statements)):
+            text = self.generate_statement() + "\n"
+            parts.append(text)
+            size += len(text)
+            if size >= chunk_size:
+                yield "".join(parts)
+                written += size
+                parts, size = [], 0
+        if parts:
+            yield "".join(parts)
+    
+    def generate_program(self, statements):
+        """Programa completo de al menos `statements` sentencias"""
+        return "".join(self.stream(target_statements=statements))
+    
+    def write_file(self, path, target_bytes=None, target_statements=None, chunk_size=1 << 20):
+        """Escribe en path el programa de stream(); devuelve los bytes escritos"""
+        total = 0
+        with open(path, 'w', encoding='ascii', newline='\n') as f:
+            for chunk in self.stream(target_bytes, target_statements, chunk_size):
+                f.write(chunk)
+                total += len(chunk)
+        return total
+    
     def generate_invalid_test(self, error_type):
         """Genera test cases inválidos"""
         errors = {
@@ -114,7 +212,7 @@ class FortranTestGenerator:
         print("--- CASOS VÁLIDOS ---")
         valid_tests = []
         for i in range(num_valid):
-            test = self.generate_valid_test(complexity=random.randint(1, 3))
+            test = self.generate_valid_test(complexity=self.rng.randint(1, 3))
             valid_tests.append(test)
             print(f"Test {i+1}:\n{test}\n")
         
@@ -124,32 +222,37 @@ class FortranTestGenerator:
         
         invalid_tests = []
         for i in range(num_invalid):
-            error_type = random.choice(invalid_types)
+            error_type = self.rng.choice(invalid_types)
             test = self.generate_invalid_test(error_type)
             invalid_tests.append((error_type, test))
             print(f"Test {i+1} ({error_type}):\n{test}\n")
         
         return valid_tests, invalid_tests
 
-# Ejemplo de uso
-if __name__ == "__main__":
-    generator = FortranTestGenerator()
-    
+SIZE_UNITS = {'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30}
+
+def parse_size(text):
+    """'500', '64k', '100M', '2G' → bytes"""
+    unit = SIZE_UNITS.get(text[-1:].lower())
+    return int(float(text[:-1]) * unit) if unit else int(text)
+
+def demo(generator):
+    """Suite de ejemplo y un programa de cada tipo, por la salida estándar"""
     # Generar suite de pruebas
     valid, invalid = generator.generate_test_suite(5, 3)
-    
+
     # Ejemplo de prueba específica
     print("\n--- EJEMPLOS ESPECÍFICOS ---")
-    
+
     print("1. Asignación simple:")
     print(generator.generate_assignment())
-    
+
     print("\n2. IF complejo:")
     print(generator.generate_if_statement())
-    
+
     print("\n3. DO loop con expresiones:")
     print(generator.generate_do_loop())
-    
+
     print("\n4. Programa completo:")
     complex_program = f"""
 {generator.generate_assignment()}
@@ -157,4 +260,32 @@ if __name__ == "__main__":
 {generator.generate_if_statement()}
 {generator.generate_assignment()}
 """
-    print(complex_program)
\ No newline at end of file
+    print(complex_program)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de programas Fortran77 de prueba")
+    parser.add_argument('-o', '--output', help="archivo de salida ('-': salida estándar)")
+    parser.add_argument('--bytes', type=parse_size, help="tamaño objetivo (admite k, M, G)")
+    parser.add_argument('--statements', type=int, help="cantidad objetivo de sentencias")
+    parser.add_argument('--seed', type=int, help="semilla (misma semilla y opciones: misma salida)")
+    parser.add_argument('--nesting', type=int, default=3, help="profundidad máxima de IF/DO anidados")
+    parser.add_argument('--expr-depth', type=int, default=2, help="profundidad máxima de las expresiones")
+    parser.add_argument('--expr-length', type=int, help="operandos máximos por expresión (expresiones planas)")
+    parser.add_argument('--block-rate', type=float, default=0.4, help="probabilidad de que una sentencia sea IF/DO")
+    args = parser.parse_args()
+
+    if args.bytes is None and args.statements is None:
+        # Sin tamaño objetivo: la suite de ejemplo de siempre
+        demo(FortranTestGenerator(args.seed))
+        return
+    generator = FortranTestGenerator(args.seed, max_nesting=args.nesting, expression_depth=args.expr_depth,
+                                     expression_length=args.expr_length, block_rate=args.block_rate)
+    if args.output in (None, '-'):
+        for chunk in generator.stream(args.bytes, args.statements):
+            sys.stdout.write(chunk)
+    else:
+        total = generator.write_file(args.output, args.bytes, args.statements)
+        print(f"{args.output}: {total} bytes, {generator.statement_count} sentencias", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# token_table.py
+# Tabla compacta de tokens (arreglos paralelos) para la pestaña Tokens de la GUI
+from array import array
+from bisect import bisect_left, bisect_right
+
+from ll1_parser import tokens as TOKEN_TYPES
+from source_map import PendingShifts
+
+class TokenTable:
+    """
+    Tokens de un análisis en arreglos paralelos indexados por número de token:
+
+    type_code[i]  índice del tipo en self.types
+    lines[i]      línea del token
+    columns[i]    columna del token (desde el SourceMap de la entrada)
+    values[i]     valor (texto del identificador, número, etc.)
+
+    Se llena con los mismos tokens que consume el parser, sin re-lexear.
+    Tras splice_lines las líneas posteriores a la región quedan con el
+    desplazamiento pendiente (PendingShifts, con la época de cada token
+    en epochs): se leen con line(index).
+    """
+
+    def __init__(self):
+        self.type_code = array('B')
+        self.lines = array('i')
+        self.columns = array('i')
+        self.values = []
+        self.types = list(TOKEN_TYPES)
+        self._type_ids = {name: code for code, name in enumerate(self.types)}
+        self.shifts = None    # desde el primer splice_lines
+        self.epochs = None
+
+    @classmethod
+    def from_tokens(cls, tokens, source):
+        """Tabla de una lista de tokens; source es el SourceMap del texto lexeado"""
+        table = cls()
+        for token in tokens:
+            table.append(token, source.column(token.lexpos))
+        return table
+
+    def __len__(self):
+        return len(self.type_code)
+
+    def _type_id(self, name):
+        code = self._type_ids.get(name)
+        if code is None:
+            code = self._type_ids[name] = len(self.types)
+            self.types.append(name)
+        return code
+
+    def append(self, token, column):
+        self.type_code.append(self._type_id(token.type))
+        self.lines.append(token.lineno)
+        self.columns.append(column)
+        self.values.append(token.value)
+        if self.epochs is not None:
+            self.epochs.append(self.shifts.epoch)
+
+    def line(self, index):
+        """Línea del token index con los desplazamientos pendientes"""
+        if self.shifts is None or not self.shifts.log:
+            return self.lines[index]
+        return self.shifts.current(self.lines[index], self.epochs[index])
+
+    def row(self, index):
+        """(tipo, valor, línea, columna) del token index"""
+        return (self.types[self.type_code[index]], self.values[index],
+                self.line(index), self.columns[index])
+
+    def splice_lines(self, first, last, other, delta):
+        """
+        Reemplaza los tokens de las líneas first..last por los de `other`
+        (ya numerados en el texto nuevo) y desplaza delta líneas los
+        tokens posteriores (se anota; ver line)
+        """
+        if self.shifts is None:
+            self.shifts = PendingShifts()
+            self.epochs = array('I', bytes(4 * len(self)))
+        indices = range(len(self))
+        start = bisect_left(indices, first, key=self.line)
+        stop = bisect_right(indices, last, start, key=self.line)
+        if delta:
+            self.shifts.shift(last + 1, delta)
+        if other.types == self.types:
+            self.type_code[start:stop] = other.type_code
+        else:
+            self.type_code[start:stop] = array('B', (self._type_id(other.types[code])
+                                                     for code in other.type_code))
+        self.lines[start:stop] = other.lines
+        self.columns[start:stop] = other.columns
+        self.values[start:stop] = other.values
+        self.epochs[start:stop] = array('I', [self.shifts.epoch]) * len(other)
+        if len(self.shifts.log) >= PendingShifts.LIMIT:
+            self.flush()
+
+    def flush(self):
+        """Aplica a lines los desplazamientos pendientes"""
+        shifts = self.shifts
+        if shifts is None or not shifts.log:
+            return
+        base = shifts.base
+        recent = [(index, epoch) for index, epoch in enumerate(self.epochs) if epoch != base]
+        self.lines = array('i', shifts.apply(self.lines, recent))
+        shifts.rebase()
+        self.epochs = array('I', [shifts.base]) * len(self)
+
+    def copy(self):
+        """Copia independiente (para mostrarla mientras el original se sigue editando)"""
+        self.flush()
+        table = TokenTable()
+        table.type_code = array('B', self.type_code)
+        table.lines = array('i', self.lines)
+        table.columns = array('i', self.columns)
+        table.values = list(self.values)
+        table.types = list(self.types)
+        table._type_ids = dict(self._type_ids)
+        return table